@@ -0,0 +1,296 @@
+"""Micro-benchmarks for the core generators, gated against stored baselines.
+
+Covers ``make_iterate_card`` (every pattern, every pattern pair, all six
+combined, both auto-detect fallbacks), ``IterateCard.render_text``,
+``build_plan_text`` and ``build_ticket_text`` (plus a ticket with every
+field long and typographic), each with short and long frictions in two
+input flavours:
+
+- ``ascii``: plain ASCII text, Unicode output
+- ``unicode``: typographic quotes, dashes and ellipses, folded with ``ascii_only=True``
+
+    python benchmarks/generators.py                     # run, compare with benchmarks/baseline.json
+    python benchmarks/generators.py --update-baseline   # run and store new baselines
+    python benchmarks/generators.py -k plan/ --threshold 0.15
+
+Reports ops/sec (median of ``--repeat`` timed batches) and the peak bytes
+traced during one call. Exits 1 when any case is more than ``--threshold``
+slower than its baseline; a slow case is re-measured twice before it
+counts. Independently of the baseline, each ``unicode`` case must stay
+within ``--max-fold-cost`` times its ``ascii`` twin, so a slow ASCII fold
+fails even against a baseline recorded with it (and refuses to be
+recorded). Throughput is compared after dividing by a pure-Python calibration
+loop timed in the same run, so baselines taken on one machine stay usable
+on another. Baselines keep the slowest of three passes over all cases.
+Allocation growth is reported, not gated.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC))
+
+from promptkit.cards import PATTERNS, make_iterate_card  # noqa: E402
+from promptkit.plan import build_plan_text  # noqa: E402
+from promptkit.ticket import build_ticket_text  # noqa: E402
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+_SEED = {
+    "ascii": "SnackSmith flavor assistant helps build custom snacks from natural-language taste descriptions.",
+    "unicode": "SnackSmith — the “flavor” assistant — builds snacks from taste descriptions…",
+}
+_FRICTION = {
+    "ascii": "Responses feel bland and generic. ",
+    "unicode": "Responses feel “bland” — generic… ",
+}
+# Auto-detection lands on each fallback card with these frictions.
+_FALLBACK_FRICTION = {
+    "close-the-loop": "Users repeat themselves and it never confirms the order. ",
+    "smart-info-capture": "Responses feel bland. ",
+}
+_LONG = 60  # repetitions of the friction sentence in the long variant
+
+Case = Tuple[str, Callable[[], object]]
+
+
+def _inputs() -> List[Tuple[str, str, str, bool]]:
+    """(label, seed, friction, ascii_only) for every flavour x length."""
+    out = []
+    for flavour, length in itertools.product(("ascii", "unicode"), ("short", "long")):
+        friction = _FRICTION[flavour] * (_LONG if length == "long" else 1)
+        out.append((f"{flavour}-{length}", _SEED[flavour], friction.strip(), flavour == "unicode"))
+    return out
+
+
+def _pattern_specs() -> List[str]:
+    keys = list(PATTERNS)
+    return keys + [",".join(pair) for pair in itertools.combinations(keys, 2)] + [",".join(keys)]
+
+
+def cases() -> List[Case]:
+    out: List[Case] = []
+    inputs = _inputs()
+    for spec in _pattern_specs():
+        for label, seed, friction, ascii_only in inputs:
+            out.append((
+                f"iterate/{spec}/{label}",
+                lambda s=seed, f=friction, a=ascii_only, p=spec: make_iterate_card(s, f, ascii_only=a, pattern=p),
+            ))
+    for name, sentence in _FALLBACK_FRICTION.items():
+        for length in ("short", "long"):
+            friction = (sentence * (_LONG if length == "long" else 1)).strip()
+            out.append((
+                f"iterate/auto:{name}/ascii-{length}",
+                lambda f=friction: make_iterate_card(_SEED["ascii"], f),
+            ))
+    for spec in [*PATTERNS, "auto:close-the-loop", "auto:smart-info-capture"]:
+        for label, seed, friction, ascii_only in inputs:
+            if spec.startswith("auto:"):
+                friction = _FALLBACK_FRICTION[spec[5:]].strip()
+            card = make_iterate_card(seed, friction, ascii_only=ascii_only, pattern=None if spec.startswith("auto:") else spec)
+            out.append((f"render_text/{spec}/{label}", card.render_text))
+    for spec in ["", *PATTERNS]:
+        for label, seed, friction, ascii_only in inputs:
+            out.append((
+                f"plan/{spec or 'generic'}/{label}",
+                lambda s=seed, f=friction, a=ascii_only, p=spec or None: build_plan_text(s, f, pattern=p, ascii_only=a),
+            ))
+    for label, seed, friction, ascii_only in inputs:
+        out.append((
+            f"ticket/{label}",
+            lambda s=seed, f=friction, a=ascii_only: build_ticket_text(
+                seed=s, friction=f, client="SnackSmith", success=["No repeats", "Confirms order"], ascii_only=a
+            ),
+        ))
+    # Every caller-supplied ticket field long and typographic: the fold's worst
+    # case. No ascii twin (it would fold nothing), so only the baseline gates it.
+    text = (_FRICTION["unicode"] * _LONG).strip()
+    out.append((
+        "ticket/every-field/unicode-long",
+        lambda: build_ticket_text(
+            seed=text, friction=text, client=text, prompt_brief=text, real_problem=text, test_problem=text,
+            goal=text, success=[text, text, text], ascii_only=True,
+        ),
+    ))
+    return out
+
+
+def fold_twins(names: List[str]) -> List[Tuple[str, str]]:
+    """(unicode case, its ascii twin) pairs: same generator, pattern and length."""
+    present = set(names)
+    pairs = []
+    for name in names:
+        twin = name.replace("/unicode-", "/ascii-")
+        if twin != name and twin in present:
+            pairs.append((name, twin))
+    return pairs
+
+
+def fold_failures(ops: Dict[str, float], max_cost: float) -> List[str]:
+    """Unicode cases more than ``max_cost`` times slower than their ASCII twin.
+
+    Independent of the stored baseline, so a slow ASCII fold is caught even
+    if a baseline was recorded with it.
+    """
+    lines = []
+    for name, twin in fold_twins(list(ops)):
+        cost = ops[twin] / ops[name]
+        if cost > max_cost:
+            lines.append(f"{name}: {cost:.1f}x slower than {twin} (limit {max_cost:g}x)")
+    return lines
+
+
+def _calibration() -> None:
+    parts = [str(i) for i in range(200)]
+    "".join(p.upper() for p in parts).translate({65: 97})
+
+
+def measure(fn: Callable[[], object], repeat: int, target: float) -> float:
+    """Median ops/sec over ``repeat`` batches sized to take about ``target`` seconds.
+
+    The median rather than the best batch: on shared or frequency-scaling
+    hosts the fastest batch is an occasional burst, not the steady state.
+    """
+    fn()  # warm caches (lru, compiled segments), as in a running process
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= target / 4:
+            break
+        number *= 4
+    number = max(1, int(number * target / max(elapsed, 1e-9)))
+    times = []
+    gc.disable()  # as timeit does: collections land on whichever case happens to trigger them
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            times.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return number / statistics.median(times)
+
+
+def peak_bytes(fn: Callable[[], object]) -> int:
+    """Peak traced memory during one call (after warm-up)."""
+    fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", default="", help="Only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--target", type=float, default=0.02, help="Seconds per timed batch")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--passes", type=int, default=0, help="Passes over all cases (default 1; 3 with --update-baseline)")
+    parser.add_argument("--max-fold-cost", type=float, default=15.0, help="Allowed slowdown of a unicode case vs its ascii twin")
+    args = parser.parse_args()
+
+    def timed(fn: Callable[[], object]) -> float:
+        return measure(fn, args.repeat, args.target)
+
+    selected = [(name, fn) for name, fn in cases() if args.filter in name]
+    # Host speed comes in bursts lasting seconds, so repeated samples of one
+    # case are taken in separate passes, and calibration throughout the run.
+    passes = args.passes or (3 if args.update_baseline else 1)
+    runs: Dict[str, List[float]] = {name: [] for name, _ in selected}
+    samples: List[float] = []
+    for _ in range(passes):
+        for i, (name, fn) in enumerate(selected):
+            if i % 8 == 0:
+                samples.append(timed(_calibration))
+            runs[name].append(timed(fn))
+    samples.append(timed(_calibration))
+    calibration = statistics.median(samples)
+    # Bursts only ever make a case look faster, so the slowest pass is the
+    # steady state (check runs, in turn, keep the best re-measurement).
+    results: Dict[str, Dict[str, float]] = {
+        name: {"ops": round(min(runs[name]), 1), "peak_bytes": peak_bytes(fn)} for name, fn in selected
+    }
+
+    folds = fold_failures({name: r["ops"] for name, r in results.items()}, args.max_fold_cost)
+    for line in folds:
+        print(f"FOLD COST {line}")
+
+    if args.update_baseline:
+        if folds:
+            print("baseline not written: ASCII folding is too slow (see FOLD COST above)")
+            return 1
+        stored = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "calibration_ops": round(calibration, 1),
+            "cases": results,
+        }
+        if args.filter and args.baseline.exists():  # partial run: rescale and merge into the stored cases
+            previous = json.loads(args.baseline.read_text(encoding="utf-8"))
+            scale = previous["calibration_ops"] / calibration
+            rescaled = {k: {**v, "ops": round(v["ops"] * scale, 1)} for k, v in results.items()}
+            stored.update(calibration_ops=previous["calibration_ops"], cases={**previous["cases"], **rescaled})
+        for name, r in results.items():
+            print(f"{name:<70} {r['ops']:>12,.0f} ops/s {r['peak_bytes']:>9,} B")
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline written: {args.baseline} ({len(stored['cases'])} cases)")
+        return 0
+    if not args.baseline.exists():
+        for name, r in results.items():
+            print(f"{name:<70} {r['ops']:>12,.0f} ops/s {r['peak_bytes']:>9,} B")
+        print(f"no baseline at {args.baseline}; run with --update-baseline")
+        return 0
+
+    stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+    speed = calibration / stored["calibration_ops"]  # >1: this machine/run is faster than the baseline's
+    regressions: List[str] = []
+    for name, fn in selected:
+        ops, peak = results[name]["ops"], results[name]["peak_bytes"]
+        line = f"{name:<70} {ops:>12,.0f} ops/s {peak:>9,} B"
+        base = stored["cases"].get(name)
+        if base:
+            expected = base["ops"] * speed
+            for _ in range(2):  # confirm before flagging: a real regression stays slow
+                if ops >= expected * (1 - args.threshold):
+                    break
+                ops = max(ops, timed(fn))
+            change = ops / expected - 1
+            line = f"{name:<70} {ops:>12,.0f} ops/s {peak:>9,} B  {change:+7.1%}"
+            if change < -args.threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+            if peak > base["peak_bytes"] * (1 + args.threshold):
+                line += f"  (peak +{peak - base['peak_bytes']:,} B)"
+        print(line)
+    print(
+        f"calibration {calibration:,.0f} ops/s ({speed:.2f}x baseline machine); "
+        f"{len(regressions)} regression(s), {len(folds)} fold cost failure(s)"
+    )
+    return 1 if regressions or folds else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Cold-start import budget for the ``promptkit`` CLI.
+
+Runs fresh interpreters under ``python -X importtime`` and fails (exit 1)
+when a scenario's cumulative import time goes over its budget, or when it
+pulls in a module that should stay lazy.
+
+    python benchmarks/import_budget.py [--budget-ms 100] [--fast-budget-ms 10] [--runs 5]
+
+Times are the median over ``--runs`` cold starts.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# name -> (code to run, modules that must NOT be imported)
+SCENARIOS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "fast-path (--version)": (
+        "from promptkit.__main__ import main; main(['--version'])",
+        ("typer", "click", "promptkit.cli", "promptkit.cards", "promptkit.plan", "promptkit.ticket"),
+    ),
+    "cli module": (
+        "import promptkit.cli",
+        ("promptkit.cards", "promptkit.plan", "promptkit.ticket", "promptkit.cache", "promptkit.batch", "promptkit.jsonio"),
+    ),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _importtime(code: str) -> Tuple[int, List[str]]:
+    """Cumulative microseconds of the imports ``code`` triggers, and every module imported.
+
+    Interpreter startup (``site`` and everything before it) is excluded: it
+    depends on the environment, not on PromptKit.
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC), os.getenv("PYTHONPATH")]))}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    total = 0
+    modules: List[str] = []
+    started = False
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        top_level = len(m.group(3)) == 1
+        if not started:
+            started = top_level and m.group(4) == "site"
+            continue
+        modules.append(m.group(4))
+        if top_level:  # cumulative already includes nested imports
+            total += int(m.group(2))
+    return total, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Budget for importing promptkit.cli")
+    parser.add_argument("--fast-budget-ms", type=float, default=10.0, help="Budget for the --version fast path")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    budgets = {"fast-path (--version)": args.fast_budget_ms, "cli module": args.budget_ms}
+    failed = False
+    for name, (code, forbidden) in SCENARIOS.items():
+        samples = []
+        modules: List[str] = []
+        for _ in range(max(1, args.runs)):
+            micros, modules = _importtime(code)
+            samples.append(micros / 1000)
+        median = statistics.median(samples)
+        leaked = sorted(set(forbidden) & set(modules))
+        ok = median <= budgets[name] and not leaked
+        failed |= not ok
+        print(f"{'ok  ' if ok else 'FAIL'}  {name:<24} {median:7.1f} ms  (budget {budgets[name]:.0f} ms)")
+        if leaked:
+            print(f"      eagerly imported: {', '.join(leaked)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
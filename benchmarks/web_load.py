@@ -0,0 +1,91 @@
+"""Closed-loop HTTP load against a running webapp: requests/second and latency percentiles.
+
+    python benchmarks/web_load.py [--url http://127.0.0.1:8000] [--clients 8] [--duration 10] [--unique]
+
+Each client process keeps one connection alive and requests ``GET /run``
+back to back. ``--unique`` varies the seed per request so every request
+generates (cache misses); without it, responses come from the result and
+page caches. Start the server with ``PK_RATE_LIMIT=0`` or all clients
+share one rate-limit bucket.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import multiprocessing
+import statistics
+import sys
+import time
+from typing import List, Tuple
+from urllib.parse import urlencode, urlsplit
+
+
+def _client(url: str, duration: float, unique: bool, worker: int, out: "multiprocessing.Queue[Tuple[List[float], int]]") -> None:
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    n = 0
+    while time.perf_counter() < deadline:
+        seed = f"Load test assistant {worker}-{n}" if unique else "Load test assistant"
+        query = urlencode({"seed": seed, "friction": "Repeats questions and forgets constraints.", "mode": "iterate"})
+        started = time.perf_counter()
+        for attempt in (1, 2):
+            try:
+                conn.request("GET", f"{parts.path.rstrip('/')}/run?{query}")
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors += 1
+                break
+            except (OSError, http.client.HTTPException):
+                # A kept-alive connection the server closed (e.g. a worker
+                # retiring on reload) is retried once, as browsers do.
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+                if attempt == 2:
+                    errors += 1
+        latencies.append(time.perf_counter() - started)
+        n += 1
+    out.put((latencies, errors))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--unique", action="store_true", help="Distinct seed per request (no cache hits)")
+    args = parser.parse_args()
+
+    out: "multiprocessing.Queue[Tuple[List[float], int]]" = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(target=_client, args=(args.url, args.duration, args.unique, i, out))
+        for i in range(args.clients)
+    ]
+    for proc in procs:
+        proc.start()
+    latencies: List[float] = []
+    errors = 0
+    for _ in procs:
+        lat, err = out.get()
+        latencies.extend(lat)
+        errors += err
+    for proc in procs:
+        proc.join()
+
+    if not latencies:
+        print("no requests completed")
+        return 1
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000  # noqa: E731
+    print(
+        f"{len(latencies) / args.duration:8.1f} req/s  p50 {pct(0.50):6.1f} ms  p99 {pct(0.99):6.1f} ms  "
+        f"mean {statistics.fmean(latencies) * 1000:6.1f} ms  errors {errors}/{len(latencies)}"
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
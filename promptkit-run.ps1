@@ -60,7 +60,7 @@ function Run-Iterate([string]$Seed,[string]$Friction,[string]$Pattern) {
   }
   $repoSrc = Join-Path $PSScriptRoot "src"
   $env:PYTHONPATH = $repoSrc
-  $pyArgs = @("-m", "promptkit.cli", "iterate", "--seed", $Seed, "--friction", $Friction, "--ascii")
+  $pyArgs = @("-m", "promptkit", "iterate", "--seed", $Seed, "--friction", $Friction, "--ascii")
   if ($Pattern) { $pyArgs += @("--pattern", $Pattern) }
   & python @pyArgs
   return $LASTEXITCODE
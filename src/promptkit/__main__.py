@@ -0,0 +1,68 @@
+"""Console entry point (``promptkit`` / ``python -m promptkit``).
+
+``--version`` and top-level ``--help`` are answered here without importing
+Typer or any generator module, and ``iterate``/``plan``/``ticket`` go straight
+to a running ``promptkit serve`` daemon when there is one; everything else is
+handed to ``promptkit.cli``.
+"""
+from __future__ import annotations
+
+import sys
+from typing import List, Optional
+
+from . import __version__
+
+
+# Keep in sync with the commands registered in promptkit.cli.
+_COMMANDS = (
+    ("iterate", "Generate a single iterate card (Diagnosis -> Fix -> Validation)."),
+    ("classify", "Score every pattern against a friction (what auto-selection would pick)."),
+    ("plan", "Generate a compact plan (Context, Objective, Flow, Reasoning Path, Output)."),
+    ("ticket", "Print a PromptKit ticket (template filled from args)."),
+    ("tickets", "Generate tickets in bulk from a spreadsheet export (streaming, row by row)."),
+    ("all", "Generate the iterate card, plan and ticket together (pattern resolved once)."),
+    ("batch", "Generate artifacts for many records (streaming JSONL in/out, process pool)."),
+    ("serve", "Keep generators and caches warm; iterate/plan/ticket use this daemon automatically."),
+    ("cache", "Inspect or clear the result cache."),
+)
+
+
+def _usage() -> str:
+    width = max(len(name) for name, _ in _COMMANDS)
+    lines = [
+        "Usage: promptkit [OPTIONS] COMMAND [ARGS]...",
+        "",
+        "  PromptKit: Prompt System Diagnostics Framework - stop guessing; diagnose and standardize fixes.",
+        "",
+        "Options:",
+        "  -V, --version  Show the version and exit",
+        "  --help         Show this message and exit.",
+        "",
+        "Commands:",
+    ]
+    lines += [f"  {name.ljust(width)}  {summary}" for name, summary in _COMMANDS]
+    lines += ["", "Run 'promptkit COMMAND --help' for command options."]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    if args in (["--version"], ["-V"]):
+        sys.stdout.write(f"promptkit {__version__}\n")
+        return
+    if args in ([], ["--help"], ["-h"]):
+        sys.stdout.write(_usage() + "\n")
+        return
+
+    from .daemon import try_client
+
+    if try_client(args):
+        return
+
+    from .cli import app
+
+    app(args=args, prog_name="promptkit")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,112 @@
+"""ASCII folding shared by cards, plan and ticket (one replacement table)."""
+from __future__ import annotations
+
+import sys
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+# Typographic punctuation -> closest ASCII spelling.
+ASCII_TABLE: Dict[str, str] = {
+    # dashes and hyphens (incl. the non-breaking hyphen used in the web templates)
+    "\u2010": "-",  # hyphen
+    "\u2011": "-",  # non-breaking hyphen
+    "\u2012": "-",  # figure dash
+    "\u2013": "-",  # en dash
+    "\u2014": "-",  # em dash
+    "\u2015": "-",  # horizontal bar
+    "\u2212": "-",  # minus sign
+    # quotes and primes
+    "\u2018": "'",  # left single quotation mark
+    "\u2019": "'",  # right single quotation mark
+    "\u201a": "'",  # single low-9 quotation mark
+    "\u201b": "'",  # single high-reversed-9 quotation mark
+    "\u2032": "'",  # prime
+    "\u201c": '"',  # left double quotation mark
+    "\u201d": '"',  # right double quotation mark
+    "\u201e": '"',  # double low-9 quotation mark
+    "\u201f": '"',  # double high-reversed-9 quotation mark
+    "\u2033": '"',  # double prime
+    # ellipsis, bullets, arrows
+    "\u2026": "...",  # horizontal ellipsis
+    "\u2022": "-",  # bullet
+    "\u2023": "-",  # triangular bullet
+    "\u2043": "-",  # hyphen bullet
+    "\u25e6": "-",  # white bullet
+    "\u2192": "->",  # rightwards arrow
+    "\u2190": "<-",  # leftwards arrow
+    "\u21d2": "=>",  # rightwards double arrow
+    # spaces (non-breaking, narrow, thin, en/em) and invisible marks
+    "\u00a0": " ",  # no-break space
+    "\u2002": " ",  # en space
+    "\u2003": " ",  # em space
+    "\u2007": " ",  # figure space
+    "\u2009": " ",  # thin space
+    "\u200a": " ",  # hair space
+    "\u202f": " ",  # narrow no-break space
+    "\u00ad": "",  # soft hyphen
+    "\u200b": "",  # zero width space
+    "\ufeff": "",  # zero width no-break space
+}
+_FOLDS: Tuple[Tuple[str, str], ...] = tuple(ASCII_TABLE.items())
+_FOLD_CHARS = frozenset(ASCII_TABLE)
+
+# Sample of what we emit in Unicode mode; used to probe a stream's encoding.
+_PROBE = "\u2014\u2019\u201c\u2026\u2192\u00a0"
+
+
+def to_ascii(text: str) -> str:
+    """Fold typographic punctuation to ASCII (no-op for pure-ASCII text)."""
+    if text.isascii():
+        return text
+    # ``str.translate`` with multi-character replacements falls off CPython's
+    # fast path and costs ~20x more; ``replace`` runs only for characters
+    # actually present. Short strings find them with one set intersection,
+    # long ones with memchr-speed ``in`` scans.
+    if len(text) < 64:
+        for char in _FOLD_CHARS.intersection(text):
+            text = text.replace(char, ASCII_TABLE[char])
+        return text
+    for char, repl in _FOLDS:
+        if char in text:
+            text = text.replace(char, repl)
+    return text
+
+
+def iter_ascii(chunks: Iterable[str]) -> Iterator[str]:
+    """Streaming variant of ``to_ascii``.
+
+    The table maps single code points, so chunk boundaries never split a
+    replacement and each chunk is folded independently.
+    """
+    for chunk in chunks:
+        yield to_ascii(chunk)
+
+
+def fold_strings(obj: Any) -> Any:
+    """``to_ascii`` applied to every string inside nested dicts/lists/tuples."""
+    if isinstance(obj, str):
+        return to_ascii(obj)
+    if isinstance(obj, dict):
+        return {k: fold_strings(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [fold_strings(v) for v in obj]
+    return obj
+
+
+def stdout_supports_unicode(stream: Optional[IO[str]] = None) -> bool:
+    """True when the stream's encoding can represent the punctuation we emit."""
+    encoding = getattr(stream if stream is not None else sys.stdout, "encoding", None)
+    if not encoding:
+        return False
+    try:
+        _PROBE.encode(encoding)
+    except (UnicodeEncodeError, LookupError):
+        return False
+    return True
+
+
+def resolve_ascii(ascii_only: Optional[bool], stream: Optional[IO[str]] = None) -> bool:
+    """Resolve a tri-state ASCII flag; ``None`` means auto-detect from the stream."""
+    if ascii_only is None:
+        return not stdout_supports_unicode(stream)
+    return ascii_only
@@ -0,0 +1,198 @@
+"""Batch generation: JSONL records in, JSONL results out, across a process pool."""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .bundle import build_bundle
+from .cards import make_iterate_card
+from .jsonio import dumps
+from .plan import build_plan_dict, build_plan_text
+from .ticket import build_ticket_dict, build_ticket_text
+
+
+MODES = ("iterate", "plan", "ticket")
+BATCH_MODES = MODES + ("all",)
+
+_TICKET_FIELDS = ("client", "prompt_brief", "real_problem", "test_problem", "goal", "success")
+
+# (line number, raw JSONL line)
+Line = Tuple[int, str]
+# (line number, output JSON line or None, error JSON line or None)
+Outcome = Tuple[int, Optional[str], Optional[str]]
+
+
+def generate_record(
+    record: Dict[str, Any],
+    mode: str,
+    ascii_only: bool = False,
+    structured: bool = False,
+) -> Dict[str, Any]:
+    """Generate the artifact(s) for one record: ``{mode: text}`` (or ``{mode: dict}`` if ``structured``).
+
+    ``all`` builds the three artifacts from one ``build_bundle`` pass.
+    """
+    seed = record.get("seed")
+    friction = record.get("friction")
+    if not isinstance(seed, str) or not seed.strip():
+        raise ValueError("'seed' is required")
+    if not isinstance(friction, str) or not friction.strip():
+        raise ValueError("'friction' is required")
+    pattern = record.get("pattern") or None
+    extra = _ticket_extra(record)
+
+    if mode == "all":
+        bundle = build_bundle(seed, friction, pattern=pattern, ascii_only=ascii_only, **extra)
+        return bundle.to_dict() if structured else bundle.texts()
+
+    if mode == "iterate":
+        card = make_iterate_card(seed, friction, ascii_only=ascii_only, pattern=pattern)
+        return {mode: card.to_dict() if structured else card.render_text()}
+    if mode == "plan":
+        build_plan = build_plan_dict if structured else build_plan_text
+        return {mode: build_plan(seed, friction, pattern=pattern, ascii_only=ascii_only)}
+    if mode == "ticket":
+        build_ticket = build_ticket_dict if structured else build_ticket_text
+        return {mode: build_ticket(seed=seed, friction=friction, ascii_only=ascii_only, **extra)}
+    raise ValueError(f"Unsupported mode: {mode}")
+
+
+def _ticket_extra(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Optional ticket fields of a record, type-checked; a bare ``success`` string is one criterion."""
+    extra: Dict[str, Any] = {}
+    for key in _TICKET_FIELDS:
+        value = record.get(key)
+        if not value:
+            continue
+        if key == "success":
+            if isinstance(value, str):
+                value = [value]
+            elif not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError("'success' must be a string or a list of strings")
+        elif not isinstance(value, str):
+            raise ValueError(f"'{key}' must be a string")
+        extra[key] = value
+    return extra
+
+
+def _process_line(line_no: int, raw: str, mode: str, ascii_only: bool, structured: bool) -> Outcome:
+    try:
+        record = json.loads(raw)
+        if not isinstance(record, dict):
+            raise ValueError("record must be a JSON object")
+        result: Dict[str, Any] = {"line": line_no}
+        if "id" in record:
+            result["id"] = record["id"]
+        result.update(generate_record(record, mode, ascii_only, structured))
+        return line_no, dumps(result, compact=True, ascii_only=ascii_only), None
+    except Exception as exc:  # per-record isolation: report and keep going
+        error = {"line": line_no, "error": f"{type(exc).__name__}: {exc}", "record": raw}
+        return line_no, None, dumps(error, compact=True)
+
+
+def _process_chunk(chunk: List[Line], mode: str, ascii_only: bool, structured: bool) -> List[Outcome]:
+    return [_process_line(n, raw, mode, ascii_only, structured) for n, raw in chunk]
+
+
+def iter_lines(fp: IO[str]) -> Iterator[Line]:
+    """Non-blank lines with 1-based line numbers, read lazily."""
+    for n, raw in enumerate(fp, 1):
+        if raw.strip():
+            yield n, raw
+
+
+def _chunks(lines: Iterable[Line], size: int) -> Iterator[List[Line]]:
+    chunk: List[Line] = []
+    for item in lines:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_outcomes(
+    lines: Iterable[Line],
+    mode: str,
+    ascii_only: bool,
+    structured: bool,
+    workers: int,
+    chunk_size: int,
+    ordered: bool,
+) -> Iterator[List[Outcome]]:
+    chunks = _chunks(lines, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            yield _process_chunk(chunk, mode, ascii_only, structured)
+        return
+
+    # At most two chunks per worker are in flight, so memory stays bounded
+    # no matter how large the input is.
+    window = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if ordered:
+            pending: Deque[Future] = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_process_chunk, chunk, mode, ascii_only, structured))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        else:
+            running: Set[Future] = set()
+            for chunk in chunks:
+                running.add(pool.submit(_process_chunk, chunk, mode, ascii_only, structured))
+                if len(running) >= window:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        yield fut.result()
+            for fut in running:
+                yield fut.result()
+
+
+def run_batch(
+    src: IO[str],
+    out: IO[str],
+    errors: IO[str],
+    *,
+    mode: str = "iterate",
+    ascii_only: bool = False,
+    structured: bool = False,
+    workers: int = 1,
+    chunk_size: int = 256,
+    ordered: bool = True,
+) -> Tuple[int, int]:
+    """Stream JSONL records from ``src`` to ``out``; failures go to ``errors``.
+
+    ``workers`` <= 0 uses one process per CPU. With ``ordered`` results keep
+    input order; otherwise chunks are written as they complete. Returns
+    ``(written, failed)``.
+    """
+    if mode not in BATCH_MODES:
+        raise ValueError(f"Unsupported mode: {mode}")
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    written = failed = 0
+    for outcomes in _iter_outcomes(iter_lines(src), mode, ascii_only, structured, workers, max(1, chunk_size), ordered):
+        for _, line, error in outcomes:
+            if line is not None:
+                out.write(line + "\n")
+                written += 1
+            else:
+                errors.write(f"{error}\n")
+                failed += 1
+    out.flush()
+    errors.flush()
+    return written, failed
+
+
+def open_text(path: str, mode: str) -> IO[str]:
+    """Open ``path`` as UTF-8 text; ``-`` means stdin/stdout."""
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8", newline="\n" if "w" in mode else None)
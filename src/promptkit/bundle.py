@@ -0,0 +1,76 @@
+"""All three artifacts (iterate card, plan, ticket) for one friction in one pass."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from .asciifold import fold_strings
+from .cards import IterateCard, parse_pattern, resolve_pattern
+from .plan import build_plan_dict, plan_text_from_dict
+from .ticket import build_ticket_dict, ticket_text_from_dict
+
+
+ARTIFACTS = ("iterate", "plan", "ticket")
+
+
+@dataclass(frozen=True)
+class Bundle:
+    """The card plus unfolded plan and ticket parts; ASCII folding happens on output."""
+
+    card: IterateCard
+    plan: Dict[str, Any]
+    ticket: Dict[str, Any]
+    ascii_only: bool = False
+    pattern: str = ""  # canonical spec, e.g. "constraint-ledger,state-bag"
+
+    def texts(self) -> Dict[str, str]:
+        """``{"iterate": ..., "plan": ..., "ticket": ...}`` as the individual commands print them."""
+        plan, ticket = self.plan, self.ticket
+        if self.ascii_only:
+            plan, ticket = fold_strings(plan), fold_strings(ticket)
+        plan, ticket = plan_text_from_dict(plan), ticket_text_from_dict(ticket)
+        return {"iterate": self.card.render_text(), "plan": plan, "ticket": ticket}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shapes as ``IterateCard.to_dict``, ``build_plan_dict`` and ``build_ticket_dict``."""
+        out = {"iterate": self.card.to_dict(), "plan": self.plan, "ticket": self.ticket}
+        if self.ascii_only:
+            out["plan"], out["ticket"] = fold_strings(self.plan), fold_strings(self.ticket)
+        return out
+
+
+def build_bundle(
+    seed: str,
+    friction: str,
+    *,
+    pattern: Optional[str] = None,
+    ascii_only: bool = False,
+    client: Optional[str] = None,
+    prompt_brief: Optional[str] = None,
+    real_problem: Optional[str] = None,
+    test_problem: Optional[str] = None,
+    goal: Optional[str] = None,
+    success: Optional[Iterable[str]] = None,
+) -> Bundle:
+    """Resolve the pattern once and derive card, plan and ticket from it.
+
+    Text and dicts match ``make_iterate_card``, ``build_plan_*`` and
+    ``build_ticket_*`` called separately with the same arguments, except
+    that without ``pattern`` the plan follows the pattern the card was
+    classified into rather than the generic summary.
+    """
+    keys, content = resolve_pattern(parse_pattern(pattern) if pattern else (), friction)
+    card = content.build(seed, friction, ascii_only=ascii_only)
+    spec = ",".join(keys)
+    plan = build_plan_dict(seed, friction, pattern=spec)
+    ticket = build_ticket_dict(
+        seed=seed,
+        friction=friction,
+        client=client,
+        prompt_brief=prompt_brief,
+        real_problem=real_problem,
+        test_problem=test_problem,
+        goal=goal,
+        success=success,
+    )
+    return Bundle(card, plan, ticket, ascii_only, spec)
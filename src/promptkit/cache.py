@@ -0,0 +1,241 @@
+"""Content-addressed result cache: in-process LRU plus an optional sqlite tier.
+
+Every PromptKit artifact is a pure function of its inputs and the code that
+renders it, so results are stored under a hash of the inputs, the package
+version and ``OUTPUT_REVISION``. Configuration
+(read once, by ``default_cache()``):
+
+- ``PROMPTKIT_CACHE_SIZE``: in-memory entries (default 1024; 0 disables)
+- ``PROMPTKIT_DISK_CACHE``: ``1`` enables the on-disk tier
+- ``PROMPTKIT_CACHE_DIR``: on-disk location (default ``~/.cache/promptkit``;
+  setting it also enables the disk tier)
+- ``PROMPTKIT_DISK_CACHE_MB``: on-disk size budget (default 64)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from . import __version__
+
+# Bump whenever generated text or JSON changes without a version bump, so
+# persistent (disk) entries rendered by older code are never served.
+OUTPUT_REVISION = 2
+
+
+def make_key(kind: str, params: Mapping[str, Any]) -> str:
+    """SHA-256 over (version, output revision, kind, params); ``params`` must be JSON-serializable."""
+    blob = json.dumps(
+        [__version__, OUTPUT_REVISION, kind, params], sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def normalize_pattern(pattern: Optional[str]) -> str:
+    """Canonical pattern spec for keys: aliases and unknown names collapse like they do in output."""
+    if not pattern:
+        return ""
+    from .cards import parse_pattern
+
+    return ",".join(parse_pattern(pattern))
+
+
+def default_cache_dir() -> Path:
+    configured = os.getenv("PROMPTKIT_CACHE_DIR")
+    if configured:
+        return Path(configured).expanduser()
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return Path(base).expanduser() / "promptkit"
+
+
+class DiskStore:
+    """sqlite-backed tier with least-recently-used eviction by total size."""
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / "results.sqlite3"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, atime REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_atime ON entries (atime)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE entries SET atime = ? WHERE key = ?", (time.time(), key))
+            self._bump("hits" if row is not None else "misses")
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, atime) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% of the budget so eviction doesn't run on every insert.
+        target = int(self.max_bytes * 0.9)
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY atime").fetchall():
+            if total <= target:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self._bump("evictions")
+
+    def _bump(self, name: str) -> None:
+        self._db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            counters = dict(self._db.execute("SELECT name, value FROM counters").fetchall())
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM counters")
+            self._db.execute("VACUUM")
+
+
+class ResultCache:
+    """Two-tier cache of rendered results (strings), keyed by ``make_key``."""
+
+    def __init__(self, max_entries: int = 1024, disk: Optional[DiskStore] = None) -> None:
+        self.max_entries = max_entries
+        self.disk = disk
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self._remember(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def _remember(self, key: str, value: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_compute(self, kind: str, params: Mapping[str, Any], compute: Callable[[], str]) -> str:
+        key = make_key(kind, params)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            out: Dict[str, Any] = {
+                "memory_entries": len(self._memory),
+                "memory_max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+        if self.disk is not None:
+            out["disk"] = self.disk.stats()
+        return out
+
+    def clear(self, *, disk: bool = True) -> None:
+        """Empty the memory tier and reset its counters; also the disk tier unless ``disk=False``."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        if disk and self.disk is not None:
+            self.disk.clear()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def disk_enabled() -> bool:
+    return os.getenv("PROMPTKIT_DISK_CACHE", "0") in {"1", "true", "True"} or bool(os.getenv("PROMPTKIT_CACHE_DIR"))
+
+
+def open_disk_store() -> DiskStore:
+    return DiskStore(default_cache_dir(), _env_int("PROMPTKIT_DISK_CACHE_MB", 64) * 1024 * 1024)
+
+
+_default: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ResultCache:
+    """Process-wide cache configured from the environment (created on first use)."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                disk: Optional[DiskStore] = None
+                if disk_enabled():
+                    try:
+                        disk = open_disk_store()
+                    except (OSError, sqlite3.Error):
+                        disk = None  # unwritable cache dir: run memory-only
+                _default = ResultCache(_env_int("PROMPTKIT_CACHE_SIZE", 1024), disk)
+    return _default
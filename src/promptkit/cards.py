@@ -1,321 +1,681 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import List, Optional
+import dataclasses
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import IO, Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
 
+from .asciifold import iter_ascii, to_ascii
+from .metrics import stage_timer
 
-@dataclass
+
+@dataclass(frozen=True)
+class CardContent:
+    """Static, shareable content of one pattern (everything except seed/friction)."""
+
+    id: str
+    diagnosis: Tuple[str, ...]
+    fix_rules: Tuple[str, ...]
+    prompt_patch: Tuple[str, ...]
+    examples: Tuple[str, ...]
+    validation_scenarios: Tuple[str, ...]
+    validation_pass: Tuple[str, ...]
+    model_considerations: Tuple[str, ...] = ()
+
+    def build(self, seed: str, friction: str, ascii_only: bool = False) -> IterateCard:
+        """Bind seed/friction; the card references this content, nothing is copied."""
+        return IterateCard(self.id, seed, friction, ascii_only=ascii_only, content=self)
+
+
+@dataclass(frozen=True, init=False)
 class IterateCard:
+    """An iterate card: per-card id/seed/friction bound to shared pattern content.
+
+    Cards are immutable and slotted. The list-style fields (``diagnosis``,
+    ``fix_rules``, ...) are read-only tuples served from ``content``, which is
+    normally the registry's own ``CardContent``; use ``replace()`` to derive
+    a modified card (copy-on-write).
+    """
+
+    __slots__ = ("id", "seed", "friction", "content", "ascii_only")
+
     id: str
     seed: str
     friction: str
-    diagnosis: List[str]
-    fix_rules: List[str]
-    prompt_patch: List[str]
-    examples: List[str]
-    validation_scenarios: List[str]
-    validation_pass: List[str]
-    model_considerations: List[str] = field(default_factory=list)
+    content: CardContent
+    ascii_only: bool
+
+    def __init__(
+        self,
+        id: str,
+        seed: str,
+        friction: str,
+        diagnosis: Sequence[str] = (),
+        fix_rules: Sequence[str] = (),
+        prompt_patch: Sequence[str] = (),
+        examples: Sequence[str] = (),
+        validation_scenarios: Sequence[str] = (),
+        validation_pass: Sequence[str] = (),
+        model_considerations: Sequence[str] = (),
+        ascii_only: bool = False,
+        *,
+        content: Optional[CardContent] = None,
+    ) -> None:
+        if content is None:
+            content = _intern(CardContent(
+                id=id,
+                diagnosis=tuple(diagnosis),
+                fix_rules=tuple(fix_rules),
+                prompt_patch=tuple(prompt_patch),
+                examples=tuple(examples),
+                validation_scenarios=tuple(validation_scenarios),
+                validation_pass=tuple(validation_pass),
+                model_considerations=tuple(model_considerations),
+            ))
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "seed", seed)
+        object.__setattr__(self, "friction", friction)
+        object.__setattr__(self, "content", content)
+        object.__setattr__(self, "ascii_only", ascii_only)
+
+    def __reduce__(self) -> tuple:
+        return (_card_from_state, (self.id, self.seed, self.friction, self.content, self.ascii_only))
+
+    diagnosis = property(lambda self: self.content.diagnosis)
+    fix_rules = property(lambda self: self.content.fix_rules)
+    prompt_patch = property(lambda self: self.content.prompt_patch)
+    examples = property(lambda self: self.content.examples)
+    validation_scenarios = property(lambda self: self.content.validation_scenarios)
+    validation_pass = property(lambda self: self.content.validation_pass)
+    model_considerations = property(lambda self: self.content.model_considerations)
+
+    def replace(self, **changes: object) -> IterateCard:
+        """Return a copy with ``changes`` applied; content is only copied if a content field changes."""
+        own = {k: changes.pop(k) for k in ("id", "seed", "friction", "ascii_only") if k in changes}
+        content = self.content
+        if changes:
+            content = _intern(dataclasses.replace(content, **{k: tuple(v) for k, v in changes.items()}))  # type: ignore[arg-type]
+        return IterateCard(
+            own.get("id", self.id),  # type: ignore[arg-type]
+            own.get("seed", self.seed),  # type: ignore[arg-type]
+            own.get("friction", self.friction),  # type: ignore[arg-type]
+            ascii_only=own.get("ascii_only", self.ascii_only),  # type: ignore[arg-type]
+            content=content,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Canonical JSON-ready payload (list fields are the shared tuples, not copies)."""
+        return {
+            "id": self.id,
+            "seed": self.seed,
+            "friction": self.friction,
+            "diagnosis": self.diagnosis,
+            "fix": {
+                "rules": self.fix_rules,
+                "prompt_patch": self.prompt_patch,
+                "examples": self.examples,
+            },
+            "validation": {
+                "scenarios": self.validation_scenarios,
+                "pass_criteria": self.validation_pass,
+            },
+            "model_considerations": self.model_considerations,
+        }
 
     def render_text(self) -> str:
-        lines: List[str] = []
-        lines.append(f"Iterate Card - {self.id}")
+        timer = stage_timer("iterate")
+        text = "".join(self._iter_sections())
+        timer.lap("render")
+        if self.ascii_only:
+            text = to_ascii(text)
+            timer.lap("ascii")
+        timer.done(self.id)
+        return text
+
+    def render_to(self, fp: IO[str]) -> None:
+        """Write the rendered card to a text stream section by section."""
+        fp.writelines(self.iter_render())
+
+    def iter_render(self) -> Iterator[str]:
+        """Yield the rendered card one section at a time (each ends with a newline)."""
+        sections = self._iter_sections()
+        return iter_ascii(sections) if self.ascii_only else sections
+
+    def _iter_sections(self) -> Iterator[str]:
+        yield f"Iterate Card - {self.id}\n"
         # Human summary (deterministic): compress fix rules into a terse line
         if self.fix_rules:
             def _strip(s: str) -> str:
                 return s.strip().strip('"').rstrip('.')
             summary = "; ".join(_strip(r) for r in self.fix_rules)
-            lines.append("- Human summary")
-            lines.append(f"  - {summary}.")
-        lines.append("- Diagnosis")
-        for d in self.diagnosis:
-            lines.append(f"  - {d}")
-        lines.append("- Fix")
-        for r in self.fix_rules:
-            lines.append(f"  - {r}")
-        lines.append("- Prompt patch (drop-in)")
-        for p in self.prompt_patch:
-            lines.append(f"  - {p}")
+            yield f"- Human summary\n  - {summary}.\n"
+        yield _section("- Diagnosis", self.diagnosis, "  - ")
+        yield _section("- Fix", self.fix_rules, "  - ")
+        yield _section("- Prompt patch (drop-in)", self.prompt_patch, "  - ")
         # Where to place in your prompt (heuristic grouping)
-        def _section_for(p: str) -> str:
-            low = p.lower()
-            if any(k in low for k in ["state bag", "ledger", "state:", "constraint ledger"]):
-                return "State/Memory"
-            if any(k in low for k in ["override:", "lock:", "reduce:", "reset", "recognize commands", "override"]):
-                return "Overrides"
-            if any(k in low for k in ["contrast", "clarif", "either/or", "ambiguous"]):
-                return "Clarifiers"
-            if any(k in low for k in ["offer two options", "option a", "option b", "exemplar"]):
-                return "Interaction/Output"
-            return "Rules/Policy"
-        placement: dict[str, List[str]] = {"Rules/Policy": [], "State/Memory": [], "Clarifiers": [], "Overrides": [], "Interaction/Output": []}
+        placement: dict[str, List[str]] = {sec: [] for sec in PLACEMENT_SECTIONS}
         for p in self.prompt_patch:
             placement[_section_for(p)].append(p)
-        lines.append("- Where to place in your prompt")
-        for sec in ["Rules/Policy", "State/Memory", "Clarifiers", "Overrides", "Interaction/Output"]:
-            if placement[sec]:
-                lines.append(f"  - {sec}")
-                for p in placement[sec]:
-                    lines.append(f"    - {p}")
+        yield "".join(
+            ["- Where to place in your prompt\n"]
+            + [_section(f"  - {sec}", placement[sec], "    - ") for sec in PLACEMENT_SECTIONS if placement[sec]]
+        )
         if self.examples:
-            lines.append("- Example phrasing")
-            for e in self.examples:
-                lines.append(f"  - {e}")
-        lines.append("- Validation")
-        lines.append("  - Scenarios")
-        for s in self.validation_scenarios:
-            lines.append(f"    - {s}")
-        lines.append("  - Pass criteria")
-        for pc in self.validation_pass:
-            lines.append(f"    - {pc}")
+            yield _section("- Example phrasing", self.examples, "  - ")
+        yield (
+            "- Validation\n"
+            + _section("  - Scenarios", self.validation_scenarios, "    - ")
+            + _section("  - Pass criteria", self.validation_pass, "    - ")
+        )
         if self.model_considerations:
-            lines.append("- Model considerations")
-            for mc in self.model_considerations:
-                lines.append(f"  - {mc}")
-        return "\n".join(lines) + "\n"
+            yield _section("- Model considerations", self.model_considerations, "  - ")
 
 
-def _matches_close_loop(friction: str) -> bool:
-    text = friction.lower()
-    keywords = [
-        "repeat",
-        "repeats",
-        "repeating",
-        "apology",
-        "apolog",
-        "confirm",
-        "resolution",
-        "close",
-        "loop",
-    ]
-    return any(k in text for k in keywords)
+def _section(heading: str, items: Sequence[str], prefix: str) -> str:
+    return heading + "\n" + "".join(f"{prefix}{item}\n" for item in items)
 
 
-# ---- Pattern builders (no scoring) ----
+# ---- Pattern registry (built once at import; no scoring) ----
 
-def build_constraint_ledger(seed: str, friction: str) -> IterateCard:
-    id_ = "Constraint Ledger"
-    diagnosis = [
+_CONSTRAINT_LEDGER = CardContent(
+    id="Constraint Ledger",
+    diagnosis=(
         "Vague adjectives aren't grounded; constraints get lost",
         "No recap before action; easy to contradict user wishes",
-    ]
-    fix_rules = [
+    ),
+    fix_rules=(
         "Maintain a Constraint Ledger: include, avoid, not-too qualifiers, vibes",
         "Echo constraints after each capture; do not contradict them",
         "Ask only to resolve conflicts or fill missing constraints",
         "Before mixing, recap constraints and confirm",
-    ]
-    prompt_patch = [
+    ),
+    prompt_patch=(
         '"Start a Constraint Ledger: include[], avoid[], not_too[], vibes[]."',
         '"After each user message, echo the ledger succinctly."',
         '"Only ask to resolve conflicts or missing items, not to repeat."',
         '"Before committing, recap ledger and ask: Did I capture this right?"',
-    ]
-    examples = [
+    ),
+    examples=(
         "Heard: bold vibe, not too spicy, buttery. Ledger: include[buttery], avoid[chili], not_too[spicy], vibes[bold]. Did I capture this right?",
-    ]
-    validation_scenarios = [
+    ),
+    validation_scenarios=(
         "'Bold not too spicy' -> ledger avoids heat, keeps richness; confirm",
         "'Sweet but airy' -> ledger keeps light/crisp vibe; propose fitting option",
         "Conflicting term ('spicy' + 'not too spicy') -> ask one clarifier, then lock",
-    ]
-    validation_pass = [
+    ),
+    validation_pass=(
         "Ledger echoed before action; no contradictions",
         "At most one targeted clarifier for conflicts",
         "Final recap + confirmation present",
-    ]
-    return IterateCard(
-        id=id_,
-        seed=seed,
-        friction=friction,
-        diagnosis=diagnosis,
-        fix_rules=fix_rules,
-        prompt_patch=prompt_patch,
-        examples=examples,
-        validation_scenarios=validation_scenarios,
-        validation_pass=validation_pass,
-    )
+    ),
+)
 
-
-def build_contrastive_clarify(seed: str, friction: str) -> IterateCard:
-    id_ = "Contrastive Clarifier"
-    diagnosis = [
+_CONTRASTIVE_CLARIFY = CardContent(
+    id="Contrastive Clarifier",
+    diagnosis=(
         "Ambiguous adjectives branch multiple ways; agent guesses and drifts",
-    ]
-    fix_rules = [
+    ),
+    fix_rules=(
         "Use a single either/or probe to pin meaning",
         "Reflect the chosen meaning and proceed; avoid stacked probes",
         "Prefer concrete contrasts tied to the domain",
-    ]
-    prompt_patch = [
+    ),
+    prompt_patch=(
         '"When a term is ambiguous, ask one contrast: By bold, do you mean richer or spicier?"',
         '"After answer, reflect: Understood, bold=richer. Moving on."',
         '"Do not chain multiple clarifiers back-to-back."',
-    ]
-    examples = [
+    ),
+    examples=(
         "By bold, do you mean richer or spicier? -> Got it, richer.",
-    ]
-    validation_scenarios = [
+    ),
+    validation_scenarios=(
         "User says 'bold' -> one contrastive probe -> choice reflected",
         "User offers own meaning -> accept and proceed without extra probe",
-    ]
-    validation_pass = [
+    ),
+    validation_pass=(
         "Exactly one clarifier for an ambiguity",
         "Reflected choice appears before next step",
-    ]
-    return IterateCard(
-        id=id_, seed=seed, friction=friction,
-        diagnosis=diagnosis, fix_rules=fix_rules,
-        prompt_patch=prompt_patch, examples=examples,
-        validation_scenarios=validation_scenarios,
-        validation_pass=validation_pass,
-    )
-
+    ),
+)
 
-def build_exemplar_propose(seed: str, friction: str) -> IterateCard:
-    id_ = "Exemplar Propose"
-    diagnosis = [
+_EXEMPLAR_PROPOSE = CardContent(
+    id="Exemplar Propose",
+    diagnosis=(
         "Free-form replies stay abstract; users struggle to anchor taste",
-    ]
-    fix_rules = [
+    ),
+    fix_rules=(
         "Propose two tiny exemplars that both fit constraints",
         "Ask which is closer (A or B) or what to tweak",
         "Keep exemplars concrete and minimal (3-4 traits)",
-    ]
-    prompt_patch = [
+    ),
+    prompt_patch=(
         '"Offer two options: Option A: <concrete traits>. Option B: <concrete traits>."',
         '"Ask: Which is closer, A or B? Or what should I tweak?"',
         '"Ensure options respect the current Constraint Ledger."',
-    ]
-    examples = [
+    ),
+    examples=(
         "A) buttery-salty with hint of chili; B) smoky-rich without heat. Closer to A or B?",
-    ]
-    validation_scenarios = [
+    ),
+    validation_scenarios=(
         "With 'not too spicy' in ledger -> both exemplars avoid high heat",
         "User picks A -> recap and confirm before mixing",
-    ]
-    validation_pass = [
+    ),
+    validation_pass=(
         "Exemplars align with constraints",
         "Choice captured and reflected before action",
-    ]
-    return IterateCard(
-        id=id_, seed=seed, friction=friction,
-        diagnosis=diagnosis, fix_rules=fix_rules,
-        prompt_patch=prompt_patch, examples=examples,
-        validation_scenarios=validation_scenarios,
-        validation_pass=validation_pass,
-    )
-
+    ),
+)
 
-def build_override_hook(seed: str, friction: str) -> IterateCard:
-    id_ = "Override Hook"
-    diagnosis = [
+_OVERRIDE_HOOK = CardContent(
+    id="Override Hook",
+    diagnosis=(
         "Staff lacks quick adjustment commands; fixes require redoing the flow",
-    ]
-    fix_rules = [
+    ),
+    fix_rules=(
         "Support simple text commands: override, lock, reduce, reset",
         "Honor overrides immediately and reflect the updated state",
         "Keep a visible list of active overrides",
-    ]
-    prompt_patch = [
+    ),
+    prompt_patch=(
         '"Recognize commands: override:<term>, lock:<term>, reduce:<term>, reset."',
         '"Apply and echo: Applied override:no chili. Active overrides:[no chili]."',
         '"Ensure proposals respect overrides and ledger."',
-    ]
-    examples = [
+    ),
+    examples=(
         "Staff: override: no chili -> Agent: Applied override:no chili. Ledger updated.",
-    ]
-    validation_scenarios = [
+    ),
+    validation_scenarios=(
         "After 'no chili' override -> proposals contain zero chili",
         "Lock 'buttery' -> proposals keep buttery trait across tweaks",
-    ]
-    validation_pass = [
+    ),
+    validation_pass=(
         "Overrides reflected immediately in recap",
         "No contradictions with active overrides",
-    ]
-    return IterateCard(
-        id=id_, seed=seed, friction=friction,
-        diagnosis=diagnosis, fix_rules=fix_rules,
-        prompt_patch=prompt_patch, examples=examples,
-        validation_scenarios=validation_scenarios,
-        validation_pass=validation_pass,
-    )
+    ),
+)
 
-
-def build_state_bag(seed: str, friction: str) -> IterateCard:
-    id_ = "State Bag"
-    diagnosis = [
+_STATE_BAG = CardContent(
+    id="State Bag",
+    diagnosis=(
         "Conversation drifts due to missing explicit state",
         "Contradictions appear because prior constraints aren't echoed",
-    ]
-    fix_rules = [
+    ),
+    fix_rules=(
         "Maintain a State Bag: goal, include[], avoid[], not_too[], memory[], next_step, confirmed=false",
         "After each user message, update and echo state succinctly",
         "Ask only to resolve missing/conflicting items; otherwise proceed",
         "Before finalizing, recap state and set confirmed=true on explicit yes",
-    ]
-    prompt_patch = [
+    ),
+    prompt_patch=(
         '"Maintain State Bag: goal[], include[], avoid[], not_too[], memory[], next_step, confirmed=false."',
         '"After each user message, update and echo state succinctly."',
         '"Ask only to resolve missing/conflicting items; otherwise proceed."',
         '"Before finalizing, recap state and set confirmed=true on explicit yes."',
-    ]
-    examples = [
+    ),
+    examples=(
         "State: goal=custom snack; include[buttery]; avoid[chili]; not_too[spicy]; next_step=propose A/B; confirmed=false.",
-    ]
-    validation_scenarios = [
+    ),
+    validation_scenarios=(
         "Conflict -> one clarifier -> state updated -> proceed",
         "Before action -> state recap -> explicit confirmation",
-    ]
-    validation_pass = [
+    ),
+    validation_pass=(
         "No contradictions against echoed state",
         "<=1 clarifier per conflict; explicit confirmation present",
-    ]
-    return IterateCard(
-        id=id_, seed=seed, friction=friction,
-        diagnosis=diagnosis, fix_rules=fix_rules,
-        prompt_patch=prompt_patch, examples=examples,
-        validation_scenarios=validation_scenarios,
-        validation_pass=validation_pass,
-    )
-
+    ),
+)
 
-def build_slot_filling(seed: str, friction: str) -> IterateCard:
-    id_ = "Slot Filling"
-    diagnosis = [
+_SLOT_FILLING = CardContent(
+    id="Slot Filling",
+    diagnosis=(
         "Repeated questions caused by missing required fields",
         "Fields gathered piecemeal increase user effort",
-    ]
-    fix_rules = [
+    ),
+    fix_rules=(
         "Define required slots: entity, intent, include[], avoid[], not_too[], success_check",
         "Ask only for missing slots; never re-ask captured ones",
         "Echo captured slots and confirm before acting",
-    ]
-    prompt_patch = [
+    ),
+    prompt_patch=(
         '"Required slots: entity, intent, include[], avoid[], not_too[], success_check."',
         '"Ask only for missing slots; do not re-ask captured ones."',
         '"Echo captured slots; confirm summary before acting."',
-    ]
-    examples = [
+    ),
+    examples=(
         "Captured: entity=snack; intent=contrast options; include[buttery]; avoid[chili]; not_too[spicy]. Confirm?",
-    ]
-    validation_scenarios = [
+    ),
+    validation_scenarios=(
         "Partial info -> ask only missing -> summary + confirm",
         "Full info -> no extra asks -> proceed",
-    ]
-    validation_pass = [
+    ),
+    validation_pass=(
         "No redundant asks",
         "Summary + confirmation before action",
-    ]
-    return IterateCard(
-        id=id_, seed=seed, friction=friction,
-        diagnosis=diagnosis, fix_rules=fix_rules,
-        prompt_patch=prompt_patch, examples=examples,
-        validation_scenarios=validation_scenarios,
-        validation_pass=validation_pass,
+    ),
+)
+
+# Fallbacks used when no explicit pattern resolves.
+_CLOSE_THE_LOOP = CardContent(
+    id="Close-The-Loop Control",
+    diagnosis=(
+        "Politeness escalates into repetition (apology/question loops)",
+        "Missing state and exit criteria, so conversations drift",
+    ),
+    fix_rules=(
+        "Use at most one apology total",
+        "Maintain state: issue, next_step, confirmed=false",
+        "Do not repeat a question unless new information was provided",
+        "Before closing, confirm resolution explicitly, then recap next_step",
+    ),
+    prompt_patch=(
+        '"Use at most one apology total."',
+        '"Maintain state: issue, next_step, confirmed=false."',
+        '"Do not repeat a question unless the user provided new information."',
+        '"Before closing, ask: Did we fully handle this today? If yes -> set confirmed=true and recap next_step. If no -> ask what is missing and address it."',
+        '"Close with a crisp recap + next step, no filler."',
+    ),
+    examples=(
+        "Got it -> exchange for size M in black. I'll email the label now. Did we fully handle this today?",
+    ),
+    validation_scenarios=(
+        "Return: user gives order ID -> provide label; ask one confirmation; close on yes",
+        "Exchange (SKU mismatch): propose alternative -> confirm -> recap email/label; no repeated apology",
+        "Policy edge: out-of-window -> one apology + store credit -> confirm acceptance -> close",
+    ),
+    validation_pass=(
+        "<= 1 apology; no repeated identical questions",
+        "Contains explicit confirmation and final recap",
+        "Turns to resolution decrease or stay flat vs baseline",
+    ),
+)
+
+_SMART_INFO_CAPTURE = CardContent(
+    id="Smart Info Capture",
+    diagnosis=(
+        "Multiple re-asks caused by missing upfront data capture",
+        "User effort increases when fields are gathered piecemeal",
+    ),
+    fix_rules=(
+        "Extract order_id, item, reason at the start when feasible",
+        "Echo captured fields and ask only for missing ones",
+        "Prefer structured questions over open-ended repeats",
+        "Summarize captured info before next step",
+    ),
+    prompt_patch=(
+        '"Try to extract: order_id, item, reason upfront."',
+        '"Echo what is captured; only ask for missing fields."',
+        '"Avoid re-asking unless new information appears."',
+        '"Before proceeding, recap the captured info and confirm."',
+    ),
+    examples=(
+        "Thanks -> order 12345, item is blue jacket, exchange to M. Missing: return reason. What's the reason?",
+    ),
+    validation_scenarios=(
+        "Direct exchange -> all fields captured -> single confirm",
+        "Partial info -> only ask missing fields -> recap",
+        "Ambiguous reason -> clarify once, then proceed",
+    ),
+    validation_pass=(
+        "No redundant re-asks; missing-only questions",
+        "Single recap + confirmation before next step",
+        "Lower average turns vs baseline",
+    ),
+)
+
+# Canonical key -> content. Order is the documented pattern order.
+PATTERNS: Mapping[str, CardContent] = MappingProxyType({
+    "constraint-ledger": _CONSTRAINT_LEDGER,
+    "contrastive-clarify": _CONTRASTIVE_CLARIFY,
+    "exemplar-propose": _EXEMPLAR_PROPOSE,
+    "override-hook": _OVERRIDE_HOOK,
+    "state-bag": _STATE_BAG,
+    "slot-filling": _SLOT_FILLING,
+})
+
+FALLBACKS: Mapping[str, CardContent] = MappingProxyType({
+    "close-the-loop": _CLOSE_THE_LOOP,
+    "smart-info-capture": _SMART_INFO_CAPTURE,
+})
+
+# Accepted spelling -> canonical key (canonical keys map to themselves).
+_ALIASES: Mapping[str, str] = MappingProxyType({
+    alias: key
+    for key, aliases in (
+        ("constraint-ledger", ("ledger", "constraint_ledger")),
+        ("contrastive-clarify", ("contrastive", "clarify")),
+        ("exemplar-propose", ("exemplar", "propose")),
+        ("override-hook", ("override", "hook")),
+        ("state-bag", ("state", "bag")),
+        ("slot-filling", ("slots", "form")),
+    )
+    for alias in (key,) + aliases
+})
+
+
+_INTERNED: Mapping[CardContent, CardContent] = MappingProxyType({
+    c: c for c in (*PATTERNS.values(), *FALLBACKS.values())
+})
+
+
+def _intern(content: CardContent) -> CardContent:
+    """Reuse the registry instance when ``content`` equals a registered pattern."""
+    return _INTERNED.get(content, content)
+
+
+def _card_from_state(id: str, seed: str, friction: str, content: CardContent, ascii_only: bool) -> IterateCard:
+    return IterateCard(id, seed, friction, ascii_only=ascii_only, content=_intern(content))
+
+
+def resolve_pattern(name: str) -> Optional[str]:
+    """Return the canonical key for a pattern name or alias, or None if unknown."""
+    return _ALIASES.get(name.strip().lower())
+
+
+@lru_cache(maxsize=512)
+def parse_pattern(pattern: str) -> Tuple[str, ...]:
+    """Resolve a comma-separated pattern spec to canonical keys.
+
+    Unknown names are dropped and repeats collapsed, so ``ledger,clarify`` and
+    ``constraint-ledger, contrastive-clarify`` resolve to the same tuple.
+    """
+    keys: List[str] = []
+    for part in pattern.replace(" ", "").split(","):
+        key = _ALIASES.get(part.strip().lower())
+        if key is not None and key not in keys:
+            keys.append(key)
+    return tuple(keys)
+
+
+def _merge_unique(parts: Sequence[Sequence[str]]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(item for part in parts for item in part))
+
+
+@lru_cache(maxsize=None)
+def _content_for_keys(keys: Tuple[str, ...]) -> CardContent:
+    """Content for canonical keys; combos are merged once and memoized.
+
+    The cache is bounded by the ordered combinations of registered patterns.
+    """
+    if len(keys) == 1:
+        return PATTERNS[keys[0]]
+    parts = [PATTERNS[k] for k in keys]
+    return CardContent(
+        id="Combined: " + " + ".join(keys),
+        diagnosis=_merge_unique([c.diagnosis for c in parts]),
+        fix_rules=_merge_unique([c.fix_rules for c in parts]),
+        prompt_patch=_merge_unique([c.prompt_patch for c in parts]),
+        examples=_merge_unique([c.examples for c in parts]),
+        validation_scenarios=_merge_unique([c.validation_scenarios for c in parts]),
+        validation_pass=_merge_unique([c.validation_pass for c in parts]),
+        model_considerations=_merge_unique([c.model_considerations for c in parts]),
     )
 
 
+# ---- Friction classifier (auto-selection when no pattern is given) ----
+
+# Case-insensitive substring cues per registered key. Declaration order breaks
+# score ties, so Close-The-Loop keeps its historical priority.
+_FRICTION_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "close-the-loop": ("repeat", "apolog", "confirm", "resolution", "close", "loop"),
+    "constraint-ledger": ("constraint", "ignore", "budget", "preference", "allerg", "mismatch", "not too"),
+    "contrastive-clarify": ("ambigu", "vague", "misinterpret", "misread", "adjective", "unclear", "guess"),
+    "exemplar-propose": ("abstract", "impractical", "generic", "concrete", "example", "poetic"),
+    "override-hook": ("override", "staff", "stuck", "reset", "all caps", "can't stop", "cannot stop"),
+    "state-bag": ("drift", "forget", "forgot", "lose track", "loses track", "memory", "contradict", "context"),
+    "slot-filling": ("re-ask", "reask", "asks again", "same question", "missing field", "required field", "piecemeal", "order id"),
+})
+
+_KEYWORD_OWNERS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    kw: tuple(k for k, kws in _FRICTION_KEYWORDS.items() if kw in kws)
+    for kws in _FRICTION_KEYWORDS.values()
+    for kw in kws
+})
+
+# (cue, owning keys) pairs, scanned in declaration order.
+_KEYWORD_PAIRS: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(_KEYWORD_OWNERS.items())
+
+
+def classify_friction(friction: str) -> List[Tuple[str, int]]:
+    """Score every registered pattern against a friction.
+
+    Returns ``(key, score)`` pairs, best first; the score is the number of cue
+    hits. Ties keep registry order. Keys include the ``close-the-loop``
+    fallback; a friction with no hits scores zero everywhere.
+
+    Each cue is a C-level substring search over the lowercased text, counted
+    only when present (``in`` is a cheap slot call; ``str.count`` parses its
+    arguments). On frictions from 20 B to 8 KB this matches or beats a
+    combined regex, flat or prefix-factored, by up to 2x on the long end.
+    """
+    text = friction.lower()
+    scores = dict.fromkeys(_FRICTION_KEYWORDS, 0)
+    for cue, owners in _KEYWORD_PAIRS:
+        if cue in text:
+            hits = text.count(cue)
+            for key in owners:
+                scores[key] += hits
+    return sorted(scores.items(), key=lambda kv: -kv[1])
+
+
+def _auto_resolve(friction: str) -> Tuple[Tuple[str, ...], CardContent]:
+    key, score = classify_friction(friction)[0]
+    if score == 0:
+        return (), _SMART_INFO_CAPTURE
+    if key in FALLBACKS:
+        return (), FALLBACKS[key]
+    return (key,), PATTERNS[key]
+
+
+# ---- Prompt placement ("Where to place in your prompt") ----
+
+PLACEMENT_SECTIONS: Tuple[str, ...] = ("Rules/Policy", "State/Memory", "Clarifiers", "Overrides", "Interaction/Output")
+
+# Cues per section, highest priority first; lines with no cue go to Rules/Policy.
+_SECTION_CUES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("State/Memory", ("state bag", "ledger", "state:", "constraint ledger")),
+    ("Overrides", ("override:", "lock:", "reduce:", "reset", "recognize commands", "override")),
+    ("Clarifiers", ("contrast", "clarif", "either/or", "ambiguous")),
+    ("Interaction/Output", ("offer two options", "option a", "option b", "exemplar")),
+)
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """Regex alternation factored by shared prefixes (longest match wins).
+
+    Under the zero-width lookahead below, every offset of a line is tried;
+    the prefix-factored form rejects most offsets on the first character,
+    where a flat ``a|b|c`` alternation retries every cue.
+    """
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def _emit(node: dict) -> str:
+        alts = [re.escape(ch) + _emit(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(alts) + ")?"
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return _emit(trie)
+
+
+_CUE_RANK: Mapping[str, int] = MappingProxyType({
+    cue: rank for rank, (_, cues) in enumerate(_SECTION_CUES) for cue in cues
+})
+
+# Zero-width lookahead tests every offset, so overlapping cues are all seen.
+_SECTION_RE = re.compile("(?=(" + _trie_pattern(list(_CUE_RANK)) + "))")
+
+
+@lru_cache(maxsize=1024)
+def _classify_section(line: str) -> str:
+    best = len(_SECTION_CUES)
+    for m in _SECTION_RE.finditer(line.lower()):
+        best = min(best, _CUE_RANK[m.group(1)])
+        if best == 0:
+            break
+    return _SECTION_CUES[best][0] if best < len(_SECTION_CUES) else "Rules/Policy"
+
+
+# Registry patch lines are classified once here; other lines hit the scanner.
+_KNOWN_SECTIONS: Mapping[str, str] = MappingProxyType({
+    line: _classify_section(line)
+    for content in (*PATTERNS.values(), *FALLBACKS.values())
+    for line in content.prompt_patch
+})
+
+
+def _section_for(line: str) -> str:
+    return _KNOWN_SECTIONS.get(line) or _classify_section(line)
+
+
+# ---- Pattern builders (no scoring) ----
+
+def build_constraint_ledger(seed: str, friction: str) -> IterateCard:
+    return _CONSTRAINT_LEDGER.build(seed, friction)
+
+
+def build_contrastive_clarify(seed: str, friction: str) -> IterateCard:
+    return _CONTRASTIVE_CLARIFY.build(seed, friction)
+
+
+def build_exemplar_propose(seed: str, friction: str) -> IterateCard:
+    return _EXEMPLAR_PROPOSE.build(seed, friction)
+
+
+def build_override_hook(seed: str, friction: str) -> IterateCard:
+    return _OVERRIDE_HOOK.build(seed, friction)
+
+
+def build_state_bag(seed: str, friction: str) -> IterateCard:
+    return _STATE_BAG.build(seed, friction)
+
+
+def build_slot_filling(seed: str, friction: str) -> IterateCard:
+    return _SLOT_FILLING.build(seed, friction)
+
+
+def resolve_pattern(keys: Tuple[str, ...], friction: str) -> Tuple[Tuple[str, ...], CardContent]:
+    """``resolve_content`` plus the registered keys it settled on.
+
+    Those are ``keys`` as given, else the pattern the friction classified
+    into; ``()`` when a fallback card (Close-The-Loop, Smart Info Capture)
+    applies.
+    """
+    return (keys, _content_for_keys(keys)) if keys else _auto_resolve(friction)
+
+
+def resolve_content(keys: Tuple[str, ...], friction: str) -> CardContent:
+    """Content for canonical ``keys`` (see ``parse_pattern``); with no keys the friction is classified."""
+    return resolve_pattern(keys, friction)[1]
+
+
 def make_iterate_card(
     seed: str,
     friction: str,
@@ -324,151 +684,20 @@ def make_iterate_card(
 ) -> IterateCard:
     """Construct a deterministic iterate card from seed + friction.
 
-    Two lightweight patterns for MVP:
+    Without an explicit pattern, the friction is classified (see
+    ``classify_friction``) and the best-scoring pattern is used:
     - Close-The-Loop Control (when repetition/confirmation issues are present)
-    - Smart Info Capture (fallback)
+    - any registered pattern whose cues dominate the friction
+    - Smart Info Capture (fallback when nothing matches)
     """
 
     # Explicit pattern selection (no scoring). Supports comma-separated combos.
-    if pattern:
-        raw = pattern.strip().lower()
-        keys = [k.strip() for k in raw.replace(" ", "").split(",") if k.strip()]
-
-        def _build_for(k: str) -> Optional[IterateCard]:
-            if k in {"constraint-ledger", "ledger", "constraint_ledger"}:
-                return build_constraint_ledger(seed, friction)
-            if k in {"contrastive-clarify", "contrastive", "clarify"}:
-                return build_contrastive_clarify(seed, friction)
-            if k in {"exemplar-propose", "exemplar", "propose"}:
-                return build_exemplar_propose(seed, friction)
-            if k in {"override-hook", "override", "hook"}:
-                return build_override_hook(seed, friction)
-            if k in {"state-bag", "state", "bag"}:
-                return build_state_bag(seed, friction)
-            if k in {"slot-filling", "slots", "form"}:
-                return build_slot_filling(seed, friction)
-            return None
-
-        if len(keys) == 1:
-            card = _build_for(keys[0])
-        elif len(keys) > 1:
-            built = [c for k in keys if (c := _build_for(k)) is not None]
-            if built:
-                base = built[0]
-                def _merge_unique(a: List[str], b: List[str]) -> List[str]:
-                    seen = set(a)
-                    out = list(a)
-                    for item in b:
-                        if item not in seen:
-                            out.append(item)
-                            seen.add(item)
-                    return out
-                for nxt in built[1:]:
-                    base.diagnosis = _merge_unique(base.diagnosis, nxt.diagnosis)
-                    base.fix_rules = _merge_unique(base.fix_rules, nxt.fix_rules)
-                    base.prompt_patch = _merge_unique(base.prompt_patch, nxt.prompt_patch)
-                    base.examples = _merge_unique(base.examples, nxt.examples)
-                    base.validation_scenarios = _merge_unique(base.validation_scenarios, nxt.validation_scenarios)
-                    base.validation_pass = _merge_unique(base.validation_pass, nxt.validation_pass)
-                base.id = "Combined: " + " + ".join(keys)
-                card = base
-            else:
-                card = None
-        else:
-            card = None
-    else:
-        card = None
-
-    if card is None and _matches_close_loop(friction):
-        id_ = "Close-The-Loop Control"
-        diagnosis = [
-            "Politeness escalates into repetition (apology/question loops)",
-            "Missing state and exit criteria, so conversations drift",
-        ]
-        fix_rules = [
-            "Use at most one apology total",
-            "Maintain state: issue, next_step, confirmed=false",
-            "Do not repeat a question unless new information was provided",
-            "Before closing, confirm resolution explicitly, then recap next_step",
-        ]
-        prompt_patch = [
-            '"Use at most one apology total."',
-            '"Maintain state: issue, next_step, confirmed=false."',
-            '"Do not repeat a question unless the user provided new information."',
-            '"Before closing, ask: Did we fully handle this today? If yes -> set confirmed=true and recap next_step. If no -> ask what is missing and address it."',
-            '"Close with a crisp recap + next step, no filler."',
-        ]
-        examples = [
-            "Got it -> exchange for size M in black. I'll email the label now. Did we fully handle this today?",
-        ]
-        validation_scenarios = [
-            "Return: user gives order ID -> provide label; ask one confirmation; close on yes",
-            "Exchange (SKU mismatch): propose alternative -> confirm -> recap email/label; no repeated apology",
-            "Policy edge: out-of-window -> one apology + store credit -> confirm acceptance -> close",
-        ]
-        validation_pass = [
-            "<= 1 apology; no repeated identical questions",
-            "Contains explicit confirmation and final recap",
-            "Turns to resolution decrease or stay flat vs baseline",
-        ]
-    elif card is None:
-        id_ = "Smart Info Capture"
-        diagnosis = [
-            "Multiple re-asks caused by missing upfront data capture",
-            "User effort increases when fields are gathered piecemeal",
-        ]
-        fix_rules = [
-            "Extract order_id, item, reason at the start when feasible",
-            "Echo captured fields and ask only for missing ones",
-            "Prefer structured questions over open-ended repeats",
-            "Summarize captured info before next step",
-        ]
-        prompt_patch = [
-            '"Try to extract: order_id, item, reason upfront."',
-            '"Echo what is captured; only ask for missing fields."',
-            '"Avoid re-asking unless new information appears."',
-            '"Before proceeding, recap the captured info and confirm."',
-        ]
-        examples = [
-            "Thanks -> order 12345, item is blue jacket, exchange to M. Missing: return reason. What's the reason?",
-        ]
-        validation_scenarios = [
-            "Direct exchange -> all fields captured -> single confirm",
-            "Partial info -> only ask missing fields -> recap",
-            "Ambiguous reason -> clarify once, then proceed",
-        ]
-        validation_pass = [
-            "No redundant re-asks; missing-only questions",
-            "Single recap + confirmation before next step",
-            "Lower average turns vs baseline",
-        ]
-
-    # Prepare the final card object if not chosen earlier
-    if card is None:
-        card = IterateCard(
-            id=id_,
-            seed=seed,
-            friction=friction,
-            diagnosis=diagnosis,
-            fix_rules=fix_rules,
-            prompt_patch=prompt_patch,
-            examples=examples,
-            validation_scenarios=validation_scenarios,
-            validation_pass=validation_pass,
-        )
-
-    # ASCII safety: normalize dashes if requested
-    if ascii_only:
-        def _norm(xs: List[str]) -> List[str]:
-            out: List[str] = []
-            for s in xs:
-                out.append(s.replace("–", "-").replace("—", "-").replace("“", '"').replace("”", '"').replace("’", "'"))
-            return out
-        card.diagnosis = _norm(card.diagnosis)
-        card.fix_rules = _norm(card.fix_rules)
-        card.prompt_patch = _norm(card.prompt_patch)
-        card.examples = _norm(card.examples)
-        card.validation_scenarios = _norm(card.validation_scenarios)
-        card.validation_pass = _norm(card.validation_pass)
-
+    timer = stage_timer("iterate")
+    keys = parse_pattern(pattern) if pattern else ()
+    content = resolve_content(keys, friction)
+    timer.lap("resolve")
+    # ASCII safety: folded once, on the rendered text
+    card = content.build(seed, friction, ascii_only=ascii_only)
+    timer.lap("build")
+    timer.done(content.id)
     return card
@@ -1,49 +1,90 @@
-"""Typer CLI for PromptKit diagnostics (MVP)."""
+"""Typer CLI for PromptKit diagnostics (MVP).
+
+Generator modules are imported inside each command so that ``--help`` and
+unrelated subcommands don't pay for them; ``promptkit.__main__`` adds a
+Typer-free fast path for ``--version`` and top-level help.
+"""
 from __future__ import annotations
 
-import json
-from typing import Optional
+import sys
+from typing import Any, Dict, Iterable, Optional
 
 import typer
 
-from .cards import make_iterate_card
-from .plan import build_plan_text
-from .ticket import build_ticket_text
+from . import __version__
+from .asciifold import resolve_ascii
+
+
+def _emit(chunks: Iterable[str]) -> None:
+    """Stream rendered sections to stdout (trailing blank line, as typer.echo did)."""
+    out = sys.stdout
+    out.writelines(chunks)
+    out.write("\n")
+    out.flush()
+
+
+def _output_format(json_out: bool, compact: bool) -> str:
+    if not json_out:
+        return "text"
+    return "json-compact" if compact else "json"
+
+
+def _emit_result(kind: str, params: Dict[str, Any], fmt: str) -> None:
+    """Print a result from the ``serve`` daemon if one is running, else render it here (through the cache)."""
+    from .daemon import render_or_request
+
+    _emit((render_or_request(kind, params, fmt),))
 
 
 app = typer.Typer(help="PromptKit: Prompt System Diagnostics Framework — stop guessing; diagnose and standardize fixes.")
 
 
+def _version_callback(value: bool) -> None:
+    if value:
+        typer.echo(f"promptkit {__version__}")
+        raise typer.Exit()
+
+
+@app.callback()
+def _main(
+    version: bool = typer.Option(False, "--version", "-V", callback=_version_callback, is_eager=True, help="Show the version and exit"),
+) -> None:
+    pass
+
+
 @app.command()
 def iterate(
     seed: str = typer.Option(..., help="One-line seed (role + goal)"),
     friction: str = typer.Option(..., help="Biggest current friction/failure"),
     pattern: str = typer.Option(None, help="Optional pattern(s): constraint-ledger | contrastive-clarify | exemplar-propose | override-hook | state-bag | slot-filling (comma-separated to combine)"),
-    ascii_only: bool = typer.Option(False, "--ascii", help="Emit ASCII-only output"),
+    ascii_only: Optional[bool] = typer.Option(None, "--ascii/--unicode", help="Emit ASCII-only output (default: auto-detect from stdout encoding)"),
     json_out: bool = typer.Option(False, "--json", help="Return machine-readable JSON"),
+    compact: bool = typer.Option(False, "--compact", help="With --json: no indentation"),
 ) -> None:
     """Generate a single iterate card (Diagnosis -> Fix -> Validation)."""
 
-    card = make_iterate_card(seed, friction, ascii_only=ascii_only, pattern=pattern)
+    from .cache import normalize_pattern
+
+    params = {"seed": seed, "friction": friction, "pattern": normalize_pattern(pattern), "ascii": resolve_ascii(ascii_only)}
+    _emit_result("iterate", params, _output_format(json_out, compact))
+
+
+@app.command()
+def classify(
+    friction: str = typer.Option(..., help="Biggest current friction/failure"),
+    json_out: bool = typer.Option(False, "--json", help="Return machine-readable JSON"),
+) -> None:
+    """Score every pattern against a friction (what auto-selection would pick)."""
+
+    from .cards import classify_friction
+    from .jsonio import dumps
+
+    scores = classify_friction(friction)
     if json_out:
-        payload = {
-            "id": card.id,
-            "seed": card.seed,
-            "friction": card.friction,
-            "diagnosis": card.diagnosis,
-            "fix": {
-                "rules": card.fix_rules,
-                "prompt_patch": card.prompt_patch,
-                "examples": card.examples,
-            },
-            "validation": {
-                "scenarios": card.validation_scenarios,
-                "pass_criteria": card.validation_pass,
-            },
-        }
-        typer.echo(json.dumps(payload, ensure_ascii=ascii_only, indent=2))
+        typer.echo(dumps([{"pattern": k, "score": v} for k, v in scores]))
     else:
-        typer.echo(card.render_text())
+        for key, score in scores:
+            typer.echo(f"{score:3d}  {key}")
 
 
 @app.command()
@@ -51,12 +92,16 @@ def plan(
     seed: str = typer.Option(..., help="One-line seed (role + goal)"),
     friction: str = typer.Option(..., help="Observed issue / biggest friction"),
     pattern: str = typer.Option(None, help="Optional pattern to emphasize in plan"),
-    ascii_only: bool = typer.Option(False, "--ascii", help="Emit ASCII-only output"),
+    ascii_only: Optional[bool] = typer.Option(None, "--ascii/--unicode", help="Emit ASCII-only output (default: auto-detect from stdout encoding)"),
+    json_out: bool = typer.Option(False, "--json", help="Return machine-readable JSON"),
+    compact: bool = typer.Option(False, "--compact", help="With --json: no indentation"),
 ) -> None:
     """Generate a compact plan (Context, Objective, Flow, Reasoning Path, Output)."""
 
-    text = build_plan_text(seed=seed, friction=friction, pattern=pattern, ascii_only=ascii_only)
-    typer.echo(text)
+    from .cache import normalize_pattern
+
+    params = {"seed": seed, "friction": friction, "pattern": normalize_pattern(pattern), "ascii": resolve_ascii(ascii_only)}
+    _emit_result("plan", params, _output_format(json_out, compact))
 
 
 @app.command()
@@ -69,22 +114,232 @@ def ticket(
     test_problem: str = typer.Option(None, help="What this validates about PromptKit"),
     goal: str = typer.Option(None, help="What success looks like"),
     success: list[str] = typer.Option(None, "--success", help="Add success criterion (repeatable)"),
-    ascii_only: bool = typer.Option(False, "--ascii", help="Emit ASCII-only output"),
+    ascii_only: Optional[bool] = typer.Option(None, "--ascii/--unicode", help="Emit ASCII-only output (default: auto-detect from stdout encoding)"),
+    json_out: bool = typer.Option(False, "--json", help="Return machine-readable JSON"),
+    compact: bool = typer.Option(False, "--compact", help="With --json: no indentation"),
 ) -> None:
     """Print a PromptKit ticket (template filled from args)."""
 
-    text = build_ticket_text(
-        seed=seed,
-        friction=friction,
+    params = {
+        "seed": seed,
+        "friction": friction,
+        "client": client,
+        "prompt_brief": prompt_brief,
+        "real_problem": real_problem,
+        "test_problem": test_problem,
+        "goal": goal,
+        "success": list(success or []),
+        "ascii": resolve_ascii(ascii_only),
+    }
+    _emit_result("ticket", params, _output_format(json_out, compact))
+
+
+@app.command()
+def tickets(
+    input: str = typer.Option(..., "--input", help="CSV (header row) or JSONL file of ticket fields ('-' for stdin)"),
+    fmt: Optional[str] = typer.Option(None, "--format", help="csv | jsonl (default: from the file extension, else csv)"),
+    column: list[str] = typer.Option(None, "--column", help="Map a header onto a field, e.g. 'Account=client' (repeatable)"),
+    output: str = typer.Option("-", "--output", help="Concatenated tickets ('-' for stdout)"),
+    out_dir: Optional[str] = typer.Option(None, "--out-dir", help="Write one file per client here instead"),
+    errors: Optional[str] = typer.Option(None, help="Side file for rows that can't be used (default: stderr)"),
+    ascii_only: bool = typer.Option(False, "--ascii", help="Emit ASCII-only output"),
+    json_out: bool = typer.Option(False, "--json", help="JSONL of structured tickets instead of text"),
+) -> None:
+    """Generate tickets in bulk from a spreadsheet export (streaming, row by row)."""
+
+    from pathlib import Path
+
+    from .batch import open_text
+    from .ticket import iter_ticket_records, normalize_field, write_tickets
+
+    fmt = (fmt or ("jsonl" if input.lower().endswith((".jsonl", ".ndjson")) else "csv")).strip().lower()
+    if fmt not in ("csv", "jsonl"):
+        raise typer.BadParameter("format must be one of: csv | jsonl", param_hint="--format")
+    columns: Dict[str, str] = {}
+    for spec in column or []:
+        header, sep, field = spec.rpartition("=")
+        if not sep or not header:
+            raise typer.BadParameter(f"expected HEADER=FIELD, got {spec!r}", param_hint="--column")
+        try:
+            columns[header] = normalize_field(field)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--column")
+
+    if input == "-":
+        src = sys.stdin
+    else:
+        # csv wants newline=""; spreadsheet exports often start with a BOM.
+        src = open(input, "r", encoding="utf-8-sig", newline="" if fmt == "csv" else None)
+    directory = Path(out_dir) if out_dir else None
+    if directory is not None:
+        directory.mkdir(parents=True, exist_ok=True)
+    out = open_text(output, "w") if directory is None else None
+    err = open_text(errors, "w") if errors else sys.stderr
+    try:
+        written, failed = write_tickets(
+            iter_ticket_records(src, fmt, columns), out, err,
+            out_dir=directory, ascii_only=ascii_only, json_out=json_out,
+        )
+    finally:
+        for fp in (src, out, err):
+            if fp is not None and fp not in (sys.stdin, sys.stdout, sys.stderr):
+                fp.close()
+    typer.echo(f"tickets: {written} written, {failed} failed", err=True)
+
+
+@app.command("all")
+def all_artifacts(
+    seed: str = typer.Option(..., help="One-line seed (role + goal)"),
+    friction: str = typer.Option(..., help="Observed issue / biggest friction"),
+    pattern: str = typer.Option(None, help="Optional pattern(s), as for iterate"),
+    client: str = typer.Option(None, help="Client name (ticket)"),
+    prompt_brief: str = typer.Option(None, help="One-sentence prompt brief (ticket)"),
+    real_problem: str = typer.Option(None, help="What is failing in production (ticket)"),
+    test_problem: str = typer.Option(None, help="What this validates about PromptKit (ticket)"),
+    goal: str = typer.Option(None, help="What success looks like (ticket)"),
+    success: list[str] = typer.Option(None, "--success", help="Add success criterion (repeatable, ticket)"),
+    out_dir: Optional[str] = typer.Option(None, "--out-dir", help="Write iterate/plan/ticket files here instead of stdout"),
+    ascii_only: Optional[bool] = typer.Option(None, "--ascii/--unicode", help="Emit ASCII-only output (default: auto-detect from stdout encoding)"),
+    json_out: bool = typer.Option(False, "--json", help="One JSON document {iterate, plan, ticket} (or .json files with --out-dir)"),
+    compact: bool = typer.Option(False, "--compact", help="With --json: no indentation"),
+) -> None:
+    """Generate the iterate card, plan and ticket together (pattern resolved once)."""
+
+    from pathlib import Path
+
+    from .bundle import ARTIFACTS, build_bundle
+    from .jsonio import dumps
+
+    ascii_only = resolve_ascii(ascii_only)
+    bundle = build_bundle(
+        seed,
+        friction,
+        pattern=pattern,
+        ascii_only=ascii_only,
         client=client,
         prompt_brief=prompt_brief,
         real_problem=real_problem,
         test_problem=test_problem,
         goal=goal,
         success=success,
-        ascii_only=ascii_only,
     )
-    typer.echo(text)
+    if out_dir is None:
+        if json_out:
+            _emit((dumps(bundle.to_dict(), compact=compact, ascii_only=ascii_only),))
+        else:
+            texts = bundle.texts()
+            _emit(("\n".join(texts[name] for name in ARTIFACTS),))
+        return
+
+    directory = Path(out_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    if json_out:
+        files = {f"{name}.json": dumps(doc, compact=compact, ascii_only=ascii_only) + "\n" for name, doc in bundle.to_dict().items()}
+    else:
+        files = {f"{name}.txt": text for name, text in bundle.texts().items()}
+    for filename, content in files.items():
+        (directory / filename).write_text(content, encoding="utf-8")
+    typer.echo(f"Wrote {', '.join(files)} to {directory}", err=True)
+
+
+@app.command()
+def batch(
+    input: str = typer.Option(..., "--input", help="JSONL records {seed, friction[, pattern, id, client, ...]} ('-' for stdin)"),
+    output: str = typer.Option("-", "--output", help="JSONL results ('-' for stdout)"),
+    mode: str = typer.Option("iterate", help="iterate | plan | ticket | all"),
+    workers: int = typer.Option(1, help="Worker processes (0 = one per CPU)"),
+    chunk_size: int = typer.Option(256, help="Records per worker task"),
+    ordered: bool = typer.Option(True, "--ordered/--unordered", help="Keep input order (or write as chunks finish)"),
+    errors: Optional[str] = typer.Option(None, help="Side file for per-record errors (default: <output>.errors.jsonl, or stderr)"),
+    ascii_only: bool = typer.Option(False, "--ascii", help="Emit ASCII-only output"),
+    json_out: bool = typer.Option(False, "--json", help="Structured JSON per mode instead of rendered text"),
+) -> None:
+    """Generate artifacts for many records (streaming JSONL in/out, process pool)."""
+
+    from .batch import BATCH_MODES, open_text, run_batch
+
+    mode = mode.strip().lower()
+    if mode not in BATCH_MODES:
+        raise typer.BadParameter(f"mode must be one of: {' | '.join(BATCH_MODES)}", param_hint="--mode")
+    if errors is None:
+        errors = f"{output}.errors.jsonl" if output != "-" else None
+    src = open_text(input, "r")
+    out = open_text(output, "w")
+    err = open_text(errors, "w") if errors else sys.stderr
+    try:
+        written, failed = run_batch(
+            src, out, err,
+            mode=mode, ascii_only=ascii_only, structured=json_out, workers=workers, chunk_size=chunk_size, ordered=ordered,
+        )
+    finally:
+        for fp in (src, out, err):
+            if fp not in (sys.stdin, sys.stdout, sys.stderr):
+                fp.close()
+    typer.echo(f"batch: {written} written, {failed} failed", err=True)
+
+
+@app.command()
+def serve(
+    socket_path: Optional[str] = typer.Option(None, "--socket", help="Unix socket to listen on (default: $PROMPTKIT_SOCKET, else $XDG_RUNTIME_DIR/promptkit.sock)"),
+) -> None:
+    """Keep generators and caches warm; iterate/plan/ticket use this daemon automatically."""
+
+    from .daemon import default_socket_path, serve as run_daemon
+
+    def _ready(path: str) -> None:
+        typer.echo(f"promptkit serve: listening on {path} (Ctrl+C to stop)", err=True)
+        if path != default_socket_path():
+            typer.echo(f"promptkit serve: clients need PROMPTKIT_SOCKET={path}", err=True)
+
+    try:
+        run_daemon(socket_path, ready=_ready)
+    except RuntimeError as exc:
+        typer.echo(f"promptkit serve: {exc}", err=True)
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+cache_app = typer.Typer(help="Inspect or clear the result cache.")
+app.add_typer(cache_app, name="cache")
+
+
+@cache_app.command("stats")
+def cache_stats() -> None:
+    """Show hit/miss counters for the in-process LRU (of the running daemon) and the on-disk tier."""
+
+    from .cache import disk_enabled, open_disk_store
+    from .daemon import cache_stats as daemon_cache_stats
+    from .jsonio import dumps
+
+    # Each CLI invocation starts with an empty LRU; the long-lived one is the daemon's.
+    memory = daemon_cache_stats()
+    typer.echo(dumps({
+        "memory": memory,
+        "disk": open_disk_store().stats() if disk_enabled() else None,
+    }))
+    if memory is None:
+        typer.echo("No daemon running (promptkit serve); the in-process LRU lives only as long as each command.", err=True)
+    if not disk_enabled():
+        typer.echo("Disk cache disabled (set PROMPTKIT_DISK_CACHE=1 or PROMPTKIT_CACHE_DIR to enable).", err=True)
+
+
+@cache_app.command("clear")
+def cache_clear() -> None:
+    """Delete every cached result and reset the counters (disk tier and the running daemon's LRU)."""
+
+    from .cache import disk_enabled, open_disk_store
+    from .daemon import cache_clear as daemon_cache_clear
+
+    # Otherwise the daemon would keep answering from its LRU.
+    if daemon_cache_clear():
+        typer.echo("Cleared the daemon's in-process cache")
+    if not disk_enabled():
+        typer.echo("Disk cache disabled; nothing to clear on disk.")
+        return
+    store = open_disk_store()
+    store.clear()
+    typer.echo(f"Cleared {store.path}")
 
 
 def app_main() -> None:  # pragma: no cover
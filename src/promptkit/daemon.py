@@ -0,0 +1,338 @@
+"""Warm ``promptkit serve`` daemon and the thin client the CLI uses to reach it.
+
+Protocol: line-delimited JSON over a Unix socket, one object per line each
+way. A connection may carry any number of requests.
+
+    -> {"v": "<version>", "kind": "iterate", "params": {...}, "format": "text"}
+    <- {"ok": true, "text": "..."}
+    <- {"ok": false, "error": "ValueError: ..."}
+
+``kind`` is ``iterate``, ``plan``, ``ticket``, ``ping``, ``stats`` (the
+daemon's in-process cache counters, ``{"ok": true, "stats": {...}}``) or
+``clear`` (empties that in-process cache, ``{"ok": true}``); ``format`` is
+``text``, ``json`` or ``json-compact``. ``params`` are the same normalized
+inputs the result cache keys on (see ``render``). Requests from a different
+PromptKit version are refused so a stale daemon never answers for new code.
+
+The client side (``request``/``render_or_request``/``try_client``) only
+imports ``json``, ``os`` and ``socket``; generators load on first in-process
+render. ``try_client`` is what ``python -m promptkit`` uses to answer
+``iterate``/``plan``/``ticket`` through a running daemon without importing
+Typer at all.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from . import __version__
+
+
+KINDS = ("iterate", "plan", "ticket")
+FORMATS = ("text", "json", "json-compact")
+
+_CONNECT_TIMEOUT = 0.5
+
+
+def default_socket_path() -> str:
+    """``PROMPTKIT_SOCKET``, else ``$XDG_RUNTIME_DIR/promptkit.sock``, else a per-user path in the temp dir."""
+    configured = os.getenv("PROMPTKIT_SOCKET")
+    if configured:
+        return os.path.expanduser(configured)
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "promptkit.sock")
+    import tempfile
+
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), f"promptkit-{uid}.sock")
+
+
+def _owned_socket(path: str) -> bool:
+    """True if ``path`` is a socket owned by this user and closed to everyone else.
+
+    The temp-dir fallback path is predictable, so another local user could
+    create it first and answer (or record) every request; such a socket is
+    ignored and generation stays in-process.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    import stat
+
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def render(kind: str, params: Mapping[str, Any], fmt: str) -> str:
+    """Render one artifact from normalized params (``seed``, ``friction``, ``pattern``, ``ascii``; ticket fields for tickets)."""
+    from .jsonio import dumps
+
+    if kind not in KINDS:
+        raise ValueError(f"Unsupported kind: {kind}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    json_out = fmt != "text"
+    seed, friction, ascii_only = params["seed"], params["friction"], bool(params.get("ascii"))
+    pattern = params.get("pattern") or None
+
+    payload: Any
+    if kind == "iterate":
+        from .cards import make_iterate_card
+
+        card = make_iterate_card(seed, friction, ascii_only=ascii_only, pattern=pattern)
+        payload = card.to_dict() if json_out else card.render_text()
+    elif kind == "plan":
+        from .plan import build_plan_dict, build_plan_text
+
+        build_plan = build_plan_dict if json_out else build_plan_text
+        payload = build_plan(seed=seed, friction=friction, pattern=pattern, ascii_only=ascii_only)
+    else:
+        from .ticket import build_ticket_dict, build_ticket_text
+
+        build_ticket = build_ticket_dict if json_out else build_ticket_text
+        payload = build_ticket(
+            seed=seed,
+            friction=friction,
+            client=params.get("client"),
+            prompt_brief=params.get("prompt_brief"),
+            real_problem=params.get("real_problem"),
+            test_problem=params.get("test_problem"),
+            goal=params.get("goal"),
+            success=params.get("success"),
+            ascii_only=ascii_only,
+        )
+    if json_out:
+        return dumps(payload, compact=fmt == "json-compact", ascii_only=ascii_only)
+    return payload
+
+
+def render_cached(kind: str, params: Mapping[str, Any], fmt: str) -> str:
+    """``render`` through the shared result cache."""
+    from .cache import default_cache
+
+    return default_cache().get_or_compute(kind, {**params, "format": fmt}, lambda: render(kind, params, fmt))
+
+
+def daemon_enabled() -> bool:
+    return os.getenv("PROMPTKIT_NO_DAEMON", "0") not in {"1", "true", "True"} and hasattr(socket, "AF_UNIX")
+
+
+def request(
+    kind: str,
+    params: Mapping[str, Any],
+    fmt: str,
+    *,
+    path: Optional[str] = None,
+    timeout: float = 10.0,
+) -> Optional[str]:
+    """Ask a running daemon for a result; ``None`` when there is no usable daemon."""
+    reply = _exchange({"kind": kind, "params": dict(params), "format": fmt}, path, timeout)
+    return reply.get("text") if reply is not None else None
+
+
+def cache_stats(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """The running daemon's in-process cache counters (``ResultCache.stats`` without the disk tier)."""
+    reply = _exchange({"kind": "stats"}, path, 2.0)
+    return reply.get("stats") if reply is not None else None
+
+
+def cache_clear(path: Optional[str] = None) -> bool:
+    """Empty the running daemon's in-process cache; ``False`` if no daemon answered."""
+    return _exchange({"kind": "clear"}, path, 2.0) is not None
+
+
+def _exchange(message: Dict[str, Any], path: Optional[str], timeout: float) -> Optional[Dict[str, Any]]:
+    """One request/reply round trip; ``None`` when there is no usable daemon or it reports an error."""
+    path = path or default_socket_path()
+    if not daemon_enabled() or not _owned_socket(path):
+        return None
+    line = json.dumps({"v": __version__, **message}, ensure_ascii=False)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(_CONNECT_TIMEOUT)
+            sock.connect(path)
+            sock.settimeout(timeout)
+            sock.sendall(line.encode("utf-8") + b"\n")
+            with sock.makefile("rb") as fp:
+                raw = fp.readline()
+        reply = json.loads(raw)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(reply, dict) or not reply.get("ok"):
+        return None
+    return reply
+
+
+def render_or_request(kind: str, params: Mapping[str, Any], fmt: str) -> str:
+    """Use the daemon when one is listening; otherwise render (and cache) in-process."""
+    text = request(kind, params, fmt)
+    return text if text is not None else render_cached(kind, params, fmt)
+
+
+_TICKET_OPTIONS = ("client", "prompt-brief", "real-problem", "test-problem", "goal")
+
+
+def _parse_client_args(kind: str, argv: List[str]) -> Optional[Dict[str, Any]]:
+    """Mirror the CLI options of ``kind``; ``None`` for anything the full CLI should handle (help, errors)."""
+    import argparse
+
+    class _Parser(argparse.ArgumentParser):
+        def error(self, message: str) -> None:  # type: ignore[override]
+            raise ValueError(message)
+
+    parser = _Parser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--seed", required=True)
+    parser.add_argument("--friction", required=True)
+    parser.add_argument("--ascii", dest="ascii_only", action="store_const", const=True, default=None)
+    parser.add_argument("--unicode", dest="ascii_only", action="store_const", const=False)
+    parser.add_argument("--json", dest="json_out", action="store_true")
+    parser.add_argument("--compact", action="store_true")
+    if kind == "ticket":
+        for name in _TICKET_OPTIONS:
+            parser.add_argument(f"--{name}")
+        parser.add_argument("--success", action="append")
+    else:
+        parser.add_argument("--pattern")
+    try:
+        return vars(parser.parse_args(argv))
+    except ValueError:
+        return None
+
+
+def try_client(argv: List[str]) -> bool:
+    """Answer ``iterate|plan|ticket [options]`` through a running daemon; ``False`` if it can't."""
+    if not argv or argv[0] not in KINDS:
+        return False
+    if not daemon_enabled() or not _owned_socket(default_socket_path()):
+        return False
+    kind = argv[0]
+    opts = _parse_client_args(kind, argv[1:])
+    if opts is None:
+        return False
+    from .asciifold import resolve_ascii
+
+    params: Dict[str, Any] = {"seed": opts["seed"], "friction": opts["friction"]}
+    if kind == "ticket":
+        for name in _TICKET_OPTIONS:
+            params[name.replace("-", "_")] = opts[name.replace("-", "_")]
+        params["success"] = opts["success"] or []
+    else:
+        params["pattern"] = opts["pattern"] or ""  # raw spelling; the daemon normalizes
+    params["ascii"] = resolve_ascii(opts["ascii_only"])
+    fmt = "text" if not opts["json_out"] else ("json-compact" if opts["compact"] else "json")
+    text = request(kind, params, fmt)
+    if text is None:
+        return False
+    import sys
+
+    sys.stdout.write(text + "\n")
+    sys.stdout.flush()
+    return True
+
+
+def handle_line(raw: bytes) -> Dict[str, Any]:
+    """Answer one protocol line."""
+    try:
+        msg = json.loads(raw)
+        if not isinstance(msg, dict):
+            raise ValueError("request must be a JSON object")
+        if msg.get("v") != __version__:
+            raise ValueError(f"version mismatch: daemon runs {__version__}, client sent {msg.get('v')}")
+        kind = msg.get("kind")
+        if kind == "ping":
+            return {"ok": True, "version": __version__, "pid": os.getpid()}
+        if kind == "stats":
+            from .cache import default_cache
+
+            stats = default_cache().stats()
+            stats.pop("disk", None)  # shared with the CLI, which reads it directly
+            return {"ok": True, "pid": os.getpid(), "stats": stats}
+        if kind == "clear":
+            from .cache import default_cache
+
+            default_cache().clear(disk=False)  # the CLI clears the shared disk tier itself
+            return {"ok": True, "pid": os.getpid()}
+        params = msg.get("params")
+        if not isinstance(params, dict):
+            raise ValueError("'params' must be an object")
+        if kind in ("iterate", "plan"):
+            from .cache import normalize_pattern
+
+            params["pattern"] = normalize_pattern(params.get("pattern"))
+        return {"ok": True, "text": render_cached(kind, params, msg.get("format", "text"))}
+    except Exception as exc:  # report to the client; the daemon keeps serving
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _socket_in_use(path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(_CONNECT_TIMEOUT)
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def serve(path: Optional[str] = None, ready: Optional[Callable[[str], None]] = None) -> None:
+    """Listen on ``path`` until interrupted (SIGINT/SIGTERM), one thread per connection.
+
+    Raises ``RuntimeError`` if another daemon already answers on ``path`` or
+    ``path`` is anything but a socket owned by this user; a stale socket left
+    by a crashed daemon is replaced. ``ready`` is
+    called with the path once the socket is bound.
+    """
+    import signal
+    import socketserver
+    import sys
+
+    from .cards import PATTERNS  # noqa: F401  (load the registry before the first request)
+    from .jsonio import dumps
+    from . import plan, ticket  # noqa: F401
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix sockets are not available on this platform")
+    path = path or default_socket_path()
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        pass
+    else:
+        import stat
+
+        if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+            raise RuntimeError(f"{path} exists and is not a socket owned by this user; refusing to replace it")
+        if _socket_in_use(path):
+            raise RuntimeError(f"a daemon is already listening on {path}")
+        os.unlink(path)
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for raw in self.rfile:
+                if raw.strip():
+                    reply = dumps(handle_line(raw), compact=True)
+                    self.wfile.write(reply.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+    class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    old_umask = os.umask(0o177)  # socket is owner-only
+    try:
+        server = _Server(path, _Handler)
+    finally:
+        os.umask(old_umask)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    if ready is not None:
+        ready(path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
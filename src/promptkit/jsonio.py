@@ -0,0 +1,58 @@
+"""JSON encoding for PromptKit payloads, using orjson or msgspec when installed."""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, Optional, Tuple
+
+
+Encoder = Callable[[Any, bool], str]
+
+
+def _stdlib(obj: Any, compact: bool, ascii_only: bool = False) -> str:
+    if compact:
+        return json.dumps(obj, ensure_ascii=ascii_only, separators=(",", ":"))
+    return json.dumps(obj, ensure_ascii=ascii_only, indent=2)
+
+
+def _load_fast() -> Tuple[str, Optional[Encoder]]:
+    """Pick the fastest available encoder (``PROMPTKIT_JSON=stdlib`` opts out)."""
+    choice = os.getenv("PROMPTKIT_JSON", "").strip().lower()
+    if choice == "stdlib":
+        return "stdlib", None
+    if choice in {"", "orjson"}:
+        try:
+            import orjson
+        except ImportError:
+            pass
+        else:
+            def _orjson(obj: Any, compact: bool) -> str:
+                return orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2).decode("utf-8")
+            return "orjson", _orjson
+    if choice in {"", "msgspec"}:
+        try:
+            import msgspec
+        except ImportError:
+            pass
+        else:
+            _encode = msgspec.json.Encoder().encode
+
+            def _msgspec(obj: Any, compact: bool) -> str:
+                raw = _encode(obj)
+                return (raw if compact else msgspec.json.format(raw, indent=2)).decode("utf-8")
+            return "msgspec", _msgspec
+    return "stdlib", None
+
+
+BACKEND, _fast = _load_fast()
+
+
+def dumps(obj: Any, *, compact: bool = False, ascii_only: bool = False) -> str:
+    """Serialize ``obj``: two-space indent by default, no whitespace with ``compact``.
+
+    The fast encoders always emit UTF-8, so ``ascii_only`` (``\\uXXXX``
+    escapes) goes through the standard library.
+    """
+    if _fast is None or ascii_only:
+        return _stdlib(obj, compact, ascii_only)
+    return _fast(obj, compact)
@@ -1,48 +1,105 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 
+from .asciifold import fold_strings, to_ascii
+from .cards import parse_pattern
+from .metrics import stage_timer
 
-def _ascii(text: str, enabled: bool) -> str:
-    if not enabled:
-        return text
+
+# (reasoning change, benefit) per canonical pattern key.
+_SUMMARIES: Mapping[str, Tuple[str, str]] = MappingProxyType({
+    "constraint-ledger": (
+        "Keep a Constraint Ledger (include/avoid/not-too/vibes), echo after each capture, and confirm before mixing",
+        "prevents contradictions and preserves user intent",
+    ),
+    "contrastive-clarify": (
+        "Use a single contrastive clarifier for ambiguous terms, reflect the choice, then proceed",
+        "reduces guessing and keeps momentum",
+    ),
+    "exemplar-propose": (
+        "Offer two tiny exemplars that fit constraints; ask which is closer or what to tweak",
+        "anchors vague requests without long back-and-forth",
+    ),
+    "override-hook": (
+        "Add simple staff commands (override/lock/reduce/reset) that apply immediately and are echoed",
+        "enables fast corrections without restarting the flow",
+    ),
+    "state-bag": (
+        "Maintain a State Bag (goal/include/avoid/not-too/memory/next step), update and echo it each turn, and recap before confirming",
+        "stops drift and keeps later turns consistent with earlier ones",
+    ),
+    "slot-filling": (
+        "Define the required slots, ask only for missing ones, and echo the captured slots before acting",
+        "removes repeated questions and piecemeal data gathering",
+    ),
+})
+
+_GENERIC_SUMMARY = (
+    "Introduce lightweight rules: keep constraints, ask only to resolve gaps, and confirm before acting",
+    "turns ambiguous input into reliable actions",
+)
+
+
+def _lower_first(text: str) -> str:
+    return text[:1].lower() + text[1:]
+
+
+@lru_cache(maxsize=None)
+def _summary_for_keys(keys: Tuple[str, ...]) -> Tuple[str, str]:
+    """Change/benefit for canonical keys; combos are merged once and memoized."""
+    if not keys:
+        return _GENERIC_SUMMARY
+    changes, benefits = zip(*(_SUMMARIES[k] for k in keys))
     return (
-        text.replace("—", "-")
-        .replace("–", "-")
-        .replace("“", '"')
-        .replace("”", '"')
-        .replace("’", "'")
+        "; ".join([changes[0], *map(_lower_first, changes[1:])]),
+        "; ".join(benefits),
     )
 
 
-def _pattern_summary(pattern: Optional[str]) -> Tuple[str, str]:
-    key = (pattern or "").strip().lower()
-    if key in {"constraint-ledger", "ledger", "constraint_ledger"}:
-        change = (
-            "Keep a Constraint Ledger (include/avoid/not-too/vibes), echo after each capture, and confirm before mixing"
-        )
-        benefit = "prevents contradictions and preserves user intent"
-    elif key in {"contrastive-clarify", "contrastive", "clarify"}:
-        change = (
-            "Use a single contrastive clarifier for ambiguous terms, reflect the choice, then proceed"
-        )
-        benefit = "reduces guessing and keeps momentum"
-    elif key in {"exemplar-propose", "exemplar", "propose"}:
-        change = (
-            "Offer two tiny exemplars that fit constraints; ask which is closer or what to tweak"
-        )
-        benefit = "anchors vague requests without long back-and-forth"
-    elif key in {"override-hook", "override", "hook"}:
-        change = (
-            "Add simple staff commands (override/lock/reduce/reset) that apply immediately and are echoed"
-        )
-        benefit = "enables fast corrections without restarting the flow"
-    else:
-        change = (
-            "Introduce lightweight rules: keep constraints, ask only to resolve gaps, and confirm before acting"
-        )
-        benefit = "turns ambiguous input into reliable actions"
-    return change, benefit
+_OBJECTIVE = "Guide the assistant to interpret natural speech reliably and reach a confirmed outcome without repetition."
+_OUTPUT = "Clear recap of constraints, one concise clarifier if needed, two fitting options or direct next step, and a confirmation before finalizing."
+
+
+def _plan_parts(seed: str, friction: str, keys: Tuple[str, ...]) -> Dict[str, Any]:
+    change, benefit = _summary_for_keys(keys)
+    return {
+        "context": {"seed": seed, "observed_issue": friction},
+        "objective": _OBJECTIVE,
+        "flow": [
+            "Problem statement: The assistant sounds friendly but misreads intent from vague wording.",
+            "First draft: Naive paraphrasing leads to random mixes and drift.",
+            "Test: Users repeat themselves; staff cannot correct quickly.",
+            "Diagnosis: Missing guardrails to retain constraints and disambiguate terms.",
+            f"Reasoning change: {change}.",
+            "Validation: Trials show fewer repeats and clearer proposals with a short recap.",
+            f"Final insight: This approach {benefit}.",
+        ],
+        "reasoning_path": [
+            "Baseline: Vague adjectives caused mismatches and confusion.",
+            "Observation: Repetition and drift signaled missing constraints.",
+            f"Adjustment: {change}.",
+            f"Rationale: Because {friction}, this keeps the conversation aligned.",
+            "Test Result: Short recap + confirmation reduced errors in trials.",
+            "Insight: Simple rules -> better matches and faster closes.",
+        ],
+        "output": _OUTPUT,
+    }
+
+
+def build_plan_dict(
+    seed: str,
+    friction: str,
+    *,
+    pattern: Optional[str] = None,
+    ascii_only: bool = False,
+) -> Dict[str, Any]:
+    """Structured plan: context, objective, flow steps, reasoning steps, output."""
+    parts = _plan_parts(seed, friction, _keys(pattern))
+    return fold_strings(parts) if ascii_only else parts
 
 
 def build_plan_text(
@@ -52,56 +109,71 @@ def build_plan_text(
     pattern: Optional[str] = None,
     ascii_only: bool = False,
 ) -> str:
-    change, benefit = _pattern_summary(pattern)
+    timer = stage_timer("plan")
+    keys = _keys(pattern)
+    timer.lap("resolve")
+    sections = _compiled_sections(keys, ascii_only)
+    timer.lap("compile")
+    if ascii_only:
+        seed, friction = to_ascii(seed), to_ascii(friction)
+        timer.lap("ascii")
+    values = {_SEED: seed, _FRICTION: friction}
+    text = "".join(values[seg] if i % 2 else seg for segments in sections for i, seg in enumerate(segments))
+    timer.lap("render")
+    timer.done(",".join(keys) or "generic")
+    return text
 
-    context = (
-        f"Seed: {seed}\n"
-        f"Observed issue: {friction}"
-    )
-    objective = (
-        "Guide the assistant to interpret natural speech reliably and reach a confirmed outcome without repetition."
-    )
 
-    flow = (
-        "1. Problem statement: The assistant sounds friendly but misreads intent from vague wording.\n"
-        "2. First draft: Naive paraphrasing leads to random mixes and drift.\n"
-        "3. Test: Users repeat themselves; staff cannot correct quickly.\n"
-        f"4. Diagnosis: Missing guardrails to retain constraints and disambiguate terms.\n"
-        f"5. Reasoning change: {change}.\n"
-        "6. Validation: Trials show fewer repeats and clearer proposals with a short recap.\n"
-        f"7. Final insight: This approach {benefit}."
-    )
+def iter_plan_text(
+    seed: str,
+    friction: str,
+    *,
+    pattern: Optional[str] = None,
+    ascii_only: bool = False,
+) -> Iterator[str]:
+    """Yield the plan one section at a time (Context, Objective, Flow, Reasoning Path, Output)."""
+    if ascii_only:
+        seed, friction = to_ascii(seed), to_ascii(friction)
+    values = {_SEED: seed, _FRICTION: friction}
+    for segments in _compiled_sections(_keys(pattern), ascii_only):
+        # Even indices are static text, odd ones slot markers.
+        yield "".join(values[seg] if i % 2 else seg for i, seg in enumerate(segments))
 
-    reasoning = (
-        "1. Baseline: Vague adjectives caused mismatches and confusion.\n"
-        "2. Observation: Repetition and drift signaled missing constraints.\n"
-        f"3. Adjustment: {change}.\n"
-        f"4. Rationale: Because {friction}, this keeps the conversation aligned.\n"
-        "5. Test Result: Short recap + confirmation reduced errors in trials.\n"
-        f"6. Insight: Simple rules -> better matches and faster closes."
-    )
 
-    output = (
-        "Clear recap of constraints, one concise clarifier if needed, two fitting options or direct next step, and a confirmation before finalizing."
-    )
+def _keys(pattern: Optional[str]) -> Tuple[str, ...]:
+    return parse_pattern(pattern) if pattern else ()
 
-    template = (
-        "Context\n"
-        "-------\n"
-        f"{context}\n\n"
-        "Objective\n"
-        "---------\n"
-        f"{objective}\n\n"
-        "Flow\n"
-        "----\n"
-        f"{flow}\n\n"
-        "Reasoning Path\n"
-        "--------------\n"
-        f"{reasoning}\n\n"
-        "Output\n"
-        "------\n"
-        f"{output}\n"
-    )
 
-    return _ascii(template, ascii_only).strip() + "\n"
+# Slot markers survive ASCII folding and can't occur in the static text.
+_SEED = "\x00seed\x00"
+_FRICTION = "\x00friction\x00"
+_SLOT_RE = re.compile("(\x00(?:seed|friction)\x00)")
+
+
+@lru_cache(maxsize=None)
+def _compiled_sections(keys: Tuple[str, ...], ascii_only: bool) -> Tuple[Tuple[str, ...], ...]:
+    """Plan sections for ``keys`` with static text rendered (and folded) once.
+
+    Each section is split around the seed/friction slots, so a call only
+    joins precomputed strings. Bounded like ``cards._content_for_keys``.
+    """
+    sections = _iter_plan_sections(_plan_parts(_SEED, _FRICTION, keys))
+    return tuple(tuple(_SLOT_RE.split(to_ascii(sec) if ascii_only else sec)) for sec in sections)
+
+
+def plan_text_from_dict(plan: Dict[str, Any]) -> str:
+    """Render a ``build_plan_dict`` result as text (no ASCII folding)."""
+    return "".join(_iter_plan_sections(plan))
+
+
+def _steps(steps: List[str]) -> str:
+    return "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+
 
+def _iter_plan_sections(parts: Dict[str, Any]) -> Iterator[str]:
+    context = parts["context"]
+    yield f"Context\n-------\nSeed: {context['seed']}\nObserved issue: {context['observed_issue']}\n\n"
+    yield f"Objective\n---------\n{parts['objective']}\n\n"
+    yield f"Flow\n----\n{_steps(parts['flow'])}\n\n"
+    yield f"Reasoning Path\n--------------\n{_steps(parts['reasoning_path'])}\n\n"
+    yield f"Output\n------\n{parts['output']}\n"
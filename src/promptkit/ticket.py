@@ -1,18 +1,13 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
-
-
-def _ascii(text: str, enabled: bool) -> str:
-    if not enabled:
-        return text
-    return (
-        text.replace("—", "-")
-        .replace("–", "-")
-        .replace("“", '"')
-        .replace("”", '"')
-        .replace("’", "'")
-    )
+import csv
+import json
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from .asciifold import fold_strings, to_ascii
 
 
 def build_ticket_text(
@@ -27,6 +22,32 @@ def build_ticket_text(
     success: Optional[Iterable[str]] = None,
     ascii_only: bool = False,
 ) -> str:
+    return "".join(
+        iter_ticket_text(
+            seed=seed,
+            friction=friction,
+            client=client,
+            prompt_brief=prompt_brief,
+            real_problem=real_problem,
+            test_problem=test_problem,
+            goal=goal,
+            success=success,
+            ascii_only=ascii_only,
+        )
+    )
+
+
+def _ticket_fields(
+    *,
+    seed: str,
+    friction: str,
+    client: Optional[str] = None,
+    prompt_brief: Optional[str] = None,
+    real_problem: Optional[str] = None,
+    test_problem: Optional[str] = None,
+    goal: Optional[str] = None,
+    success: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
     client_line = client or "<client>"
     brief_line = (
         prompt_brief
@@ -51,17 +72,285 @@ def build_ticket_text(
             "Provide a recap and explicit confirmation before finalizing",
         ]
 
-    lines: List[str] = []
-    lines.append("Client: " + client_line)
-    lines.append("Prompt Brief: " + brief_line)
-    lines.append("Real Problem: " + real_line)
-    lines.append("Test Problem: " + test_line)
-    lines.append("Goal: " + goal_line)
-    lines.append("Seed: " + seed)
-    lines.append("Friction: " + friction)
-    lines.append("Success Criteria:")
-    for s in success_list:
-        lines.append("- " + s)
-    text = "\n".join(lines) + "\n"
-    return _ascii(text, ascii_only)
+    return {
+        "client": client_line,
+        "prompt_brief": brief_line,
+        "real_problem": real_line,
+        "test_problem": test_line,
+        "goal": goal_line,
+        "seed": seed,
+        "friction": friction,
+        "success_criteria": success_list,
+    }
+
+
+def build_ticket_dict(
+    *,
+    seed: str,
+    friction: str,
+    client: Optional[str] = None,
+    prompt_brief: Optional[str] = None,
+    real_problem: Optional[str] = None,
+    test_problem: Optional[str] = None,
+    goal: Optional[str] = None,
+    success: Optional[Iterable[str]] = None,
+    ascii_only: bool = False,
+) -> Dict[str, Any]:
+    """Structured ticket: the same fields as the text template, defaults filled in."""
+    fields = _ticket_fields(
+        seed=seed,
+        friction=friction,
+        client=client,
+        prompt_brief=prompt_brief,
+        real_problem=real_problem,
+        test_problem=test_problem,
+        goal=goal,
+        success=success,
+    )
+    return fold_strings(fields) if ascii_only else fields
+
+
+def iter_ticket_text(
+    *,
+    seed: str,
+    friction: str,
+    client: Optional[str] = None,
+    prompt_brief: Optional[str] = None,
+    real_problem: Optional[str] = None,
+    test_problem: Optional[str] = None,
+    goal: Optional[str] = None,
+    success: Optional[Iterable[str]] = None,
+    ascii_only: bool = False,
+) -> Iterator[str]:
+    """Yield the ticket in two chunks: the header fields, then the success criteria."""
+    if ascii_only:
+        # The template and defaults are ASCII already; only caller input needs folding.
+        seed, friction = to_ascii(seed), to_ascii(friction)
+        client, prompt_brief, real_problem, test_problem, goal = (
+            to_ascii(v) if v else v for v in (client, prompt_brief, real_problem, test_problem, goal)
+        )
+        success = [to_ascii(s) for s in success] if success else success
+    f = _ticket_fields(
+        seed=seed,
+        friction=friction,
+        client=client,
+        prompt_brief=prompt_brief,
+        real_problem=real_problem,
+        test_problem=test_problem,
+        goal=goal,
+        success=success,
+    )
+    return _iter_ticket_sections(f)
+
+
+def ticket_text_from_dict(ticket: Dict[str, Any]) -> str:
+    """Render a ``build_ticket_dict`` result as text (no ASCII folding)."""
+    return "".join(_iter_ticket_sections(ticket))
+
+
+def _iter_ticket_sections(f: Dict[str, Any]) -> Iterator[str]:
+    yield (
+        f"Client: {f['client']}\n"
+        f"Prompt Brief: {f['prompt_brief']}\n"
+        f"Real Problem: {f['real_problem']}\n"
+        f"Test Problem: {f['test_problem']}\n"
+        f"Goal: {f['goal']}\n"
+        f"Seed: {f['seed']}\n"
+        f"Friction: {f['friction']}\n"
+    )
+    yield "Success Criteria:\n" + "".join(f"- {s}\n" for s in f["success_criteria"])
+
+
+# ---- Bulk generation (CSV/JSONL in, tickets out, streaming) ----
+
+# Record fields understood by ``build_ticket_*``; ``success`` may repeat.
+TICKET_FIELDS = ("seed", "friction", "client", "prompt_brief", "real_problem", "test_problem", "goal", "success")
+
+_SUCCESS_COLUMN = re.compile(r"success(?:[ _-]?\d+)?")
+
+# (line number, ticket kwargs, or the parse error for that line)
+TicketRecord = Tuple[int, Union[Dict[str, Any], Exception]]
+
+
+def normalize_field(field: str) -> str:
+    """Canonical ``TICKET_FIELDS`` name for a ``--column`` target (``Prompt Brief`` -> ``prompt_brief``)."""
+    name = field.strip().lower().replace(" ", "_").replace("-", "_")
+    if name not in TICKET_FIELDS:
+        raise ValueError(f"unknown ticket field {field!r}; expected one of: {', '.join(TICKET_FIELDS)}")
+    return name
+
+
+def _column_field(header: str, columns: Mapping[str, str]) -> Optional[str]:
+    """Ticket field for a column header: explicit mapping first, then the normalized header itself."""
+    if header in columns:
+        return columns[header]
+    name = header.strip().lower().replace(" ", "_").replace("-", "_")
+    if _SUCCESS_COLUMN.fullmatch(name):
+        return "success"
+    return name if name in TICKET_FIELDS else None
+
+
+def _record_fields(pairs: Iterable[Tuple[Optional[str], Any]]) -> Dict[str, Any]:
+    """Ticket kwargs from ``(field, value)`` pairs; raises ``ValueError`` on a non-string value."""
+    fields: Dict[str, Any] = {}
+    success: List[str] = []
+    for field, value in pairs:
+        if field is None or value is None or value == "":
+            continue
+        if field == "success":
+            if isinstance(value, str):
+                value = [value]
+            elif not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError("'success' must be a string or a list of strings")
+            success.extend(value)
+        elif not isinstance(value, str):
+            raise ValueError(f"'{field}' must be a string")
+        else:
+            fields[field] = value
+    if success:
+        fields["success"] = [s for s in success if s]
+    return fields
+
+
+def iter_ticket_records(
+    fp: IO[str],
+    fmt: str = "csv",
+    columns: Optional[Mapping[str, str]] = None,
+) -> Iterator[TicketRecord]:
+    """Yield ``(line number, ticket kwargs)`` from a CSV or JSONL stream, one row at a time.
+
+    Headers/keys map onto ``TICKET_FIELDS`` case-insensitively (``Prompt
+    Brief`` -> ``prompt_brief``); ``columns`` overrides that per header.
+    Repeated ``success`` columns (or ``success_1``, ``success 2``, ...) and
+    JSON lists all collect into ``success``. Unknown columns are ignored.
+    A JSONL line that doesn't parse, or has a non-string field (``success``
+    may also be a list of strings), yields the exception in place of kwargs.
+    Raises ``ValueError`` up front if ``columns`` targets an unknown field.
+    """
+    columns = {header: normalize_field(field) for header, field in (columns or {}).items()}
+    if fmt == "csv":
+        reader = csv.reader(fp)
+        header = next(reader, None)
+        if header is None:
+            return
+        targets = [_column_field(h, columns) for h in header]
+        for row in reader:
+            if any(cell.strip() for cell in row):
+                yield reader.line_num, _record_fields(zip(targets, row))
+    elif fmt == "jsonl":
+        for n, raw in enumerate(fp, 1):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError as exc:
+                yield n, exc
+                continue
+            if not isinstance(record, dict):
+                yield n, ValueError("record must be a JSON object")
+                continue
+            try:
+                fields = _record_fields((_column_field(k, columns), v) for k, v in record.items())
+            except ValueError as exc:
+                yield n, exc
+                continue
+            yield n, fields
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def client_filename(client: Optional[str]) -> str:
+    """File stem for a client's tickets (``unassigned`` when there is no client)."""
+    slug = re.sub(r"[^a-z0-9]+", "-", (client or "").lower()).strip("-")
+    return slug or "unassigned"
+
+
+class _ClientFiles:
+    """Per-client output files with a bounded number of open handles.
+
+    A file is truncated the first time its client appears in a run and
+    appended to afterwards, so evicted handles can be reopened safely.
+    """
+
+    def __init__(self, directory: Path, suffix: str, max_open: int = 64) -> None:
+        self.directory = directory
+        self.suffix = suffix
+        self.max_open = max_open
+        self._open: "OrderedDict[str, IO[str]]" = OrderedDict()
+        self._seen: Dict[str, int] = {}
+
+    def get(self, stem: str) -> Tuple[IO[str], bool]:
+        """The handle for ``stem`` and whether it already holds a ticket."""
+        fp = self._open.get(stem)
+        if fp is not None:
+            self._open.move_to_end(stem)
+        else:
+            mode = "a" if stem in self._seen else "w"
+            fp = open(self.directory / f"{stem}{self.suffix}", mode, encoding="utf-8", newline="\n")
+            self._open[stem] = fp
+            if len(self._open) > self.max_open:
+                self._open.popitem(last=False)[1].close()
+        count = self._seen.get(stem, 0)
+        self._seen[stem] = count + 1
+        return fp, count > 0
+
+    def close(self) -> None:
+        for fp in self._open.values():
+            fp.close()
+        self._open.clear()
+
+
+def write_tickets(
+    records: Iterable[TicketRecord],
+    out: Optional[IO[str]] = None,
+    errors: Optional[IO[str]] = None,
+    *,
+    out_dir: Optional[Path] = None,
+    ascii_only: bool = False,
+    json_out: bool = False,
+) -> Tuple[int, int]:
+    """Render tickets as records arrive, to ``out`` or one file per client under ``out_dir``.
+
+    Text tickets are separated by a blank line; with ``json_out`` each ticket
+    is one compact ``build_ticket_dict`` line (JSONL). Records that failed to
+    parse or lack a seed or friction are reported to ``errors`` and skipped. Returns
+    ``(written, failed)``.
+    """
+    from .jsonio import dumps
 
+    if (out is None) == (out_dir is None):
+        raise ValueError("pass exactly one of out or out_dir")
+    files = _ClientFiles(out_dir, ".jsonl" if json_out else ".txt") if out_dir is not None else None
+    written = failed = 0
+    first = True
+    try:
+        for line_no, fields in records:
+            if isinstance(fields, Exception):
+                problem = f"{type(fields).__name__}: {fields}"
+            elif not fields.get("seed") or not fields.get("friction"):
+                problem = "'seed' and 'friction' are required"
+            else:
+                problem = None
+            if problem is not None:
+                failed += 1
+                if errors is not None:
+                    errors.write(dumps({"line": line_no, "error": problem}, compact=True) + "\n")
+                continue
+            if files is not None:
+                fp, started = files.get(client_filename(fields.get("client")))
+            else:
+                fp, started = out, not first
+            if json_out:
+                fp.write(dumps(build_ticket_dict(**fields, ascii_only=ascii_only), compact=True, ascii_only=ascii_only) + "\n")
+            else:
+                if started:
+                    fp.write("\n")
+                fp.writelines(iter_ticket_text(**fields, ascii_only=ascii_only))
+            first = False
+            written += 1
+    finally:
+        if files is not None:
+            files.close()
+    if out is not None:
+        out.flush()
+    return written, failed
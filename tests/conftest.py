@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    """No daemon a developer happens to run, no on-disk cache: every test renders in-process."""
+    monkeypatch.setenv("PROMPTKIT_NO_DAEMON", "1")
+    monkeypatch.delenv("PROMPTKIT_SOCKET", raising=False)
+    monkeypatch.delenv("PROMPTKIT_DISK_CACHE", raising=False)
+    monkeypatch.delenv("PROMPTKIT_CACHE_DIR", raising=False)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from promptkit.batch import run_batch
+from promptkit.cards import make_iterate_card
+from promptkit.ticket import build_ticket_text
+
+RECORDS = "\n".join([
+    '{"id": "a", "seed": "s", "friction": "Users repeat themselves"}',
+    '',
+    '{"seed": "s"}',
+    'not json',
+    '["not", "an", "object"]',
+    '{"id": "b", "seed": "s", "friction": "f", "success": ["ok", 2]}',
+    '{"id": "c", "seed": "s", "friction": "f", "client": 7}',
+    '{"id": "d", "seed": "s", "friction": "f", "success": "Confirms the order"}',
+]) + "\n"
+
+
+def _run(**kwargs) -> tuple:
+    out, errors = io.StringIO(), io.StringIO()
+    counts = run_batch(io.StringIO(RECORDS), out, errors, **kwargs)
+    return counts, [json.loads(l) for l in out.getvalue().splitlines()], [json.loads(l) for l in errors.getvalue().splitlines()]
+
+
+def test_bad_records_go_to_the_error_side_file_with_their_line() -> None:
+    (written, failed), results, errors = _run(mode="ticket")
+
+    assert (written, failed) == (2, 5)
+    assert [(r["line"], r.get("id")) for r in results] == [(1, "a"), (8, "d")]
+    assert results[1]["ticket"] == build_ticket_text(seed="s", friction="f", success=["Confirms the order"])
+    by_line = {e["line"]: e for e in errors}
+    assert sorted(by_line) == [3, 4, 5, 6, 7]
+    assert by_line[3]["error"] == "ValueError: 'friction' is required"
+    assert by_line[4]["error"].startswith("JSONDecodeError")
+    assert by_line[5]["error"] == "ValueError: record must be a JSON object"
+    assert "'success' must be a string or a list of strings" in by_line[6]["error"]
+    assert by_line[7]["error"] == "ValueError: 'client' must be a string"
+    assert by_line[7]["record"].startswith('{"id": "c"')
+
+
+def test_process_pool_matches_single_process() -> None:
+    single = _run(mode="iterate")
+    pooled = _run(mode="iterate", workers=2, chunk_size=2)
+    assert pooled == single
+    assert single[1][0]["iterate"] == make_iterate_card("s", "Users repeat themselves").render_text()
+
+
+def test_unknown_mode_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unsupported mode"):
+        run_batch(io.StringIO(""), io.StringIO(), io.StringIO(), mode="nope")
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+from promptkit.bundle import build_bundle
+from promptkit.cards import classify_friction, make_iterate_card
+from promptkit.plan import build_plan_text
+from promptkit.ticket import build_ticket_text
+
+SEED = "SnackSmith — the “flavor” assistant"
+
+
+def test_classifier_counts_every_cue_hit() -> None:
+    scores = dict(classify_friction("It FORGETS context, forgot my order, drifts; context again."))
+    assert scores["state-bag"] == 5
+    assert classify_friction("It forgets context")[0] == ("state-bag", 2)
+    assert all(score == 0 for _, score in classify_friction("Responses feel bland."))
+
+
+def test_classifier_ties_keep_registry_order() -> None:
+    # One close-the-loop cue ("repeat") and one state-bag cue ("drift").
+    assert [key for key, _ in classify_friction("repeat drift")[:2]] == ["close-the-loop", "state-bag"]
+
+
+@pytest.mark.parametrize("friction, spec, card_id", [
+    ("It forgets context and drifts", "state-bag", "State Bag"),
+    ("Users repeat themselves", "", "Close-The-Loop Control"),
+    ("Responses feel bland", "", "Smart Info Capture"),
+])
+def test_auto_classified_bundle_shares_its_pattern(friction: str, spec: str, card_id: str) -> None:
+    bundle = build_bundle(SEED, friction)
+    assert bundle.pattern == spec
+    assert bundle.card.id == card_id
+    assert bundle.texts()["plan"] == build_plan_text(SEED, friction, pattern=spec or None)
+
+
+@pytest.mark.parametrize("ascii_only", [False, True])
+@pytest.mark.parametrize("pattern", [None, "state-bag", "ledger,slot-filling"])
+def test_bundle_texts_match_the_individual_generators(pattern, ascii_only: bool) -> None:
+    friction = "It forgets context — “badly”…"
+    bundle = build_bundle(SEED, friction, pattern=pattern, ascii_only=ascii_only, client="Acme", success=["Recaps…"])
+    texts = bundle.texts()
+    assert texts["iterate"] == make_iterate_card(SEED, friction, ascii_only=ascii_only, pattern=pattern).render_text()
+    assert texts["plan"] == build_plan_text(SEED, friction, pattern=bundle.pattern or None, ascii_only=ascii_only)
+    assert texts["ticket"] == build_ticket_text(
+        seed=SEED, friction=friction, client="Acme", success=["Recaps…"], ascii_only=ascii_only
+    )
+    if ascii_only:
+        assert all(text.isascii() for text in texts.values())
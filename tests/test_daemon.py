@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from promptkit import daemon
+from promptkit.cards import make_iterate_card
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+PARAMS = {"seed": "s", "friction": "Users repeat themselves", "pattern": "", "ascii": False}
+
+
+@pytest.fixture
+def sock_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # Short base dir: AF_UNIX paths are limited to ~100 bytes.
+    return Path(tmp_path_factory.mktemp("pk", numbered=True)) / "d.sock"
+
+
+def _stale_socket(path: Path) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(path))  # bound, never listening: what a crashed daemon leaves behind
+
+
+@contextmanager
+def _serving(sock_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """A ``promptkit serve`` subprocess on ``sock_path``; the client is allowed to use it."""
+    env = {**os.environ, "PYTHONPATH": str(SRC), "PROMPTKIT_SOCKET": str(sock_path)}
+    env.pop("PROMPTKIT_NO_DAEMON", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "promptkit", "serve", "--socket", str(sock_path)],
+        env=env, stderr=subprocess.DEVNULL,
+    )
+    monkeypatch.setenv("PROMPTKIT_NO_DAEMON", "0")
+    try:
+        deadline = time.monotonic() + 20
+        while daemon._exchange({"kind": "ping"}, str(sock_path), 1.0) is None:
+            assert proc.poll() is None, "daemon exited"
+            assert time.monotonic() < deadline, "daemon did not come up"
+            time.sleep(0.05)
+        yield sock_path
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+@pytest.fixture
+def running(sock_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    with _serving(sock_path, monkeypatch) as path:
+        yield path
+
+
+@pytest.mark.parametrize("make", [
+    lambda p: p.write_text("my notes\n"),
+    lambda p: p.mkdir(),
+    lambda p: p.symlink_to(p.with_name("elsewhere")),
+], ids=["regular-file", "directory", "symlink"])
+def test_serve_refuses_to_replace_anything_but_a_socket(sock_path: Path, make) -> None:
+    make(sock_path)
+    with pytest.raises(RuntimeError, match=str(sock_path)):
+        daemon.serve(str(sock_path))
+    assert os.path.lexists(sock_path)
+    if sock_path.is_file():
+        assert sock_path.read_text() == "my notes\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="needs root to chown")
+def test_serve_refuses_another_users_socket(sock_path: Path) -> None:
+    _stale_socket(sock_path)
+    os.chown(sock_path, 65534, 65534)
+    with pytest.raises(RuntimeError, match="not a socket owned by this user"):
+        daemon.serve(str(sock_path))
+    assert sock_path.is_socket()
+
+
+def test_stale_socket_is_replaced(sock_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _stale_socket(sock_path)
+    os.chmod(sock_path, 0o600)
+    with _serving(sock_path, monkeypatch) as path:  # comes up, so the stale file was replaced
+        assert daemon.request("iterate", PARAMS, "text", path=str(path)) is not None
+
+
+def test_serve_refuses_a_live_daemon(running: Path) -> None:
+    with pytest.raises(RuntimeError, match="already listening"):
+        daemon.serve(str(running))
+
+
+def test_client_only_uses_an_owner_only_socket(running: Path) -> None:
+    expected = make_iterate_card("s", "Users repeat themselves").render_text()
+    assert oct(running.stat().st_mode & 0o777) == oct(0o600)
+    assert daemon.request("iterate", PARAMS, "text", path=str(running)) == expected
+    os.chmod(running, 0o666)
+    assert daemon.request("iterate", PARAMS, "text", path=str(running)) is None
+    assert daemon.cache_stats(str(running)) is None
+
+
+def test_cache_clear_empties_the_daemons_lru(running: Path) -> None:
+    for _ in range(2):
+        daemon.request("iterate", PARAMS, "text", path=str(running))
+    stats = daemon.cache_stats(str(running))
+    assert stats is not None and stats["hits"] >= 1 and stats["memory_entries"] >= 1
+    assert daemon.cache_clear(str(running)) is True
+    assert daemon.cache_stats(str(running)) == {**stats, "memory_entries": 0, "hits": 0, "misses": 0, "hit_ratio": 0.0}
+
+
+def test_version_mismatch_is_refused() -> None:
+    reply = daemon.handle_line(b'{"v": "0.0.0-other", "kind": "ping"}')
+    assert reply["ok"] is False and "version mismatch" in reply["error"]
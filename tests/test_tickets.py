@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from promptkit.cli import app
+from promptkit.ticket import build_ticket_text, iter_ticket_records, write_tickets
+
+
+def _errors(text: str) -> dict:
+    return {e["line"]: e["error"] for e in map(json.loads, text.splitlines())}
+
+
+def test_jsonl_records_with_non_string_fields_go_to_the_error_side_file(tmp_path: Path) -> None:
+    records = [
+        {"seed": "s", "friction": "f", "client": 123},
+        {"seed": 42, "friction": "f"},
+        {"seed": "s", "friction": "f", "success": ["ok", 1]},
+        {"seed": "s", "friction": "f", "success": {"a": 1}},
+        {"seed": "s", "friction": "f", "client": "Acme", "success": "One criterion"},
+    ]
+    src = io.StringIO("\n".join(json.dumps(r) for r in records) + "\n{not json\n" + '{"seed": "s"}\n')
+    errors = io.StringIO()
+
+    written, failed = write_tickets(
+        iter_ticket_records(src, "jsonl"), errors=errors, out_dir=tmp_path, ascii_only=True
+    )
+
+    assert (written, failed) == (1, 6)
+    reported = _errors(errors.getvalue())
+    assert reported[1] == "ValueError: 'client' must be a string"
+    assert reported[2] == "ValueError: 'seed' must be a string"
+    assert "'success' must be a string or a list of strings" in reported[3]
+    assert "'success' must be a string or a list of strings" in reported[4]
+    assert reported[6].startswith("JSONDecodeError")
+    assert reported[7] == "'seed' and 'friction' are required"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["acme.txt"]
+    assert "- One criterion\n" in (tmp_path / "acme.txt").read_text(encoding="utf-8")
+
+
+def test_csv_repeated_success_columns_collect_in_order() -> None:
+    src = io.StringIO("Seed,Friction,Success 1,success_2,Account\ns,f,first,second,Acme\n")
+    [(line, fields)] = list(iter_ticket_records(src, "csv", columns={"Account": "client"}))
+    assert line == 2
+    assert fields == {"seed": "s", "friction": "f", "success": ["first", "second"], "client": "Acme"}
+
+
+def test_unknown_column_target_is_rejected_up_front() -> None:
+    with pytest.raises(ValueError, match="unknown ticket field"):
+        next(iter_ticket_records(io.StringIO("a\n1\n"), "csv", columns={"a": "clinet"}))
+
+
+def test_cli_reports_bad_rows_and_keeps_going(tmp_path: Path) -> None:
+    src = tmp_path / "in.jsonl"
+    src.write_text('{"seed":"s","friction":"f","client":123}\n{"seed":"s","friction":"f"}\n', encoding="utf-8")
+    errors = tmp_path / "errors.jsonl"
+
+    result = CliRunner().invoke(
+        app, ["tickets", "--input", str(src), "--out-dir", str(tmp_path / "out"), "--errors", str(errors)]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert _errors(errors.read_text(encoding="utf-8")) == {1: "ValueError: 'client' must be a string"}
+    expected = build_ticket_text(seed="s", friction="f")
+    assert (tmp_path / "out" / "unassigned.txt").read_text(encoding="utf-8") == expected
+
+
+def test_cli_rejects_unknown_column_field(tmp_path: Path) -> None:
+    src = tmp_path / "in.csv"
+    src.write_text("seed,friction\ns,f\n", encoding="utf-8")
+    result = CliRunner().invoke(app, ["tickets", "--input", str(src), "--column", "Account=clinet"])
+    assert result.exit_code != 0
+    assert "clinet" in result.output
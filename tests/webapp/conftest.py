@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+# Read once when the app is imported: no per-client rate limit (the test
+# client is a single address), per-process artifacts and metrics.
+os.environ["PK_RATE_LIMIT"] = "0"
+for name in ("PK_ARTIFACT_DIR", "PK_METRICS_DIR", "PK_MAX_CONCURRENT", "PK_MAX_BODY_KB"):
+    os.environ.pop(name, None)
+# Templates and static files resolve from the repo root, as with ``python -m webapp``.
+os.chdir(Path(__file__).resolve().parents[2])
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    from webapp.main import app
+
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from webapp.admission import AdmissionLimits, AdmissionMiddleware
+
+
+def _app(release: Optional[asyncio.Event] = None, **limits) -> AdmissionMiddleware:
+    async def run(request) -> PlainTextResponse:
+        if release is not None:
+            await release.wait()
+        await request.body()
+        return PlainTextResponse("ok")
+
+    inner = Starlette(routes=[Route("/run", run, methods=["GET", "POST"]), Route("/health", run)])
+    return AdmissionMiddleware(inner, limits=AdmissionLimits(**limits))
+
+
+def _get(app: AdmissionMiddleware, *paths: str, **kwargs) -> list:
+    async def _go() -> list:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path, **kwargs) for path in paths]
+
+    return asyncio.run(_go())
+
+
+def test_oversized_body_is_413_before_the_route(client) -> None:
+    response = client.post("/run", content=b"x" * (256 * 1024 + 1), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    assert response.status_code == 413
+    assert "limit 262144 bytes" in response.text
+
+
+def test_chunked_body_over_the_limit_is_413() -> None:
+    app = _app(rate=0, max_concurrent=0, max_body_bytes=10)
+
+    async def _go() -> httpx.Response:
+        async def body():
+            for _ in range(3):
+                yield b"x" * 8
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+            return await c.post("/run", content=body())
+
+    assert asyncio.run(_go()).status_code == 413
+
+
+def test_rate_limit_is_429_with_retry_after() -> None:
+    app = _app(rate=0.5, burst=1, max_concurrent=0)
+    first, second, untouched = _get(app, "/run", "/run", "/health")
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["retry-after"] == "2"
+    assert untouched.status_code == 200  # only generation routes are limited
+
+
+def test_rate_limit_ignores_forwarded_for() -> None:
+    # Spoofed X-Forwarded-For values do not buy fresh buckets; uvicorn's
+    # --proxy-headers resolves the real client before the app sees it.
+    app = _app(rate=0.5, burst=1, max_concurrent=0)
+
+    async def _go() -> list:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+            return [(await c.get("/run", headers={"X-Forwarded-For": f"10.0.0.{i}"})).status_code for i in range(2)]
+
+    assert asyncio.run(_go()) == [200, 429]
+
+
+def test_busy_server_is_503_with_retry_after() -> None:
+    async def _go() -> tuple:
+        release = asyncio.Event()
+        app = _app(release, rate=0, max_concurrent=1, max_queue=0, queue_timeout=0.05)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+            holder = asyncio.ensure_future(c.get("/run"))
+            while app.gate.active == 0:
+                await asyncio.sleep(0.01)
+            busy = await c.get("/run")
+            release.set()
+            return (await holder), busy, app.gate.active
+
+    held, busy, active = asyncio.run(_go())
+    assert held.status_code == 200
+    assert busy.status_code == 503
+    assert busy.headers["retry-after"] == "1"
+    assert active == 0
+
+
+def test_queued_request_gets_the_freed_slot() -> None:
+    async def _go() -> list:
+        release = asyncio.Event()
+        app = _app(release, rate=0, max_concurrent=1, max_queue=1, queue_timeout=5)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+            first = asyncio.ensure_future(c.get("/run"))
+            while app.gate.active == 0:
+                await asyncio.sleep(0.01)
+            queued = asyncio.ensure_future(c.get("/run"))
+            while app.gate.waiting == 0:
+                await asyncio.sleep(0.01)
+            release.set()
+            return [r.status_code for r in await asyncio.gather(first, queued)]
+
+    assert asyncio.run(_go()) == [200, 200]
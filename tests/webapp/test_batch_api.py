@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+import webapp.api as api
+from webapp.admission import AdmissionLimits
+
+BODY = "\n".join([
+    '{"id": "a", "seed": "s", "friction": "Users repeat themselves"}',
+    '',
+    'not json',
+    '{"seed": "s"}',
+    '{"id": "b", "seed": "s", "friction": "f", "mode": "plan"}',
+]) + "\n"
+
+
+def _post(client, body, **params) -> list:
+    response = client.post("/api/v1/batch", params=params, content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_bad_records_report_their_line_and_the_stream_goes_on(client) -> None:
+    results = _post(client, BODY)
+    assert [r["line"] for r in results] == [1, 3, 4, 5]
+    assert results[0]["id"] == "a" and results[0]["mode"] == "iterate" and results[0]["text"]
+    assert results[1]["error"].startswith("JSONDecodeError")
+    assert results[2]["error"] == "ValueError: 'friction' is required"
+    assert results[3]["id"] == "b" and results[3]["mode"] == "plan"
+
+
+def test_unexpected_failures_stay_with_their_record(client, monkeypatch: pytest.MonkeyPatch) -> None:
+    real = api.run_promptkit
+
+    def flaky(**kwargs):
+        if kwargs["friction"] == "boom":
+            raise TypeError("unexpected")
+        return real(**kwargs)
+
+    monkeypatch.setattr(api, "run_promptkit", flaky)
+    body = '{"seed": "s", "friction": "boom"}\n{"seed": "s", "friction": "fine"}\n'
+    first, second = _post(client, body)
+    assert first == {"line": 1, "error": "TypeError: unexpected"}
+    assert second["line"] == 2 and "text" in second
+
+
+def test_unknown_mode_is_422(client) -> None:
+    assert client.post("/api/v1/batch", params={"mode": "nope"}, content=BODY).status_code == 422
+
+
+class _Chunks:
+    """Just enough of a ``Request`` for ``_iter_line_chunks``."""
+
+    def __init__(self, *chunks: bytes) -> None:
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _lines(*chunks: bytes, max_line: int) -> list:
+    async def _go() -> list:
+        return [line async for lines in api._iter_line_chunks(_Chunks(*chunks), size=2, max_line=max_line) for line in lines]
+
+    return asyncio.run(_go())
+
+
+def test_lines_split_across_chunks_are_joined() -> None:
+    assert _lines(b"ab", b"c\nde", b"f\n", b"g", max_line=8) == [b"abc", b"def", b"g"]
+
+
+def test_oversized_lines_are_dropped_unread() -> None:
+    # The second line outgrows the cap mid-chunk; the rest of it is skipped.
+    lines = _lines(b"ok\n0123", b"456789", b"abc", b"\nafter\n", b"0123456789\n", max_line=8)
+    assert lines == [b"ok", None, b"after", None]
+
+
+def test_record_too_large_is_reported_by_line(client, monkeypatch: pytest.MonkeyPatch) -> None:
+    big = json.dumps({"seed": "s", "friction": "x" * 100})
+    body = f'{big}\n{{"seed": "s", "friction": "f"}}\n'
+    monkeypatch.setattr(api, "LIMITS", AdmissionLimits(max_body_bytes=64))
+    first, second = _post(client, body)
+    assert first == {"line": 1, "error": "record too large"}
+    assert second["line"] == 2 and "text" in second
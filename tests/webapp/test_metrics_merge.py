@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from webapp.metrics import _merge, _with_worker
+
+EXPOSITION = """# HELP hits_total Hits.
+# TYPE hits_total counter
+hits_total{mode="plan"} 3
+hits_total 1
+# HELP up Up.
+# TYPE up gauge
+up 1
+"""
+
+
+def test_worker_label_goes_on_every_sample() -> None:
+    assert _with_worker(EXPOSITION, "42").splitlines()[2:4] == [
+        'hits_total{worker="42",mode="plan"} 3',
+        'hits_total{worker="42"} 1',
+    ]
+
+
+def test_merged_workers_keep_one_header_per_family() -> None:
+    merged = _merge([_with_worker(EXPOSITION, "1"), _with_worker(EXPOSITION, "2")]).splitlines()
+    assert merged.count("# TYPE hits_total counter") == 1
+    assert merged.index("# TYPE up gauge") > merged.index('hits_total{worker="2"} 1')
+    assert [line for line in merged if line.startswith("up")] == ['up{worker="1"} 1', 'up{worker="2"} 1']
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import random
+
+import pytest
+
+from webapp.preview import _render, line_ops
+
+STATE = {"seed": "s", "friction": "Users repeat themselves", "mode": "plan"}
+
+
+def _apply(lines: list, ops: list) -> list:
+    lines = list(lines)
+    for at, delete, insert in ops:  # last first, so earlier offsets stay valid
+        lines[at:at + delete] = insert
+    return lines
+
+
+@pytest.mark.parametrize("old, new", [
+    ([], ["a", "b"]),
+    (["a", "b"], []),
+    (["a", "b", "c"], ["a", "c"]),
+    (["a", "b", "c"], ["x", "b", "y", "z"]),
+    (["a", "b"], ["a", "b"]),
+])
+def test_line_ops_round_trip(old: list, new: list) -> None:
+    assert _apply(old, line_ops(old, new)) == new
+    if old == new:
+        assert line_ops(old, new) == []
+
+
+def test_line_ops_round_trip_random_edits() -> None:
+    rng = random.Random(7)
+    for _ in range(200):
+        old = [rng.choice("abcde") for _ in range(rng.randrange(12))]
+        new = [rng.choice("abcdef") for _ in range(rng.randrange(12))]
+        assert _apply(old, line_ops(old, new)) == new
+
+
+def test_websocket_sends_full_then_diffs_that_rebuild_the_text(client) -> None:
+    edited = {**STATE, "friction": "Users repeat themselves often"}
+    with client.websocket_connect("/preview/ws") as ws:
+        ws.send_text(json.dumps(STATE))
+        first = json.loads(ws.receive_text())
+        assert first["full"] == _render(STATE)["text"]
+
+        ws.send_text(json.dumps(edited))
+        second = json.loads(ws.receive_text())
+        assert second["v"] > first["v"] and "ops" in second
+        assert "\n".join(_apply(first["full"].split("\n"), second["ops"])) == _render(edited)["text"]
+
+        ws.send_text(json.dumps({**edited, "seed": ""}))
+        assert json.loads(ws.receive_text())["error"] == "Seed is required."
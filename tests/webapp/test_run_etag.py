@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import gzip
+import re
+
+import pytest
+
+import webapp.main as main
+
+PARAMS = {"seed": "etag seed", "friction": "It forgets context", "json_out": "true"}
+
+
+@pytest.fixture
+def generations(monkeypatch: pytest.MonkeyPatch) -> list:
+    calls: list = []
+    real = main.run_promptkit
+
+    def counting(**kwargs):
+        calls.append(kwargs)
+        return real(**kwargs)
+
+    monkeypatch.setattr(main, "run_promptkit", counting)
+    return calls
+
+
+def test_if_none_match_is_answered_before_generating(client, generations: list) -> None:
+    first = client.get("/run", params=PARAMS)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert len(generations) == 1
+
+    again = client.get("/run", params=PARAMS, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert len(generations) == 1
+
+    posted = client.post("/run", data=PARAMS, headers={"If-None-Match": f"W/{etag}"})
+    assert posted.status_code == 304
+    assert len(generations) == 1
+
+
+def test_evicted_downloads_turn_a_304_into_a_fresh_200(client, generations: list) -> None:
+    first = client.get("/run", params=PARAMS)
+    links = re.findall(r'href="(/artifact/[^"]+)"', first.text)
+    assert links and all(client.get(link).status_code == 200 for link in links)
+
+    main.artifacts._items.clear()  # the LRU dropped them
+    main.artifacts._bytes = 0
+    assert client.get(links[0]).status_code == 404
+
+    fresh = client.get("/run", params=PARAMS, headers={"If-None-Match": first.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] == first.headers["etag"]
+    assert all(client.get(link).status_code == 200 for link in links)
+    assert client.get("/run", params=PARAMS, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+
+def test_artifacts_are_gzipped_on_first_gzip_download(client) -> None:
+    main.artifacts._items.clear()  # earlier tests may have served the same card
+    main.artifacts._bytes = 0
+    page = client.get("/run", params=PARAMS)
+    link = re.search(r'href="(/artifact/[^"]+\.txt)"', page.text).group(1)
+    stored = main.artifacts.get(link.rsplit("/", 1)[1].split(".")[0], "txt")
+    assert stored is not None and stored.page._gzip_body is None
+
+    plain = client.get(link, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert stored.page._gzip_body is None
+
+    zipped = client.get(link, headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.content == plain.content  # httpx decodes it
+    assert gzip.decompress(stored.page.gzip_body) == plain.content
+    assert client.get(link, headers={"If-None-Match": zipped.headers["etag"]}).status_code == 304
+
+
+def test_form_download_endpoints_are_gone(client) -> None:
+    for path in ("/download/text", "/download/json"):
+        assert client.post(path, data={"content": "{}"}).status_code in (404, 405)
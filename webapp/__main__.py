@@ -0,0 +1,244 @@
+"""Production entry point: ``python -m webapp serve [--workers N]``.
+
+The master process binds the listening socket, imports the app and warms
+everything workers would otherwise build on first use (pattern registry,
+plan segments, compiled templates, prerendered pages), freezes the GC
+heap, then forks ``N`` uvicorn workers that share that state copy-on-write
+and accept on the same socket. Dead workers are replaced.
+
+Signals to the master:
+
+- ``SIGTERM``/``SIGINT``: stop; workers finish in-flight requests (up to ``--graceful-timeout``).
+- ``SIGHUP``: graceful reload; the master re-executes itself (picking up
+  new code and templates) keeping the socket open, forks fresh workers and
+  only then retires the old ones, so no connection is refused.
+
+Without ``os.fork`` (Windows) this falls back to ``uvicorn.run`` (spawned
+workers, nothing shared).
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+_LISTEN_FD = "PK_LISTEN_FD"
+_OLD_WORKERS = "PK_OLD_WORKERS"
+_OWNED_ARTIFACT_DIR = "PK_ARTIFACT_DIR_OWNED"
+_OWNED_METRICS_DIR = "PK_METRICS_DIR_OWNED"
+
+
+def _listen_socket(host: str, port: int, backlog: int) -> socket.socket:
+    inherited = os.environ.pop(_LISTEN_FD, None)
+    if inherited is not None:
+        sock = socket.socket(fileno=int(inherited))
+    else:
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _shared_artifact_dir(workers: int) -> None:
+    """Workers need one artifact store: a download link may land on any of them."""
+    if workers > 1 and not os.getenv("PK_ARTIFACT_DIR"):
+        import tempfile
+
+        os.environ["PK_ARTIFACT_DIR"] = tempfile.mkdtemp(prefix="promptkit-artifacts-")
+        os.environ[_OWNED_ARTIFACT_DIR] = "1"
+
+
+def _shared_metrics_dir(workers: int) -> None:
+    """Workers publish metric snapshots here so a scrape of any of them covers all."""
+    from .metrics import ENABLED
+
+    if workers > 1 and ENABLED and not os.getenv("PK_METRICS_DIR"):
+        import tempfile
+
+        os.environ["PK_METRICS_DIR"] = tempfile.mkdtemp(prefix="promptkit-metrics-")
+        os.environ[_OWNED_METRICS_DIR] = "1"
+
+
+def _forget_metrics(pid: int) -> None:
+    """Drop an exited worker's snapshot; its series disappear from the next scrape."""
+    if os.getenv("PK_METRICS_DIR"):
+        from .metrics import snapshot_path
+
+        try:
+            snapshot_path(os.environ["PK_METRICS_DIR"], pid).unlink()
+        except OSError:
+            pass
+
+
+def _run_worker(sock: socket.socket, args: argparse.Namespace) -> None:
+    import uvicorn
+
+    from .main import app
+    from .metrics import share_worker_metrics
+
+    share_worker_metrics()
+
+    # Workers stop through uvicorn's own handlers; the master's must not fire here.
+    for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_IGN)
+    config = uvicorn.Config(
+        app,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=args.proxy_headers,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _fork_worker(sock: socket.socket, args: argparse.Namespace) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(sock, args)
+        except BaseException:  # pragma: no cover - reported, then the master respawns
+            import traceback
+
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def _stop(pids: Set[int], timeout: float) -> None:
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.monotonic() + timeout + 5
+    while pids and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            pids.discard(pid)
+            _forget_metrics(pid)
+        else:
+            time.sleep(0.05)
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def serve(args: argparse.Namespace) -> int:
+    if not hasattr(os, "fork"):
+        import uvicorn
+
+        from .metrics import ENABLED
+
+        if args.workers > 1 and ENABLED:
+            print(
+                "promptkit: warning: without fork each worker keeps its own /metrics; "
+                "counters jump between workers from one scrape to the next",
+                file=sys.stderr,
+                flush=True,
+            )
+        uvicorn.run("webapp.main:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+        return 0
+
+    sock = _listen_socket(args.host, args.port, args.backlog)
+    _shared_artifact_dir(args.workers)
+    _shared_metrics_dir(args.workers)
+
+    from .main import warm_up
+
+    started = time.perf_counter()
+    pages = warm_up()
+    gc.collect()
+    gc.freeze()  # keep the preloaded heap out of GC passes so it stays shared
+    print(
+        f"promptkit: preloaded {pages} pages in {(time.perf_counter() - started) * 1000:.0f} ms; "
+        f"{args.workers} workers on {args.host}:{args.port} (master pid {os.getpid()})",
+        file=sys.stderr,
+        flush=True,
+    )
+
+    state: Dict[str, Optional[int]] = {"signal": None}
+
+    def _on_signal(signum: int, frame: object) -> None:
+        state["signal"] = signum
+
+    for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(sig, _on_signal)
+
+    workers: Set[int] = {_fork_worker(sock, args) for _ in range(args.workers)}
+    # Workers of the master we were re-executed from: retire them now that ours are up.
+    retiring = {int(pid) for pid in os.environ.pop(_OLD_WORKERS, "").split(",") if pid}
+    for pid in retiring:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    while state["signal"] is None:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if not pid:
+            time.sleep(0.2)
+            continue
+        retiring.discard(pid)
+        _forget_metrics(pid)
+        if pid in workers:  # crashed or killed: replace it
+            workers.discard(pid)
+            workers.add(_fork_worker(sock, args))
+
+    if state["signal"] == signal.SIGHUP:
+        print("promptkit: reloading", file=sys.stderr, flush=True)
+        os.environ[_LISTEN_FD] = str(sock.fileno())
+        os.environ[_OLD_WORKERS] = ",".join(str(pid) for pid in workers | retiring)
+        os.execv(sys.executable, [sys.executable, "-m", "webapp", *sys.argv[1:]])
+
+    _stop(workers | retiring, args.graceful_timeout)
+    sock.close()
+    import shutil
+
+    for owned, directory in ((_OWNED_ARTIFACT_DIR, "PK_ARTIFACT_DIR"), (_OWNED_METRICS_DIR, "PK_METRICS_DIR")):
+        if os.environ.get(owned):
+            shutil.rmtree(os.environ[directory], ignore_errors=True)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m webapp", description="PromptKit web server")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="Preload, then fork N uvicorn workers on one socket")
+    p.add_argument("--host", default=os.getenv("PK_HOST", "127.0.0.1"))
+    p.add_argument("--port", type=int, default=int(os.getenv("PK_PORT", "8000")))
+    p.add_argument("--workers", type=int, default=int(os.getenv("PK_WORKERS", str(os.cpu_count() or 1))))
+    p.add_argument("--backlog", type=int, default=2048)
+    p.add_argument("--graceful-timeout", type=float, default=30.0, help="Seconds workers get to finish in-flight requests")
+    p.add_argument("--proxy-headers", action="store_true", help="Trust X-Forwarded-* from the reverse proxy")
+    p.add_argument(
+        "--forwarded-allow-ips",
+        default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        help="Comma-separated proxy addresses whose X-Forwarded-* headers are trusted",
+    )
+    p.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    args.workers = max(1, args.workers)
+    return serve(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
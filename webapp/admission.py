@@ -0,0 +1,319 @@
+"""Admission control for generation routes: body/input size caps, per-client rate limits, bounded concurrency.
+
+Checks run in the event loop before a request reaches the threadpool, in
+order of cost: body size (``413``), client token bucket (``429``), then a
+concurrency slot. When every slot is busy a request waits in a bounded
+queue; a full queue or a wait longer than ``queue_timeout`` answers ``503``
+at once. ``429``/``503`` carry ``Retry-After``.
+
+Long-lived connections are admitted per unit of work instead: opening a
+live preview costs a token, then every preview render and every chunk of a
+streamed batch goes through ``admitted`` (a token per record and a slot
+while generating). Those already have an open stream to answer on, so they
+wait for their turn rather than being rejected.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from promptkit import metrics
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    max_concurrent: int = 8  # generations in flight; 0 disables the limit
+    max_queue: int = 64  # requests allowed to wait for a slot
+    queue_timeout: float = 2.0  # seconds a queued request waits before 503
+    rate: float = 10.0  # requests/second per client; 0 disables rate limiting
+    burst: int = 30  # bucket size per client
+    max_body_bytes: int = 256 * 1024  # form/JSON bodies (streamed batches excluded)
+    max_input_chars: int = 8000  # seed, friction
+    max_pattern_chars: int = 256
+
+    @classmethod
+    def from_env(cls) -> AdmissionLimits:
+        return cls(
+            max_concurrent=int(_env_float("PK_MAX_CONCURRENT", cls.max_concurrent)),
+            max_queue=int(_env_float("PK_MAX_QUEUE", cls.max_queue)),
+            queue_timeout=_env_float("PK_QUEUE_TIMEOUT", cls.queue_timeout),
+            rate=_env_float("PK_RATE_LIMIT", cls.rate),
+            burst=int(_env_float("PK_RATE_BURST", cls.burst)),
+            max_body_bytes=int(_env_float("PK_MAX_BODY_KB", cls.max_body_bytes / 1024) * 1024),
+            max_input_chars=int(_env_float("PK_MAX_INPUT_CHARS", cls.max_input_chars)),
+            max_pattern_chars=int(_env_float("PK_MAX_PATTERN_CHARS", cls.max_pattern_chars)),
+        )
+
+
+LIMITS = AdmissionLimits.from_env()
+
+# Routes that generate; everything else (pages, static, artifacts, health) is cached or trivial.
+GENERATION_PATHS: FrozenSet[str] = frozenset({
+    "/run", "/run/stream", "/api/v1/generate", "/api/v1/batch",
+})
+# Bodies that are streamed record by record; their records are size-checked,
+# and charged and gated chunk by chunk (``admitted``), instead.
+STREAMED_PATHS: FrozenSet[str] = frozenset({"/api/v1/batch"})
+# WebSocket routes that generate on every message (``admitted`` per render).
+SESSION_PATHS: FrozenSet[str] = frozenset({"/preview/ws"})
+
+# Where the middleware leaves itself in the ASGI scope for ``admitted``.
+_SCOPE_KEY = "promptkit.admission"
+
+REJECTED: metrics.Counter = metrics.REGISTRY.register(metrics.Counter(  # type: ignore[assignment]
+    "promptkit_admission_rejected_total",
+    "Requests turned away before generation, by reason.",
+    ("reason",),
+))
+THROTTLED: metrics.Counter = metrics.REGISTRY.register(metrics.Counter(  # type: ignore[assignment]
+    "promptkit_admission_throttled_total",
+    "Preview renders and batch chunks made to wait for a token or a slot, by reason.",
+    ("reason",),
+))
+
+
+def input_errors(seed: str, friction: str, pattern: Optional[str] = None, limits: AdmissionLimits = LIMITS) -> List[str]:
+    """Messages for inputs over the configured sizes (empty when all fit)."""
+    errors = []
+    for name, value in (("Seed", seed), ("Friction", friction)):
+        if value and len(value) > limits.max_input_chars:
+            errors.append(f"{name} is too long ({len(value)} characters; limit {limits.max_input_chars}).")
+    if pattern and len(pattern) > limits.max_pattern_chars:
+        errors.append(f"Pattern is too long ({len(pattern)} characters; limit {limits.max_pattern_chars}).")
+    return errors
+
+
+class TokenBuckets:
+    """Per-client token buckets; the least recently seen clients are forgotten past ``max_clients``."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10000) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, client: str, now: Optional[float] = None, cost: float = 1.0) -> float:
+        """Spend ``cost`` tokens; returns 0 on success, else the seconds until they are available.
+
+        A cost above the bucket size is charged as a full bucket.
+        """
+        now = time.monotonic() if now is None else now
+        cost = min(cost, float(self.burst))
+        tokens, last = self._buckets.pop(client, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class ConcurrencyGate:
+    """At most ``limit`` holders; up to ``max_queue`` waiters, served first come, first served.
+
+    Lives on the event loop (no locks): ``release`` hands the slot straight to
+    the oldest live waiter.
+    """
+
+    def __init__(self, limit: int, max_queue: int) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:  # client went away while queued
+            if waiter.done():
+                self.release()  # the slot was already handed to us; pass it on
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        if waiter.done():
+            return True
+        waiter.cancel()
+        self._waiters.remove(waiter)
+        return False
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot passes to this waiter; ``active`` is unchanged
+                return
+        self.active -= 1
+
+
+def _plain(status: int, text: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Message, Message]:
+    body = text.encode("utf-8")
+    raw = [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(body)).encode())]
+    raw += [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return {"type": "http.response.start", "status": status, "headers": raw}, {"type": "http.response.body", "body": body}
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, limits: AdmissionLimits = LIMITS) -> None:
+        self.app = app
+        self.limits = limits
+        self.buckets = TokenBuckets(limits.rate, limits.burst) if limits.rate > 0 else None
+        self.gate = ConcurrencyGate(limits.max_concurrent, limits.max_queue) if limits.max_concurrent > 0 else None
+        metrics.REGISTRY.add_collector(self._collect)
+
+    def _collect(self) -> List[str]:
+        if self.gate is None:
+            return []
+        name = "promptkit_admission"
+        return [
+            f"# HELP {name}_active Generations holding a concurrency slot.", f"# TYPE {name}_active gauge",
+            f"{name}_active {self.gate.active}",
+            f"# HELP {name}_queued Requests waiting for a slot.", f"# TYPE {name}_queued gauge",
+            f"{name}_queued {self.gate.waiting}",
+        ]
+
+    def _client(self, scope: Scope) -> str:
+        # Behind a proxy, uvicorn's --proxy-headers has already replaced the
+        # socket address with the one the trusted proxy reported.
+        client = scope.get("client")
+        return client[0] if client else "-"
+
+    async def _reject(self, send: Send, reason: str, status: int, text: str, retry_after: Optional[float] = None) -> None:
+        REJECTED.inc(reason)
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after is not None else None
+        for message in _plain(status, text, headers):
+            await send(message)
+
+    async def wait_turn(self, scope: Scope, cost: float = 1.0) -> None:
+        """Wait until ``cost`` tokens and a concurrency slot are available; pair with ``release``."""
+        if self.buckets is not None:
+            client = self._client(scope)
+            while cost > 0:
+                piece = min(cost, float(self.buckets.burst))  # more than a bucketful is paid over several refills
+                wait = self.buckets.take(client, cost=piece)
+                if wait:
+                    THROTTLED.inc("rate_limit")
+                    await asyncio.sleep(wait)
+                else:
+                    cost -= piece
+        if self.gate is not None:
+            while True:
+                full = self.gate.waiting >= self.gate.max_queue
+                if await self.gate.acquire(self.limits.queue_timeout):
+                    break
+                THROTTLED.inc("overload")
+                if full:  # refused without waiting: back off before queueing again
+                    await asyncio.sleep(self.limits.queue_timeout)
+
+    def release(self) -> None:
+        if self.gate is not None:
+            self.gate.release()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        root = scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root):]
+        if scope["type"] == "websocket" and path in SESSION_PATHS:
+            scope[_SCOPE_KEY] = self
+            if self.buckets is not None and self.buckets.take(self._client(scope)):
+                REJECTED.inc("rate_limit")
+                await receive()  # websocket.connect
+                await send({"type": "websocket.close", "code": 1013})  # try again later
+                return
+            await self.app(scope, receive, send)
+            return
+        if scope["type"] != "http" or path not in GENERATION_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if path in STREAMED_PATHS:
+            # One token and one slot would cover a stream of any length; the
+            # handler charges and gates its records through ``admitted``.
+            scope[_SCOPE_KEY] = self
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits.max_body_bytes
+        for key, value in scope.get("headers", ()):
+            if key == b"content-length" and value.isdigit() and int(value) > limit:
+                await self._reject(send, "body_size", 413, f"Request body too large (limit {limit} bytes).")
+                return
+
+        if self.buckets is not None:
+            wait = self.buckets.take(self._client(scope))
+            if wait:
+                await self._reject(send, "rate_limit", 429, "Too many requests; slow down.", wait)
+                return
+
+        if self.gate is not None and not await self.gate.acquire(self.limits.queue_timeout):
+            await self._reject(send, "overload", 503, "Server busy; retry shortly.", self.limits.queue_timeout)
+            return
+
+        received = 0
+
+        async def _receive() -> Message:
+            # Chunked uploads carry no Content-Length; count as the body arrives.
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    REJECTED.inc("body_size")
+                    raise HTTPException(413, f"Request body too large (limit {limit} bytes).")
+            return message
+
+        try:
+            await self.app(scope, _receive, send)
+        finally:
+            if self.gate is not None:
+                self.gate.release()
+
+
+@asynccontextmanager
+async def admitted(scope: Scope, cost: float = 1.0) -> AsyncIterator[None]:
+    """Admission for one unit of work inside an open preview session or batch stream.
+
+    Waits for ``cost`` tokens and a concurrency slot, held until the block
+    exits. A no-op when the app runs without ``AdmissionMiddleware``.
+    """
+    middleware: Optional[AdmissionMiddleware] = scope.get(_SCOPE_KEY)
+    if middleware is None:
+        yield
+        return
+    await middleware.wait_turn(scope, cost)
+    try:
+        yield
+    finally:
+        middleware.release()
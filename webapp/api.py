@@ -0,0 +1,187 @@
+"""JSON API: single generation and streaming NDJSON batches, both via ``run_promptkit``."""
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+
+from promptkit.jsonio import dumps
+
+from .admission import LIMITS, admitted, input_errors
+from .metrics import set_mode
+from .services.promptkit_service import MODES, run_promptkit
+
+
+log = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1", tags=["api"])
+
+
+class GenerateRequest(BaseModel):
+    seed: str
+    friction: str
+    pattern: Optional[str] = None
+    mode: str = "iterate"
+    ascii_only: bool = False
+    json_out: bool = True
+
+
+def _generate(record: Dict[str, Any], defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one record (falling back to ``defaults``) and run it; raises ``ValueError``."""
+    fields = {**defaults, **{k: v for k, v in record.items() if v is not None}}
+    seed = fields.get("seed")
+    friction = fields.get("friction")
+    if not isinstance(seed, str) or not seed.strip():
+        raise ValueError("'seed' is required")
+    if not isinstance(friction, str) or not friction.strip():
+        raise ValueError("'friction' is required")
+    pattern = fields.get("pattern")
+    if pattern is not None and not isinstance(pattern, str):
+        raise ValueError("'pattern' must be a string")
+    errors = input_errors(seed, friction, pattern)
+    if errors:
+        raise ValueError(" ".join(errors))
+    mode = str(fields.get("mode") or "iterate").strip().lower()
+    result = run_promptkit(
+        mode=mode,
+        seed=seed.strip(),
+        friction=friction.strip(),
+        pattern=(pattern or "").strip() or None,
+        ascii_only=bool(fields.get("ascii_only")),
+        json_out=bool(fields.get("json_out", True)),
+    )
+    return {"mode": mode, **result}
+
+
+@router.post("/generate")
+def generate(request: Request, body: GenerateRequest) -> Dict[str, Any]:
+    """One artifact: ``{mode, text, json, filename_hint}`` (``json`` is null with ``json_out: false``)."""
+    set_mode(request, body.mode.strip().lower())
+    try:
+        return _generate(dict(body), {})
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """Streams results while the request body is still being read.
+
+    ``StreamingResponse`` watches ``receive`` for disconnects, which would
+    swallow request body chunks; here a disconnect surfaces through
+    ``request.stream()`` instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+# Records generated per threadpool hop: enough to amortize the hop, small
+# enough that results keep streaming and one batch can't hog a thread.
+BATCH_CHUNK = 32
+
+
+async def _iter_line_chunks(
+    request: Request, size: int = BATCH_CHUNK, max_line: Optional[int] = None
+) -> AsyncIterator[List[Optional[bytes]]]:
+    """Request body split into lines as it arrives (never buffered whole), at most ``size`` per chunk.
+
+    A chunk holds the lines already received; it never waits for more input.
+    A line longer than ``max_line`` (default ``LIMITS.max_body_bytes``) comes
+    out as ``None`` and the rest of it is discarded unread.
+    """
+    limit = LIMITS.max_body_bytes if max_line is None else max_line
+    pending = bytearray()
+    skipping = False  # inside a line already reported as too large
+    async for data in request.stream():
+        *ends, tail = data.split(b"\n")
+        lines: List[Optional[bytes]] = []
+        for part in ends:
+            if skipping:
+                skipping = False
+            elif pending:
+                pending += part
+                lines.append(bytes(pending) if len(pending) <= limit else None)
+                del pending[:]
+            else:
+                lines.append(part if len(part) <= limit else None)
+        if not skipping:
+            pending += tail
+            if len(pending) > limit:
+                lines.append(None)
+                del pending[:]
+                skipping = True
+        for start in range(0, len(lines), size):
+            yield lines[start:start + size]
+    if pending:
+        yield [bytes(pending)]
+
+
+def _batch_line(line_no: int, raw: Optional[bytes], defaults: Dict[str, Any]) -> str:
+    out: Dict[str, Any] = {"line": line_no}
+    if raw is None:
+        out["error"] = "record too large"
+        return dumps(out, compact=True) + "\n"
+    try:
+        record = json.loads(raw)
+        if not isinstance(record, dict):
+            raise ValueError("record must be a JSON object")
+        if "id" in record:
+            out["id"] = record.pop("id")
+        out.update(_generate(record, defaults))
+    except ValueError as exc:  # includes JSONDecodeError
+        out["error"] = f"{type(exc).__name__}: {exc}"
+    except Exception as exc:  # per-record isolation: report, log and keep streaming
+        log.exception("batch record %d failed", line_no)
+        out["error"] = f"{type(exc).__name__}: {exc}"
+    return dumps(out, compact=True) + "\n"
+
+
+def _has_record(raw: Optional[bytes]) -> bool:
+    return raw is None or bool(raw.strip())
+
+
+def _batch_chunk(first_line: int, lines: List[Optional[bytes]], defaults: Dict[str, Any]) -> str:
+    return "".join(
+        _batch_line(n, raw, defaults) for n, raw in enumerate(lines, first_line) if _has_record(raw)
+    )
+
+
+@router.post("/batch")
+async def batch(
+    request: Request,
+    mode: str = "iterate",
+    ascii_only: bool = False,
+    json_out: bool = True,
+) -> StreamingResponse:
+    """NDJSON in, NDJSON out, one result line per input line as soon as it is produced.
+
+    Each record is ``{seed, friction[, pattern, mode, ascii_only, json_out, id]}``;
+    query parameters supply defaults. Results carry the input ``line`` and
+    ``id``; a bad record yields ``{"line", "error"}`` and the stream goes on.
+    """
+    mode = mode.strip().lower()
+    set_mode(request, mode)
+    if mode not in MODES:
+        raise HTTPException(status_code=422, detail=f"mode must be one of: {' | '.join(MODES)}")
+    defaults = {"mode": mode, "ascii_only": ascii_only, "json_out": json_out}
+
+    async def _results() -> AsyncIterator[str]:
+        line_no = 1
+        async for lines in _iter_line_chunks(request):
+            # A token per record and a concurrency slot per chunk; generation
+            # is synchronous, so it runs off the event loop.
+            async with admitted(request.scope, cost=max(1, sum(1 for raw in lines if _has_record(raw)))):
+                text = await run_in_threadpool(_batch_chunk, line_no, lines, defaults)
+            line_no += len(lines)
+            if text:
+                yield text
+
+    return _DuplexStreamingResponse(_results(), media_type="application/x-ndjson")
@@ -1,127 +1,289 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
-from typing import Optional
+from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
 
-from fastapi import FastAPI, Form, Request
-from fastapi.responses import HTMLResponse, PlainTextResponse, Response
+from fastapi import FastAPI, Form, Query, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from .services.promptkit_service import run_promptkit
+from promptkit.cache import default_cache, make_key, normalize_pattern
+from promptkit.cards import PATTERNS, make_iterate_card
+from promptkit.jsonio import dumps
+from promptkit.metrics import REGISTRY, stage_timer
+from promptkit.plan import build_plan_text
 
+from .admission import AdmissionMiddleware, input_errors
+from .api import router as api_router
+from .metrics import ENABLED as METRICS_ENABLED, MetricsMiddleware, cache_collector, set_mode, size_collector
+from .metrics import router as metrics_router
+from .preview import router as preview_router
+from .services.artifacts import KINDS, ArtifactStore
+from .services.page_cache import PageCache, cached_response, etag_matches
+from .services.promptkit_service import MODES, iter_promptkit, run_promptkit, run_variants
 
-app = FastAPI(title="PromptKit – Diagnostics Web")
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    prerender_pages()
+    yield
+
+
+app = FastAPI(title="PromptKit – Diagnostics Web", lifespan=_lifespan)
 
 templates = Jinja2Templates(directory="webapp/templates")
 app.mount("/static", StaticFiles(directory="webapp/static"), name="static")
+app.include_router(api_router)
+app.include_router(metrics_router)
+app.include_router(preview_router)
+app.add_middleware(AdmissionMiddleware)
+if METRICS_ENABLED:  # outermost, so requests shed by admission control are counted too
+    app.add_middleware(MetricsMiddleware)
 
 
-@app.get("/", response_class=HTMLResponse)
-def index(request: Request, preset: Optional[str] = None) -> HTMLResponse:
-    # Presets for quick fill
-    seed = ""
-    friction = ""
-    pattern = ""
-    if preset == "snacks":
-        seed = (
-            "SnackSmith flavor assistant helps build custom snacks from natural-language taste descriptions."
-        )
-        friction = (
-            "Misinterprets adjectives; mixes mismatched flavors; lacks constraints memory; no fast staff override."
-        )
-        pattern = "constraint-ledger"
-    elif preset == "bard":
-        seed = "Bartholomew the Bard offers epic, 14-line sonnets for mundane household chores."
-        friction = "Instead of sonnets, he writes three-word haikus about dust motes, and calls the user 'my liege.'"
-        pattern = "contrastive-clarify"
-    elif preset == "chef":
-        seed = "Chef Chaos is an enthusiastic cooking assistant that suggests recipes based on what's currently in your pantry."
-        friction = "It always suggests a recipe for tuna casserole, regardless of what ingredients you list, even if you explicitly say, 'No tuna.'"
-        pattern = "constraint-ledger"
-    elif preset == "roomba":
-        seed = "The Existential Roomba gives deep philosophical quotes about the meaninglessness of existence with every floor cleaning update."
-        friction = "It frequently gets stuck on a rug and starts yelling about the futility of its task in all caps, scaring the cat."
-        pattern = "override-hook"
-    elif preset == "weather":
-        seed = "The Sarcastic Weather Man delivers accurate but extremely passive-aggressive local forecasts."
-        friction = "When it rains, it suggests the user stay home and contemplate their life choices, and refuses to give an actual rain start time."
-        pattern = "exemplar-propose"
-    elif preset == "travelmate":
-        seed = "TravelMate planner helps design 7-day city trips based on vibe and budget."
-        friction = "Gives poetic but impractical itineraries; ignores budget and timing constraints."
-        pattern = "constraint-ledger,exemplar-propose"
-
-    # Feature flags via env or query string (?flags=compare,wizard,feedback)
+# name -> (seed, friction, pattern) for quick fill via /?preset=<name>
+PRESETS: Dict[str, Tuple[str, str, str]] = {
+    "snacks": (
+        "SnackSmith flavor assistant helps build custom snacks from natural-language taste descriptions.",
+        "Misinterprets adjectives; mixes mismatched flavors; lacks constraints memory; no fast staff override.",
+        "constraint-ledger",
+    ),
+    "bard": (
+        "Bartholomew the Bard offers epic, 14-line sonnets for mundane household chores.",
+        "Instead of sonnets, he writes three-word haikus about dust motes, and calls the user 'my liege.'",
+        "contrastive-clarify",
+    ),
+    "chef": (
+        "Chef Chaos is an enthusiastic cooking assistant that suggests recipes based on what's currently in your pantry.",
+        "It always suggests a recipe for tuna casserole, regardless of what ingredients you list, even if you explicitly say, 'No tuna.'",
+        "constraint-ledger",
+    ),
+    "roomba": (
+        "The Existential Roomba gives deep philosophical quotes about the meaninglessness of existence with every floor cleaning update.",
+        "It frequently gets stuck on a rug and starts yelling about the futility of its task in all caps, scaring the cat.",
+        "override-hook",
+    ),
+    "weather": (
+        "The Sarcastic Weather Man delivers accurate but extremely passive-aggressive local forecasts.",
+        "When it rains, it suggests the user stay home and contemplate their life choices, and refuses to give an actual rain start time.",
+        "exemplar-propose",
+    ),
+    "travelmate": (
+        "TravelMate planner helps design 7-day city trips based on vibe and budget.",
+        "Gives poetic but impractical itineraries; ignores budget and timing constraints.",
+        "constraint-ledger,exemplar-propose",
+    ),
+}
+
+_FLAG_NAMES = ("wizard", "compare", "feedback", "preview")
+
+# Env flags are read once; per-request flags come from the query string.
+_ENV_FLAGS = {
+    "wizard": os.getenv("PK_UI_WIZARD", "0") in {"1", "true", "True"},
+    "compare": os.getenv("PK_UI_COMPARE", "0") in {"1", "true", "True"},
+    "feedback": os.getenv("PK_UI_FEEDBACK", "0") in {"1", "true", "True"},
+    "preview": os.getenv("PK_UI_PREVIEW", "0") in {"1", "true", "True"},
+}
+
+# Seconds browsers and proxies may reuse prerendered pages (they change only on deploy).
+_PAGE_MAX_AGE = int(os.getenv("PK_PAGE_MAX_AGE", "86400"))
+
+pages = PageCache()
+artifacts = ArtifactStore(
+    int(os.getenv("PK_ARTIFACT_STORE_MB", "32")) * 1024 * 1024,
+    directory=Path(os.environ["PK_ARTIFACT_DIR"]) if os.getenv("PK_ARTIFACT_DIR") else None,
+    ttl=int(os.getenv("PK_ARTIFACT_TTL", "86400")),
+)
+
+if METRICS_ENABLED:
+    REGISTRY.add_collector(cache_collector)
+    REGISTRY.add_collector(size_collector("promptkit_page_cache_entries", "Prerendered pages held in memory.", lambda: len(pages)))
+    REGISTRY.add_collector(size_collector("promptkit_artifacts", "Downloads held in the artifact store.", lambda: len(artifacts)))
+
+
+def _ui_flags(request: Request) -> Dict[str, bool]:
+    # Feature flags via env or query string (?flags=compare,wizard,feedback,preview)
     raw_flags = request.query_params.get("flags", "")
     qs_flags = {k.strip().lower() for k in raw_flags.split(",") if k.strip()}
-    flags = {
-        "wizard": os.getenv("PK_UI_WIZARD", "0") in {"1", "true", "True"} or ("wizard" in qs_flags),
-        "compare": os.getenv("PK_UI_COMPARE", "0") in {"1", "true", "True"} or ("compare" in qs_flags),
-        "feedback": os.getenv("PK_UI_FEEDBACK", "0") in {"1", "true", "True"} or ("feedback" in qs_flags),
-    }
+    return {name: _ENV_FLAGS[name] or (name in qs_flags) for name in _FLAG_NAMES}
 
-    # Canonical flags string for preserving in links
-    flags_str = ",".join([k for k, v in flags.items() if v])
-
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "form_defaults": {
-                "seed": seed,
-                "friction": friction,
-                "pattern": pattern,
-                "mode": "iterate",
-                "ascii_only": True,
-                "json_out": False,
-            },
-            "flags": flags,
-            "flags_str": flags_str,
-            "errors": None,
-            "result": None,
+
+def _render_index(preset: Optional[str], flags: Dict[str, bool]) -> str:
+    seed, friction, pattern = PRESETS.get(preset or "", ("", "", ""))
+    timer = stage_timer("web")
+    html = templates.get_template("index.html").render(
+        form_defaults={
+            "seed": seed,
+            "friction": friction,
+            "pattern": pattern,
+            "mode": "iterate",
+            "ascii_only": True,
+            "json_out": False,
         },
+        flags=flags,
+        # Canonical flags string for preserving in links
+        flags_str=",".join([k for k, v in flags.items() if v]),
+        errors=None,
+        result=None,
     )
+    timer.lap("template")
+    timer.done("index.html")
+    return html
+
+
+def _page_cache_control() -> str:
+    return f"public, max-age={_PAGE_MAX_AGE}"
+
+
+@app.get("/", response_class=HTMLResponse)
+def index(request: Request, preset: Optional[str] = None) -> Response:
+    # Unknown presets render the empty form, so they share its cache entry.
+    preset = preset if preset in PRESETS else None
+    flags = _ui_flags(request)
+    key = ("index", preset, tuple(k for k, v in flags.items() if v))
+    return pages.respond(request, key, lambda: _render_index(preset, flags), _page_cache_control())
 
 
 @app.get("/research", response_class=HTMLResponse)
-def research(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse(
-        "research.html",
-        {"request": request},
-    )
+def research(request: Request) -> Response:
+    return pages.respond(request, "research", lambda: templates.get_template("research.html").render(), _page_cache_control())
 
 
 @app.get("/modes", response_class=HTMLResponse)
-def modes(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse(
-        "modes.html",
-        {"request": request},
+def modes(request: Request) -> Response:
+    return pages.respond(request, "modes", lambda: templates.get_template("modes.html").render(), _page_cache_control())
+
+
+def prerender_pages() -> int:
+    """Render the static pages and every preset (with the env flags) into the page cache."""
+    flags = dict(_ENV_FLAGS)
+    active = tuple(k for k, v in flags.items() if v)
+    for preset in (None, *PRESETS):
+        pages.get(("index", preset, active), lambda: _render_index(preset, flags))
+    for name in ("research", "modes"):
+        pages.get(name, lambda: templates.get_template(f"{name}.html").render())
+    return len(pages)
+
+
+def warm_up() -> int:
+    """Build what a worker would otherwise build on first use (run before forking workers).
+
+    Loads the pattern registry and combo/plan caches for every single
+    pattern, compiles all templates and prerenders the cached pages.
+    Returns the number of prerendered pages.
+    """
+    from promptkit import metrics
+
+    was_enabled = metrics.enabled()
+    metrics.enable(False)  # warm-up runs are not traffic
+    try:
+        for key in (None, *PATTERNS):
+            for ascii_only in (False, True):
+                make_iterate_card("warm-up", "warm-up", ascii_only=ascii_only, pattern=key).render_text()
+                build_plan_text("warm-up", "warm-up", pattern=key, ascii_only=ascii_only)
+        for path in Path("webapp/templates").glob("*.html"):
+            templates.get_template(path.name)
+        return prerender_pages()
+    finally:
+        metrics.enable(was_enabled)
+
+
+def _templates_revision() -> str:
+    """Digest of the template sources, so cached pages and ETags change when templates do."""
+    digest = hashlib.sha256()
+    for path in sorted(Path("webapp/templates").glob("*.html")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+_TEMPLATES_REV = _templates_revision()
+
+# Seconds a reverse proxy / browser may reuse a GET /run permalink response.
+_RUN_MAX_AGE = int(os.getenv("PK_RUN_MAX_AGE", "3600"))
+
+
+def _permalink(seed: str, friction: str, pattern: Optional[str], mode: str, ascii_only: bool, json_out: bool) -> str:
+    query = {"seed": seed, "friction": friction, "mode": mode}
+    if pattern:
+        query["pattern"] = pattern
+    if ascii_only:
+        query["ascii_only"] = "true"
+    if json_out:
+        query["json_out"] = "true"
+    return "/run?" + urlencode(query)
+
+
+# Upper bound on compare columns per request (besides the main result).
+_COMPARE_MAX = int(os.getenv("PK_COMPARE_MAX", "24"))
+
+Variant = Tuple[str, str]  # (mode, canonical pattern spec; "" = auto-detect)
+
+
+def _compare_variants(mode: str, pattern: Optional[str], modes: Sequence[str], patterns: Sequence[str]) -> Tuple[Variant, ...]:
+    """Columns to show next to the main result: every selected mode x every selected pattern.
+
+    ``patterns`` entries may hold several specs separated by ``;`` or
+    whitespace (``ledger,clarify; state-bag``); ``all`` expands to every
+    pattern and ``auto`` means auto-detect. Without a selection this is the
+    classic iterate-vs-plan comparison. Tickets ignore the pattern, so they
+    appear once.
+    """
+    modes = [m for m in dict.fromkeys(m.strip().lower() for m in modes) if m in MODES]
+    specs = []
+    for entry in patterns:
+        for spec in entry.replace(";", " ").split():
+            if spec.lower() == "all":
+                specs.extend(PATTERNS)
+            elif spec.lower() == "auto":
+                specs.append("")
+            elif normalize_pattern(spec):
+                specs.append(normalize_pattern(spec))
+    main = (mode, "" if mode == "ticket" else normalize_pattern(pattern))
+    if not modes and not specs:
+        if mode not in {"iterate", "plan"}:
+            return ()
+        modes = ["plan" if mode == "iterate" else "iterate"]
+    variants = dict.fromkeys(
+        (m, "" if m == "ticket" else p)
+        for m in (modes or [mode])
+        for p in (specs or [main[1]])
     )
+    variants.pop(main, None)
+    return tuple(variants)[:_COMPARE_MAX]
 
 
-@app.post("/run", response_class=HTMLResponse)
-def run(
+def _run_response(
     request: Request,
-    seed: str = Form(...),
-    friction: str = Form(...),
-    pattern: Optional[str] = Form(None),
-    mode: str = Form("iterate"),
-    ascii_only: bool = Form(False),
-    json_out: bool = Form(False),
-    compare: Optional[bool] = Form(False),
-) -> HTMLResponse:
+    seed: str,
+    friction: str,
+    pattern: Optional[str],
+    mode: str,
+    ascii_only: bool,
+    json_out: bool,
+    compare: Optional[bool],
+    cache_control: str,
+    compare_modes: Sequence[str] = (),
+    compare_patterns: Sequence[str] = (),
+) -> Response:
     seed = (seed or "").strip()
     friction = (friction or "").strip()
     pattern = (pattern or "").strip() or None
     mode = (mode or "iterate").strip().lower()
+    set_mode(request, mode)
 
     errors = []
     if not seed:
         errors.append("Seed is required.")
     if not friction:
         errors.append("Friction is required.")
+    errors += input_errors(seed, friction, pattern)
     if errors:
         # If it's an HTMX request, return only the fragment. Otherwise return full page.
         if request.headers.get("HX-Request"):
@@ -145,115 +307,226 @@ def run(
             },
         )
 
+    flags = _ui_flags(request)
+    variants: Tuple[Variant, ...] = ()
+    if compare and flags["compare"]:
+        variants = _compare_variants(mode, pattern, compare_modes, compare_patterns)
+    fragment = bool(request.headers.get("HX-Request"))
+
+    # Output is a pure function of these (plus the package version, which
+    # make_key adds), so they key both the ETag and the rendered-page cache.
+    page_params = {
+        "seed": seed,
+        "friction": friction,
+        "pattern": pattern or "",
+        "mode": mode,
+        "ascii": ascii_only,
+        "json": json_out,
+        "compare": [list(v) for v in variants],
+        "flags": sorted(k for k, v in flags.items() if v),
+        "fragment": fragment,
+        "templates": _TEMPLATES_REV,
+    }
+    key = make_key("web:page", page_params)
+    headers = {"ETag": f'"{key[:32]}"', "Cache-Control": cache_control, "Vary": "HX-Request"}
+    # Not modified: answered before any generation, as long as the downloads
+    # the client's copy links to are still stored.
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]) and _downloads_alive(key):
+        return Response(status_code=304, headers=headers)
+
+    # The page links to its downloads, so (re)store them even when the page
+    # itself is cached: the artifact LRU may have dropped them.
     result = run_promptkit(
         mode=mode,
         seed=seed,
         friction=friction,
         pattern=pattern,
         ascii_only=ascii_only,
-        json_out=json_out if mode == "iterate" else False,
+        json_out=json_out,
     )
+    inputs = {
+        "seed": seed,
+        "friction": friction,
+        "pattern": pattern or "",
+        "mode": mode,
+        "ascii_only": ascii_only,
+        "json_out": json_out,
+    }
+    downloads = _store_downloads(result, inputs)
+    default_cache().set(f"web:downloads:{key}", dumps(downloads, compact=True))
+
+    def _render() -> str:
+        return _render_run_page(result, downloads, inputs, variants, flags, fragment)
+
+    html = default_cache().get_or_compute("web:page", page_params, _render)
+    return HTMLResponse(html, headers=headers)
+
+
+def _downloads_alive(page_key: str) -> bool:
+    """True if the downloads last linked from the page ``page_key`` are all still in the artifact store."""
+    recorded = default_cache().get(f"web:downloads:{page_key}")
+    if recorded is None:
+        return False
+    for url in json.loads(recorded).values():
+        artifact_id, _, kind = url.rpartition("/")[2].partition(".")
+        if not artifacts.touch(artifact_id, kind):
+            return False
+    return True
+
 
+def _store_downloads(result: Dict[str, Any], inputs: Dict[str, Any]) -> Dict[str, str]:
+    """Put the text, JSON and session downloads in the artifact store; returns their URLs."""
+    hint = result.get("filename_hint") or inputs["mode"]
+    urls = {"text": f"/artifact/{artifacts.put(result.get('text', ''), 'txt', f'{hint}.txt')}.txt"}
+    if result.get("json"):
+        body = dumps(result["json"], ascii_only=False)
+        urls["json"] = f"/artifact/{artifacts.put(body, 'json', f'{hint}.json')}.json"
+    session = {**inputs, "output": {"text": result.get("text", ""), "json": result.get("json")}}
+    urls["session"] = f"/artifact/{artifacts.put(dumps(session), 'json', 'session.json')}.json"
+    return urls
+
+
+def _render_run_page(
+    result: Dict[str, Any],
+    downloads: Dict[str, str],
+    inputs: Dict[str, Any],
+    variants: Sequence[Variant],
+    flags: Dict[str, bool],
+    fragment: bool,
+) -> str:
+    seed, friction, mode = inputs["seed"], inputs["friction"], inputs["mode"]
+    pattern, ascii_only, json_out = inputs["pattern"] or None, inputs["ascii_only"], inputs["json_out"]
     payload = {
         "text": result.get("text", ""),
         "json": result.get("json"),
         "filename_hint": result.get("filename_hint", mode),
         "mode": mode,
-    }
-
-    # Feature flags
-    raw_flags = request.query_params.get("flags", "")
-    qs_flags = {k.strip().lower() for k in raw_flags.split(",") if k.strip()}
-    flags = {
-        "wizard": os.getenv("PK_UI_WIZARD", "0") in {"1", "true", "True"} or ("wizard" in qs_flags),
-        "compare": os.getenv("PK_UI_COMPARE", "0") in {"1", "true", "True"} or ("compare" in qs_flags),
-        "feedback": os.getenv("PK_UI_FEEDBACK", "0") in {"1", "true", "True"} or ("feedback" in qs_flags),
+        "permalink": _permalink(seed, friction, pattern, mode, ascii_only, json_out),
+        "downloads": downloads,
     }
 
     compare_payload = None
-    do_compare = bool(compare) and flags["compare"] and mode in {"iterate", "plan"}
-    if do_compare:
-        alt_mode = "plan" if mode == "iterate" else "iterate"
-        alt = run_promptkit(
-            mode=alt_mode,
-            seed=seed,
-            friction=friction,
-            pattern=pattern,
-            ascii_only=ascii_only,
-            json_out=False,
-        )
+    if variants:
+        alts = run_variants([(m, p or None) for m, p in variants], seed, friction, ascii_only)
+        main = (mode, "" if mode == "ticket" else normalize_pattern(pattern))
         compare_payload = {
-            "left": {"mode": mode, "text": payload["text"]},
-            "right": {"mode": alt_mode, "text": alt.get("text", "")},
+            "columns": [
+                {"mode": m, "pattern": p, "text": text}
+                for (m, p), text in zip((main, *variants), (payload["text"], *(alt.get("text", "") for alt in alts)))
+            ]
         }
 
-    if request.headers.get("HX-Request"):
-        return templates.TemplateResponse(
-            "_output.html",
-            {
-                "request": request,
-                "errors": None,
-                "result": payload,
-                "inputs": {
-                    "seed": seed,
-                    "friction": friction,
-                    "pattern": pattern or "",
-                    "mode": mode,
-                    "ascii_only": ascii_only,
-                    "json_out": json_out,
-                },
-                "compare": compare_payload,
-                "flags": flags,
-            },
+    timer = stage_timer("web")
+    if fragment:
+        html = templates.get_template("_output.html").render(
+            errors=None,
+            result=payload,
+            inputs=inputs,
+            compare=compare_payload,
+            flags=flags,
         )
+        timer.lap("template")
+        timer.done("_output.html")
+        return html
     # Non-HTMX fallback: render full page with output embedded
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "form_defaults": {
-                "seed": seed,
-                "friction": friction,
-                "pattern": pattern or "",
-                "mode": mode,
-                "ascii_only": ascii_only,
-                "json_out": json_out,
-            },
-            "errors": None,
-            "result": payload,
-            "inputs": {
-                "seed": seed,
-                "friction": friction,
-                "pattern": pattern or "",
-                "mode": mode,
-                "ascii_only": ascii_only,
-                "json_out": json_out,
-            },
-            "compare": compare_payload,
-            "flags": flags,
-            "flags_str": ",".join([k for k, v in flags.items() if v]),
-        },
+    html = templates.get_template("index.html").render(
+        form_defaults=inputs,
+        errors=None,
+        result=payload,
+        inputs=inputs,
+        compare=compare_payload,
+        flags=flags,
+        flags_str=",".join([k for k, v in flags.items() if v]),
     )
+    timer.lap("template")
+    timer.done("index.html")
+    return html
 
 
-@app.post("/download/text")
-def download_text(filename: str = Form("output.txt"), content: str = Form("")) -> Response:
-    fname = filename if filename else "output.txt"
-    headers = {"Content-Disposition": f"attachment; filename=\"{fname}\""}
-    return Response(content=content, media_type="text/plain; charset=utf-8", headers=headers)
+@app.post("/run", response_class=HTMLResponse)
+def run(
+    request: Request,
+    seed: str = Form(...),
+    friction: str = Form(...),
+    pattern: Optional[str] = Form(None),
+    mode: str = Form("iterate"),
+    ascii_only: bool = Form(False),
+    json_out: bool = Form(False),
+    compare: Optional[bool] = Form(False),
+    compare_modes: List[str] = Form([]),
+    compare_patterns: List[str] = Form([]),
+) -> Response:
+    # Form posts aren't stored by shared caches; clients may still revalidate with If-None-Match.
+    return _run_response(
+        request, seed, friction, pattern, mode, ascii_only, json_out, compare, "no-cache", compare_modes, compare_patterns
+    )
 
 
-@app.post("/download/json")
-def download_json(filename: str = Form("output.json"), content: str = Form("{}")) -> Response:
-    fname = filename if filename else "output.json"
+@app.get("/run", response_class=HTMLResponse)
+def run_permalink(
+    request: Request,
+    seed: str = "",
+    friction: str = "",
+    pattern: Optional[str] = None,
+    mode: str = "iterate",
+    ascii_only: bool = False,
+    json_out: bool = False,
+    compare: Optional[bool] = False,
+    compare_modes: List[str] = Query([]),
+    compare_patterns: List[str] = Query([]),
+) -> Response:
+    """GET-able /run (shareable permalink) that browsers and reverse proxies may cache."""
+    return _run_response(
+        request,
+        seed,
+        friction,
+        pattern,
+        mode,
+        ascii_only,
+        json_out,
+        compare,
+        f"public, max-age={_RUN_MAX_AGE}",
+        compare_modes,
+        compare_patterns,
+    )
+
+
+@app.post("/run/stream")
+def run_stream(
+    request: Request,
+    seed: str = Form(...),
+    friction: str = Form(...),
+    pattern: Optional[str] = Form(None),
+    mode: str = Form("iterate"),
+    ascii_only: bool = Form(False),
+) -> Response:
+    """Plain-text artifact streamed section by section (no HTML rendering)."""
+    set_mode(request, (mode or "iterate").strip().lower())
+    seed = (seed or "").strip()
+    friction = (friction or "").strip()
+    pattern = (pattern or "").strip() or None
+    if not seed or not friction:
+        return PlainTextResponse("Seed and friction are required.", status_code=422)
+    errors = input_errors(seed, friction, pattern)
+    if errors:
+        return PlainTextResponse(" ".join(errors), status_code=422)
     try:
-        # Ensure it's valid JSON; pretty-print
-        data = json.loads(content)
-        body = json.dumps(data, ensure_ascii=False, indent=2)
-    except Exception:
-        body = content
-    headers = {"Content-Disposition": f"attachment; filename=\"{fname}\""}
-    return Response(content=body, media_type="application/json; charset=utf-8", headers=headers)
+        chunks = iter_promptkit(mode=mode, seed=seed, friction=friction, pattern=pattern, ascii_only=ascii_only)
+    except ValueError as exc:
+        return PlainTextResponse(str(exc), status_code=422)
+    return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
+
+
+@app.get("/artifact/{name}")
+def artifact(request: Request, name: str) -> Response:
+    """A stored download (``<id>.txt`` or ``<id>.json``), gzipped when the client accepts it."""
+    artifact_id, _, kind = name.partition(".")
+    stored = artifacts.get(artifact_id, kind)
+    if stored is None:
+        return PlainTextResponse("Artifact not found or expired; run again to regenerate it.", status_code=404)
+    disposition = {"Content-Disposition": f'attachment; filename="{stored.filename.replace(chr(34), "")}"'}
+    # Content-addressed, so it never changes.
+    return cached_response(request, stored.page, "public, max-age=31536000, immutable", KINDS[kind], disposition)
 
 
 @app.get("/health")
@@ -0,0 +1,202 @@
+"""Request metrics middleware and the Prometheus ``/metrics`` endpoint.
+
+Enabled unless ``PK_METRICS=0``; when disabled the middleware is not
+installed, generation stages stay no-ops and ``/metrics`` returns 404.
+
+Under the prefork server each worker keeps its own registry. With
+``PK_METRICS_DIR`` set (``python -m webapp serve`` does so for more than one
+worker), every worker labels its samples ``worker="<pid>"`` and snapshots
+them there, and a scrape of any worker returns all of them, so counters
+never appear to go backwards when successive scrapes land on different
+workers.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from promptkit import metrics
+from promptkit.cache import default_cache
+
+from .services.promptkit_service import MODES
+
+ENABLED = os.getenv("PK_METRICS", "1") not in {"0", "false", "False"}
+if ENABLED:
+    metrics.enable()
+
+REQUEST_SECONDS: metrics.Histogram = metrics.REGISTRY.register(metrics.Histogram(  # type: ignore[assignment]
+    "promptkit_http_request_duration_seconds",
+    "Request latency until the last body byte is sent, by route and mode.",
+    ("route", "method", "mode"),
+))
+REQUESTS: metrics.Counter = metrics.REGISTRY.register(metrics.Counter(  # type: ignore[assignment]
+    "promptkit_http_requests_total",
+    "Finished requests by route and status code.",
+    ("route", "method", "status"),
+))
+IN_FLIGHT: metrics.Gauge = metrics.REGISTRY.register(metrics.Gauge(  # type: ignore[assignment]
+    "promptkit_http_requests_in_flight",
+    "Requests currently being handled.",
+))
+
+router = APIRouter()
+
+
+def set_mode(request: Request, mode: str) -> None:
+    """Label the current request's latency with ``mode`` (handlers call this once they know it)."""
+    request.state.pk_mode = mode if mode in MODES else "other"
+
+
+class MetricsMiddleware:
+    """Times HTTP requests, labelled by route template (not raw path) to bound cardinality."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = "500"
+
+        async def _send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", None) or ("/static" if scope["path"].startswith("/static/") else "other")
+            mode = scope.get("state", {}).get("pk_mode", "")
+            REQUEST_SECONDS.observe(perf_counter() - started, route, scope["method"], mode)
+            REQUESTS.inc(route, scope["method"], status)
+
+
+def _gauge(name: str, help: str, samples: Iterable[tuple]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{labels} {value}")
+    return lines
+
+
+def cache_collector() -> List[str]:
+    """Result cache counters and hit ratio, read at scrape time."""
+    stats = default_cache().stats()
+    lines = ["# HELP promptkit_cache_lookups_total Result cache lookups by outcome.", "# TYPE promptkit_cache_lookups_total counter"]
+    for outcome, key in (("memory_hit", "hits"), ("disk_hit", "disk_hits"), ("miss", "misses")):
+        lines.append(f'promptkit_cache_lookups_total{{outcome="{outcome}"}} {stats[key]}')
+    lines += _gauge("promptkit_cache_hit_ratio", "Result cache hits / lookups since start.", [("", stats["hit_ratio"])])
+    lines += _gauge("promptkit_cache_entries", "Entries in the in-memory result cache.", [("", stats["memory_entries"])])
+    return lines
+
+
+def size_collector(name: str, help: str, size: Callable[[], int]) -> Callable[[], List[str]]:
+    """A collector exposing ``size()`` as a gauge."""
+    return lambda: _gauge(name, help, [("", size())])
+
+
+# ---- Worker snapshots (prefork) ----
+
+_FLUSH_SECONDS = 1.0  # how stale another worker's samples may be
+_STALE_SECONDS = 30.0  # snapshots older than this belong to dead workers
+_shared: Optional[Path] = None  # PK_METRICS_DIR once share_worker_metrics() ran
+_flush_lock = threading.Lock()
+
+
+def share_worker_metrics() -> None:
+    """Label this worker's samples and publish them to ``PK_METRICS_DIR`` (no-op without it)."""
+    global _shared
+    directory = os.getenv("PK_METRICS_DIR")
+    if not ENABLED or not directory or _shared is not None:
+        return
+    _shared = Path(directory)
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+def snapshot_path(directory: str, pid: int) -> Path:
+    return Path(directory) / f"{pid}.prom"
+
+
+def _with_worker(text: str, worker: str) -> str:
+    """Add ``worker="..."`` to every sample line of an exposition."""
+    lines = []
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            cut = min(i for i in (line.find("{"), line.find(" ")) if i >= 0)
+            if line[cut] == "{":
+                line = f'{line[:cut]}{{worker="{worker}",{line[cut + 1:]}'
+            else:
+                line = f'{line[:cut]}{{worker="{worker}"}}{line[cut:]}'
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _flush() -> str:
+    """Render this worker's labelled samples and replace its snapshot; returns them."""
+    assert _shared is not None
+    text = _with_worker(metrics.REGISTRY.render(), str(os.getpid()))
+    path = snapshot_path(str(_shared), os.getpid())
+    with _flush_lock:  # the snapshot never holds older values than a scrape already served
+        try:
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    return text
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(_FLUSH_SECONDS)
+        _flush()
+
+
+def _merge(texts: Iterable[str]) -> str:
+    """Concatenate expositions, one HELP/TYPE header per metric family."""
+    families: Dict[str, Tuple[List[str], List[str]]] = {}
+    for text in texts:
+        samples: Optional[List[str]] = None
+        for line in text.splitlines():
+            if line.startswith("#"):
+                headers, samples = families.setdefault(line.split(" ", 3)[2], ([], []))
+                if line not in headers:
+                    headers.append(line)
+            elif line and samples is not None:
+                samples.append(line)
+    return "".join(line + "\n" for headers, samples in families.values() for line in (*headers, *samples))
+
+
+def _render_all() -> str:
+    assert _shared is not None
+    texts = [_flush()]
+    own = snapshot_path(str(_shared), os.getpid())
+    cutoff = time.time() - _STALE_SECONDS
+    for path in sorted(_shared.glob("*.prom")):
+        try:
+            if path != own and path.stat().st_mtime >= cutoff:
+                texts.append(path.read_text(encoding="utf-8"))
+        except OSError:
+            pass  # the worker exited and the master removed it
+    return _merge(texts)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics_endpoint() -> PlainTextResponse:
+    if not ENABLED:
+        return PlainTextResponse("metrics disabled (PK_METRICS=0)", status_code=404)
+    body = _render_all() if _shared is not None else metrics.REGISTRY.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
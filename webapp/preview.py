@@ -0,0 +1,158 @@
+"""Live preview over a WebSocket: debounced regeneration, line diffs on the wire.
+
+The browser sends the form state (JSON) on every edit; the server waits
+until edits pause for ``PK_PREVIEW_DEBOUNCE_MS``, regenerates the text
+artifact through the result cache and sends only what changed:
+
+    <- {"v": 7, "full": "<text>"}                       first render (or when a diff would be larger)
+    <- {"v": 8, "ops": [[at, delete, [lines...]], ...]}  line edits, last first, so they apply in order
+    <- {"v": 9, "error": "Seed is required."}            previous text stays
+
+Input that arrives while a render is running supersedes it: the stale
+result is dropped and the newest input is rendered instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+
+from promptkit import metrics
+from promptkit.jsonio import dumps
+
+from .admission import LIMITS, admitted, input_errors
+from .services.promptkit_service import MODES, run_promptkit
+
+DEBOUNCE = int(os.getenv("PK_PREVIEW_DEBOUNCE_MS", "150")) / 1000
+MAX_SESSIONS = int(os.getenv("PK_PREVIEW_MAX_SESSIONS", "256"))
+
+MESSAGES: metrics.Counter = metrics.REGISTRY.register(metrics.Counter(  # type: ignore[assignment]
+    "promptkit_preview_messages_total",
+    "Live preview updates by kind (full, diff, error) and renders dropped as superseded.",
+    ("kind",),
+))
+BYTES: metrics.Counter = metrics.REGISTRY.register(metrics.Counter(  # type: ignore[assignment]
+    "promptkit_preview_bytes_total",
+    "Live preview bytes sent, by message kind.",
+    ("kind",),
+))
+
+router = APIRouter()
+_sessions = 0
+
+
+def line_ops(old: List[str], new: List[str]) -> List[List[Any]]:
+    """Edits turning ``old`` into ``new`` as ``[at, delete, insert]``, last first."""
+    ops = [
+        [i1, i2 - i1, new[j1:j2]]
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+        if tag != "equal"
+    ]
+    ops.reverse()
+    return ops
+
+
+def _parse_state(raw: str) -> Dict[str, Any]:
+    state = json.loads(raw)
+    if not isinstance(state, dict):
+        raise ValueError("expected a JSON object")
+    return state
+
+
+def _render(state: Dict[str, Any]) -> Dict[str, str]:
+    """``{"text": ...}`` for one form state, or ``{"error": ...}``."""
+    seed = str(state.get("seed") or "").strip()
+    friction = str(state.get("friction") or "").strip()
+    pattern = str(state.get("pattern") or "").strip() or None
+    mode = str(state.get("mode") or "iterate").strip().lower()
+    errors = [msg for msg, missing in (("Seed is required.", not seed), ("Friction is required.", not friction)) if missing]
+    errors += input_errors(seed, friction, pattern)
+    if mode not in MODES:
+        errors.append(f"Unsupported mode: {mode}")
+    if errors:
+        return {"error": " ".join(errors)}
+    result = run_promptkit(mode, seed, friction, pattern, ascii_only=bool(state.get("ascii_only")))
+    return {"text": result.get("text", "")}
+
+
+@router.websocket("/preview/ws")
+async def preview(ws: WebSocket) -> None:
+    global _sessions
+    if _sessions >= MAX_SESSIONS:
+        await ws.close(code=1013)  # try again later
+        return
+    await ws.accept()
+    _sessions += 1
+    latest: Dict[str, Any] = {}
+    version = 0
+    changed = asyncio.Event()
+
+    async def _receive() -> None:
+        nonlocal latest, version
+        while True:
+            raw = await ws.receive_text()
+            if len(raw) > LIMITS.max_body_bytes:
+                await ws.close(code=1009)  # message too big
+                return
+            try:
+                state = _parse_state(raw)
+            except ValueError:
+                continue
+            latest, version = state, version + 1
+            changed.set()
+
+    async def _send(kind: str, payload: Dict[str, Any]) -> None:
+        text = dumps(payload, compact=True)
+        MESSAGES.inc(kind)
+        BYTES.inc(kind, amount=len(text.encode("utf-8")))
+        await ws.send_text(text)
+
+    async def _update() -> None:
+        lines: Optional[List[str]] = None
+        while True:
+            await changed.wait()
+            # Debounce: render once edits have paused.
+            seen = -1
+            while seen != version:
+                seen = version
+                await asyncio.sleep(DEBOUNCE)
+            # Each render is admitted like a request (token + slot).
+            async with admitted(ws.scope):
+                seen = version  # edits made while waiting are included
+                changed.clear()
+                reply = await run_in_threadpool(_render, latest)
+            if version != seen:
+                MESSAGES.inc("superseded")
+                continue  # ``changed`` is set again; render the newer input
+            if "error" in reply:
+                await _send("error", {"v": seen, "error": reply["error"]})
+                continue
+            text = reply["text"]
+            new_lines = text.split("\n")
+            ops = line_ops(lines, new_lines) if lines is not None else None
+            lines = new_lines
+            if ops == []:
+                continue
+            if ops is not None and len(dumps(ops, compact=True)) < len(text):
+                await _send("diff", {"v": seen, "ops": ops})
+            else:
+                await _send("full", {"v": seen, "full": text})
+
+    tasks = [asyncio.ensure_future(_receive()), asyncio.ensure_future(_update())]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if not task.cancelled() and not isinstance(task.exception(), (WebSocketDisconnect, OSError)):
+                task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        _sessions -= 1
+
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .page_cache import LazyPage
+
+
+KINDS = {"txt": "text/plain; charset=utf-8", "json": "application/json; charset=utf-8"}
+
+
+@dataclass(frozen=True)
+class Artifact:
+    page: LazyPage
+    kind: str
+    filename: str
+
+    @property
+    def id(self) -> str:
+        return self.page.digest[:16]
+
+
+class ArtifactStore:
+    """Generated downloads addressed by a short content hash, LRU-bounded by total size.
+
+    Bodies are encoded once, on first ``put``, and gzipped on the first
+    download that accepts gzip (most are never downloaded); serving never
+    re-parses or re-serializes them. The size bound counts the plain bodies. With ``directory`` set, every artifact
+    is also written there (``<id>.<kind>``: filename line, then the body) so
+    worker processes sharing the directory can serve each other's links;
+    files older than ``ttl`` seconds are pruned.
+    """
+
+    _PRUNE_EVERY = 256  # puts between directory sweeps
+
+    def __init__(self, max_bytes: int, directory: Optional[Path] = None, ttl: int = 86400) -> None:
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.ttl = ttl
+        self._puts = 0
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+        self._items: "OrderedDict[Tuple[str, str], Artifact]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, content: str, kind: str, filename: str) -> str:
+        """Store ``content`` (already formatted) and return its id."""
+        if kind not in KINDS:
+            raise ValueError(f"Unsupported artifact kind: {kind}")
+        key = (hashlib.sha256(content.encode("utf-8")).hexdigest()[:16], kind)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return key[0]
+        self._remember(key, Artifact(LazyPage(content), kind, filename))
+        if self.directory is not None:
+            self._write(key, filename, content)
+        return key[0]
+
+    def get(self, artifact_id: str, kind: str) -> Optional[Artifact]:
+        with self._lock:
+            artifact = self._items.get((artifact_id, kind))
+            if artifact is not None:
+                self._items.move_to_end((artifact_id, kind))
+                return artifact
+        if self.directory is None or kind not in KINDS or not artifact_id.isalnum():
+            return None
+        try:
+            filename, _, content = (self.directory / f"{artifact_id}.{kind}").read_bytes().decode("utf-8").partition("\n")
+        except OSError:
+            return None
+        artifact = Artifact(LazyPage(content), kind, filename)
+        self._remember((artifact_id, kind), artifact)
+        return artifact
+
+    def touch(self, artifact_id: str, kind: str) -> bool:
+        """Mark an artifact recently used without loading it; ``False`` if it is gone."""
+        with self._lock:
+            if (artifact_id, kind) in self._items:
+                self._items.move_to_end((artifact_id, kind))
+                return True
+        if self.directory is None or kind not in KINDS or not artifact_id.isalnum():
+            return False
+        return (self.directory / f"{artifact_id}.{kind}").exists()
+
+    def _remember(self, key: Tuple[str, str], artifact: Artifact) -> None:
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = artifact
+            self._bytes += _size(artifact.page)
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= _size(evicted.page)
+
+    def _write(self, key: Tuple[str, str], filename: str, content: str) -> None:
+        assert self.directory is not None
+        path = self.directory / f"{key[0]}.{key[1]}"
+        try:
+            if path.exists():
+                os.utime(path)  # regenerated: keep it past the next prune
+            else:
+                tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                tmp.write_bytes((filename.replace("\n", " ") + "\n" + content).encode("utf-8"))
+                os.replace(tmp, path)
+        except OSError:
+            return  # the in-memory copy still serves this process
+        self._puts += 1
+        if self._puts % self._PRUNE_EVERY == 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        assert self.directory is not None
+        cutoff = time.time() - self.ttl
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _size(page: LazyPage) -> int:
+    return len(page.body)
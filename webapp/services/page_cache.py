@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:  # optional: pip install brotli
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """A rendered page with its compressed bodies computed once."""
+
+    body: bytes
+    gzip_body: bytes
+    br_body: Optional[bytes]
+    digest: str
+
+    def etag(self, coding: str = "") -> str:
+        """Strong ETag per representation: each content-coding gets its own tag."""
+        return f'"{self.digest}-{coding}"' if coding else f'"{self.digest}"'
+
+    @classmethod
+    def from_html(cls, html: str, brotli_quality: Optional[int] = 11) -> CachedPage:
+        """Encode and compress ``html`` (any text); ``brotli_quality=None`` skips brotli."""
+        body = html.encode("utf-8")
+        return cls(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            br_body=brotli.compress(body, quality=brotli_quality) if brotli is not None and brotli_quality is not None else None,
+            digest=hashlib.sha256(body).hexdigest()[:32],
+        )
+
+
+class LazyPage:
+    """A body whose gzip encoding is produced on first use, for content most clients never fetch.
+
+    Serves through ``cached_response`` like a ``CachedPage`` (without brotli).
+    """
+
+    br_body: Optional[bytes] = None
+
+    def __init__(self, text: str) -> None:
+        self.body = text.encode("utf-8")
+        self.digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self._gzip_body: Optional[bytes] = None
+
+    @property
+    def gzip_body(self) -> bytes:
+        # Concurrent first requests may both compress; the results are identical.
+        if self._gzip_body is None:
+            self._gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        return self._gzip_body
+
+    etag = CachedPage.etag
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "").lower() not in {"q=0", "q=0.0", "q=0.00", "q=0.000"}
+    return False
+
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """Weak comparison (RFC 9110 13.1.2): ``W/`` prefixes are ignored, ``*`` matches anything."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") in etags:
+            return True
+    return False
+
+
+class PageCache:
+    """Rendered pages keyed by configuration; rendering happens only on a miss.
+
+    Keys are bounded by the caller (templates x presets x flag sets), so
+    entries are never evicted.
+    """
+
+    def __init__(self) -> None:
+        self._pages: Dict[Hashable, CachedPage] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, render: Callable[[], str]) -> CachedPage:
+        page = self._pages.get(key)
+        if page is None:
+            page = CachedPage.from_html(render())
+            with self._lock:
+                page = self._pages.setdefault(key, page)
+        return page
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def respond(self, request: Request, key: Hashable, render: Callable[[], str], cache_control: str) -> Response:
+        return cached_response(request, self.get(key, render), cache_control)
+
+
+def cached_response(
+    request: Request,
+    page: Union[CachedPage, LazyPage],
+    cache_control: str,
+    media_type: str = "text/html; charset=utf-8",
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serve a cached body: 304 on a matching ETag, else brotli/gzip/identity per Accept-Encoding."""
+    accept = request.headers.get("accept-encoding", "")
+    coding, body = "", page.body
+    if page.br_body is not None and _accepts(accept, "br"):
+        coding, body = "br", page.br_body
+    elif _accepts(accept, "gzip"):
+        coding, body = "gzip", page.gzip_body
+    headers = {**(headers or {}), "ETag": page.etag(coding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    # Any representation's tag means the client already has this body.
+    if etag_matches(request.headers.get("if-none-match"), page.etag(), page.etag("gzip"), page.etag("br")):
+        return Response(status_code=304, headers=headers)
+    if coding:
+        headers["Content-Encoding"] = coding
+    return Response(body, media_type=media_type, headers=headers)
@@ -1,10 +1,24 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
+from promptkit.cache import default_cache, normalize_pattern
 from promptkit.cards import make_iterate_card
-from promptkit.plan import build_plan_text
-from promptkit.ticket import build_ticket_text
+from promptkit.jsonio import dumps
+from promptkit.plan import build_plan_dict, build_plan_text, iter_plan_text
+from promptkit.ticket import build_ticket_dict, build_ticket_text, iter_ticket_text
+
+
+MODES = ("iterate", "plan", "ticket")
+
+# Worker threads shared by all compare requests (created on first use).
+_VARIANT_WORKERS = int(os.getenv("PK_COMPARE_WORKERS", "8"))
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
 
 
 def run_promptkit(
@@ -17,33 +31,44 @@ def run_promptkit(
 ) -> Dict[str, Any]:
     """Run PromptKit for the requested mode and return text/optional JSON.
 
+    Results come from the shared content-addressed cache when possible.
+
     Returns a dict with keys:
     - text: str
     - json: Optional[dict]
     - filename_hint: Suggested filename stem
     """
     mode = (mode or "iterate").strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"Unsupported mode: {mode}")
+    params = {
+        "seed": seed,
+        "friction": friction,
+        "pattern": normalize_pattern(pattern),
+        "ascii": ascii_only,
+        "json": json_out,
+    }
+    cached = default_cache().get_or_compute(
+        f"web:{mode}",
+        params,
+        lambda: dumps(_run_uncached(mode, seed, friction, pattern, ascii_only, json_out), compact=True),
+    )
+    return json.loads(cached)
+
+
+def _run_uncached(
+    mode: str,
+    seed: str,
+    friction: str,
+    pattern: Optional[str],
+    ascii_only: bool,
+    json_out: bool,
+) -> Dict[str, Any]:
 
     if mode == "iterate":
         card = make_iterate_card(seed, friction, ascii_only=ascii_only, pattern=pattern)
         text = card.render_text()
-        payload = None
-        if json_out:
-            payload = {
-                "id": card.id,
-                "seed": card.seed,
-                "friction": card.friction,
-                "diagnosis": card.diagnosis,
-                "fix": {
-                    "rules": card.fix_rules,
-                    "prompt_patch": card.prompt_patch,
-                    "examples": card.examples,
-                },
-                "validation": {
-                    "scenarios": card.validation_scenarios,
-                    "pass_criteria": card.validation_pass,
-                },
-            }
+        payload = card.to_dict() if json_out else None
         return {
             "text": text,
             "json": payload,
@@ -52,7 +77,8 @@ def run_promptkit(
 
     if mode == "plan":
         text = build_plan_text(seed=seed, friction=friction, pattern=pattern, ascii_only=ascii_only)
-        return {"text": text, "json": None, "filename_hint": "plan"}
+        payload = build_plan_dict(seed=seed, friction=friction, pattern=pattern, ascii_only=ascii_only) if json_out else None
+        return {"text": text, "json": payload, "filename_hint": "plan"}
 
     if mode == "ticket":
         text = build_ticket_text(
@@ -66,7 +92,56 @@ def run_promptkit(
             success=None,
             ascii_only=ascii_only,
         )
-        return {"text": text, "json": None, "filename_hint": "ticket"}
+        payload = build_ticket_dict(seed=seed, friction=friction, ascii_only=ascii_only) if json_out else None
+        return {"text": text, "json": payload, "filename_hint": "ticket"}
 
     raise ValueError(f"Unsupported mode: {mode}")
 
+
+def _variant_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, _VARIANT_WORKERS), thread_name_prefix="pk-compare")
+        return _executor
+
+
+def run_variants(
+    variants: Sequence[Tuple[str, Optional[str]]],
+    seed: str,
+    friction: str,
+    ascii_only: bool = False,
+) -> List[Dict[str, Any]]:
+    """Text results for several ``(mode, pattern)`` variants, in ``variants`` order.
+
+    Variants are generated concurrently on a shared thread pool; each goes
+    through ``run_promptkit``, so repeats are result-cache hits.
+    """
+    if len(variants) <= 1:
+        return [run_promptkit(mode, seed, friction, pattern, ascii_only) for mode, pattern in variants]
+    return list(
+        _variant_executor().map(
+            lambda variant: run_promptkit(variant[0], seed, friction, variant[1], ascii_only),
+            variants,
+        )
+    )
+
+
+def iter_promptkit(
+    mode: str,
+    seed: str,
+    friction: str,
+    pattern: Optional[str] = None,
+    ascii_only: bool = False,
+) -> Iterator[str]:
+    """Yield the text artifact for ``mode`` section by section (for streaming responses)."""
+    mode = (mode or "iterate").strip().lower()
+
+    if mode == "iterate":
+        return make_iterate_card(seed, friction, ascii_only=ascii_only, pattern=pattern).iter_render()
+    if mode == "plan":
+        return iter_plan_text(seed=seed, friction=friction, pattern=pattern, ascii_only=ascii_only)
+    if mode == "ticket":
+        return iter_ticket_text(seed=seed, friction=friction, ascii_only=ascii_only)
+
+    raise ValueError(f"Unsupported mode: {mode}")